@@ -0,0 +1,29 @@
+"""
+Script for creating or refreshing the course summaries used by the Studio course listing.
+"""
+from django.core.management.base import BaseCommand
+from xmodule.error_module import ErrorDescriptor
+from xmodule.modulestore.django import modulestore
+
+from contentstore.models import CourseSummary
+
+#------------ to run: ./manage.py cms populate_course_summaries --settings=dev
+
+
+class Command(BaseCommand):
+    """
+    Script for creating or refreshing the summary of every course in the modulestore.
+    """
+    help = 'Creates or refreshes the course summaries used by the Studio course listing'
+
+    def handle(self, *args, **options):
+        """
+        The logic of the command.
+        """
+        count = 0
+        for course in modulestore().get_courses():
+            if isinstance(course, ErrorDescriptor):
+                continue
+            if CourseSummary.update_for_course(course) is not None:
+                count += 1
+        print(u"Refreshed {0} course summaries.".format(count))
@@ -3,9 +3,11 @@ Models for contentstore
 """
 # pylint: disable=no-member
 
-from django.db.models.fields import TextField
+from django.db.models.fields import CharField, TextField
+from model_utils.models import TimeStampedModel
 
 from config_models.models import ConfigurationModel
+from xmodule_django.models import CourseKeyField
 
 
 class VideoUploadConfig(ConfigurationModel):
@@ -19,3 +21,102 @@ class VideoUploadConfig(ConfigurationModel):
     def get_profile_whitelist(cls):
         """Get the list of profiles to include in the encoding download"""
         return [profile for profile in cls.current().profile_whitelist.split(",") if profile]
+
+
+class CourseSummary(TimeStampedModel):
+    """
+    A denormalized summary of a course, used to list the courses in Studio without loading
+    each of them from the modulestore.
+
+    Summaries are created along with courses and refreshed whenever a course is published.
+    Courses which don't have one yet get it on demand (see `get_or_create_for_keys`).
+    Template courses aren't listed in Studio, so they have no summary.
+    """
+    course_id = CourseKeyField(max_length=255, db_index=True, unique=True, verbose_name='Course ID')
+    display_name = CharField(max_length=255, blank=True, db_index=True)
+    # The org of the course key, used for filtering and to resolve org-wide roles
+    org = CharField(max_length=255, db_index=True)
+    # The org and number to display, which may be overridden in the course's advanced settings
+    display_org = CharField(max_length=255, blank=True)
+    display_number = CharField(max_length=255, blank=True)
+    run = CharField(max_length=255, db_index=True)
+
+    # Fields which the course listing may be sorted on
+    SORT_FIELDS = ('display_name', 'course_id', 'org', 'run', 'created')
+
+    def __unicode__(self):
+        return unicode(self.course_id)
+
+    @property
+    def location(self):
+        """
+        The usage key of the course's root block.
+        """
+        # Old mongo courses name their root block after the run, split courses use a fixed block id
+        if getattr(self.course_id, 'deprecated', False):
+            return self.course_id.make_usage_key('course', self.course_id.run)
+        return self.course_id.make_usage_key('course', 'course')
+
+    @classmethod
+    def update_for_course(cls, course):
+        """
+        Creates or updates the summary of the given course descriptor, and returns it. Returns
+        None for template courses.
+        """
+        # pylint: disable=fixme
+        # TODO remove this condition when templates purged from db
+        if course.location.course == 'templates':
+            return None
+
+        values = {
+            'display_name': course.display_name or u'',
+            'org': course.id.org,
+            'display_org': course.display_org_with_default,
+            'display_number': course.display_number_with_default,
+            'run': course.id.run,
+        }
+        summary, created = cls.objects.get_or_create(course_id=course.id, defaults=values)
+        if not created and any(getattr(summary, field) != value for field, value in values.iteritems()):
+            for field, value in values.iteritems():
+                setattr(summary, field, value)
+            summary.save()
+        return summary
+
+    @classmethod
+    def update_for_course_key(cls, course_key):
+        """
+        Loads the course from the modulestore and updates its summary. Returns the summary, or
+        None if the course doesn't exist or fails to load.
+        """
+        # Import here to avoid a dependency of the model on the modulestore at import time
+        from xmodule.error_module import ErrorDescriptor
+        from xmodule.modulestore.django import modulestore
+        from xmodule.modulestore.exceptions import ItemNotFoundError
+
+        try:
+            course = modulestore().get_course(course_key)
+        except ItemNotFoundError:
+            return None
+        if course is None or isinstance(course, ErrorDescriptor):
+            return None
+        return cls.update_for_course(course)
+
+    @classmethod
+    def get_or_create_for_keys(cls, course_keys):
+        """
+        Returns a list of the summaries for the given course keys. Courses which don't have a summary
+        yet are loaded from the modulestore once, and courses which no longer exist are skipped.
+        """
+        course_keys = set(course_keys)
+        summaries = list(cls.objects.filter(course_id__in=course_keys))
+        missing_keys = course_keys - set(summary.course_id for summary in summaries)
+        for course_key in missing_keys:
+            summary = cls.update_for_course_key(course_key)
+            if summary is not None:
+                summaries.append(summary)
+        return summaries
+
+
+# Signals must be imported in a file that is automatically loaded at app startup (e.g. models.py). We import them
+# at the end of this file to avoid circular dependencies.
+import contentstore.signals  # pylint: disable=unused-import
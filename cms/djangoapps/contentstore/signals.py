@@ -0,0 +1,17 @@
+"""
+Signal handlers for contentstore
+"""
+from django.dispatch import receiver
+
+from xmodule.modulestore.django import SignalHandler
+
+
+@receiver(SignalHandler.course_published)
+def listen_for_course_publish(sender, course_key, **kwargs):  # pylint: disable=unused-argument
+    """
+    Refreshes the course's summary used for the Studio course listing.
+    """
+    # Import tasks here to avoid a circular import.
+    from contentstore.tasks import update_course_summary
+
+    update_course_summary.delay(unicode(course_key))
@@ -11,6 +11,7 @@ from xmodule.course_module import CourseFields
 
 from xmodule.modulestore.exceptions import DuplicateCourseError, ItemNotFoundError
 from course_action_state.models import CourseRerunState
+from contentstore.models import CourseSummary
 from contentstore.utils import initialize_permissions
 from opaque_keys.edx.keys import CourseKey
 
@@ -35,6 +36,9 @@ def rerun_course(source_course_key_string, destination_course_key_string, user_i
         # set initial permissions for the user to access the course.
         initialize_permissions(destination_course_key, User.objects.get(id=user_id))
 
+        # list the new course in Studio before its rerun state is succeeded.
+        CourseSummary.update_for_course_key(destination_course_key)
+
         # update state: Succeeded
         CourseRerunState.objects.succeeded(course_key=destination_course_key)
         return "succeeded"
@@ -61,6 +65,15 @@ def rerun_course(source_course_key_string, destination_course_key_string, user_i
         return "exception: " + unicode(exc)
 
 
+@task()
+def update_course_summary(course_key_string):
+    """
+    Refreshes the summary of the course used for the Studio course listing.
+    """
+    # Callers pass the course key as a string since CourseLocators aren't JSON-serializable.
+    CourseSummary.update_for_course_key(CourseKey.from_string(course_key_string))
+
+
 def deserialize_fields(json_fields):
     fields = json.loads(json_fields)
     for field_name, value in fields.iteritems():
@@ -8,9 +8,16 @@ from chrono import Timer
 from mock import patch, Mock
 import ddt
 
+import json
+
+from django.core.management import call_command
 from django.test import RequestFactory
 
-from contentstore.views.course import _accessible_courses_list, _accessible_courses_list_from_groups, AccessListFallback
+from contentstore.views.course import (
+    _accessible_courses_list, _accessible_courses_list_from_groups, _accessible_course_summaries, AccessListFallback,
+    create_new_course_in_store
+)
+from contentstore.models import CourseSummary
 from contentstore.utils import delete_course_and_groups, reverse_course_url
 from contentstore.tests.utils import AjaxEnabledTestClient
 from student.tests.factories import UserFactory
@@ -297,3 +304,75 @@ class TestCourseListing(ModuleStoreTestCase):
             self.assertSetEqual(
                 set_of_course_keys(courses_in_progress), set_of_course_keys(unsucceeded_course_actions, 'course_key')
             )
+
+    def test_course_summaries(self):
+        """
+        Test listing the course summaries of courses with course and org based roles
+        """
+        course = self._create_course_with_access_groups(CourseLocator('Org1', 'Course1', 'Run1'), self.user)
+        org_course = self._create_course_with_access_groups(CourseLocator('Org2', 'Course2', 'Run2'))
+        self._create_course_with_access_groups(CourseLocator('Org3', 'Course3', 'Run3'))
+        OrgStaffRole(org_course.location.org).add_users(self.user)
+        CourseSummary.update_for_course(org_course)
+
+        summaries = _accessible_course_summaries(self.user)
+        self.assertSetEqual(set([course.id, org_course.id]), set(summary.course_id for summary in summaries))
+        # the missing summary of the course was created on demand
+        self.assertTrue(CourseSummary.objects.filter(course_id=course.id).exists())
+
+        # listing again never loads the courses from the modulestore
+        with check_mongo_calls(0):
+            self.assertEqual(len(_accessible_course_summaries(self.user)), 2)
+
+    def test_populate_course_summaries(self):
+        """
+        Test that populating the course summaries lists every course but the templates to global staff
+        """
+        course = self._create_course_with_access_groups(CourseLocator('Org1', 'Course1', 'Run1'))
+        self._create_course_with_access_groups(CourseLocator('Org1', 'templates', 'Run1'))
+        CourseSummary.objects.all().delete()
+        GlobalStaff().add_users(self.user)
+
+        call_command('populate_course_summaries')
+        self.assertEqual([summary.course_id for summary in _accessible_course_summaries(self.user)], [course.id])
+
+    def test_new_course_summary(self):
+        """
+        Test that a new course is listed without waiting for it to be published
+        """
+        course = create_new_course_in_store(
+            ModuleStoreEnum.Type.split, self.user, 'Org1', 'Course1', 'Run1', {'display_name': 'New Course'}
+        )
+        summary = CourseSummary.objects.get(course_id=course.id)
+        self.assertEqual(summary.display_name, 'New Course')
+        self.assertEqual(list(_accessible_course_summaries(self.user)), [summary])
+
+    def test_course_summaries_json(self):
+        """
+        Test paginating, filtering and sorting the course summaries through the course handler
+        """
+        for num in range(5):
+            self._create_course_with_access_groups(
+                CourseLocator('Org{}'.format(num % 2), 'Course{}'.format(num), 'Run'), self.user
+            )
+
+        def get_courses(**params):
+            """Returns the parsed json course listing for the given query parameters"""
+            response = self.client.get_json('/course/', params)
+            self.assertEqual(response.status_code, 200)
+            return json.loads(response.content)
+
+        listing = get_courses(page_size=2, sort='course_id', direction='desc')
+        self.assertEqual(listing['totalCount'], 5)
+        self.assertEqual(
+            [course['course_key'] for course in listing['courses']],
+            [unicode(CourseLocator('Org0', 'Course4', 'Run')), unicode(CourseLocator('Org1', 'Course3', 'Run'))]
+        )
+
+        listing = get_courses(page=10, page_size=2, org='Org0')
+        self.assertEqual(listing['totalCount'], 3)
+        self.assertEqual(listing['page'], 1)
+        self.assertEqual(len(listing['courses']), 1)
+
+        response = self.client.get_json('/course/', {'sort': 'bogus'})
+        self.assertEqual(response.status_code, 400)
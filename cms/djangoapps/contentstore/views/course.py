@@ -3,6 +3,7 @@ Views related to operations on course objects
 """
 from django.shortcuts import redirect
 import json
+import math
 import random
 import string  # pylint: disable=deprecated-module
 import logging
@@ -13,6 +14,7 @@ from django.conf import settings
 from django.views.decorators.http import require_http_methods, require_GET
 from django.core.exceptions import PermissionDenied
 from django.core.urlresolvers import reverse
+from django.db.models import Q
 from django.http import HttpResponseBadRequest, HttpResponseNotFound, HttpResponse, Http404
 from util.json_request import JsonResponse, JsonResponseBadRequest
 from util.date_utils import get_default_time_display
@@ -76,6 +78,7 @@ from student.roles import (
 )
 from student import auth
 from course_action_state.models import CourseRerunState, CourseRerunUIStateManager
+from contentstore.models import CourseSummary
 from course_action_state.managers import CourseActionStateItemNotFoundError
 from microsite_configuration import microsite
 from xmodule.course_module import CourseFields
@@ -251,7 +254,9 @@ def course_handler(request, course_key_string=None):
     try:
         response_format = request.REQUEST.get('format', 'html')
         if response_format == 'json' or 'application/json' in request.META.get('HTTP_ACCEPT', 'application/json'):
-            if request.method == 'GET':
+            if request.method == 'GET' and course_key_string is None:
+                return _course_summaries_json(request)
+            elif request.method == 'GET':
                 course_key = CourseKey.from_string(course_key_string)
                 with modulestore().bulk_operations(course_key):
                     course_module = get_course_and_check_access(course_key, request.user, depth=None)
@@ -410,6 +415,122 @@ def _accessible_courses_list_from_groups(request):
     return courses_list.values(), in_process_course_actions
 
 
+def _accessible_course_summaries(user):
+    """
+    Returns a QuerySet of the CourseSummary of each course the user can access in Studio.
+
+    Unlike the two methods above, this does not load the courses from the modulestore (except
+    once for courses which don't have a summary yet), and org-wide roles don't require scanning
+    every course since they are resolved by filtering the summaries on org.
+    """
+    if GlobalStaff().has_user(user):
+        return CourseSummary.objects.all()
+
+    course_keys = set()
+    orgs = set()
+    for role in (CourseInstructorRole.ROLE, CourseStaffRole.ROLE):
+        for course_access in UserBasedRole(user, role).courses_with_role():
+            if course_access.course_id is None:
+                orgs.add(course_access.org)
+            else:
+                course_keys.add(course_access.course_id)
+
+    if course_keys:
+        CourseSummary.get_or_create_for_keys(course_keys)
+    return CourseSummary.objects.filter(Q(course_id__in=course_keys) | Q(org__in=orgs))
+
+
+def _in_process_course_actions(user):
+    """
+    Returns the course reruns which are still in progress or have failed, and which the user can access.
+    """
+    return [
+        course for course in
+        CourseRerunState.objects.find_all(
+            exclude_args={'state': CourseRerunUIStateManager.State.SUCCEEDED}, should_display=True
+        )
+        if has_studio_read_access(user, course.course_key)
+    ]
+
+
+def _format_course_summary_for_view(summary):
+    """
+    Return a dict of the data which the view requires for each course, given its CourseSummary
+    """
+    course_key = summary.course_id
+    return {
+        'display_name': summary.display_name,
+        'course_key': unicode(course_key),
+        'url': reverse_course_url('course_handler', course_key),
+        'lms_link': get_lms_link_for_item(summary.location),
+        'rerun_link': _get_rerun_link_for_item(course_key),
+        'org': summary.display_org,
+        'number': summary.display_number,
+        'run': summary.run,
+    }
+
+
+def _course_summaries_json(request):
+    """
+    Returns one page of the courses which the user can access, as json.
+
+    Supports the following query parameters:
+      page - the 0-based page to return
+      page_size - the number of courses per page
+      org - only return courses of this organization
+      text_search - only return courses whose display name, org or run contains this text
+      sort - the field to sort on, one of CourseSummary.SORT_FIELDS
+      direction - 'asc' or 'desc'
+    """
+    try:
+        requested_page = max(int(request.REQUEST.get('page', 0)), 0)
+        requested_page_size = min(max(int(request.REQUEST.get('page_size', 50)), 1), 1000)
+    except ValueError:
+        return JsonResponseBadRequest({'error': _('The page and page size must be integers.')})
+    requested_sort = request.REQUEST.get('sort', 'display_name')
+    if requested_sort not in CourseSummary.SORT_FIELDS:
+        return JsonResponseBadRequest({'error': _('Unsupported sort field.')})
+
+    summaries = _accessible_course_summaries(request.user)
+
+    # exclude the courses whose reruns haven't succeeded yet; they are listed separately
+    in_process_course_actions = _in_process_course_actions(request.user)
+    if in_process_course_actions:
+        summaries = summaries.exclude(course_id__in=[uca.course_key for uca in in_process_course_actions])
+
+    requested_org = request.REQUEST.get('org')
+    if requested_org:
+        summaries = summaries.filter(org=requested_org)
+    text_search = request.REQUEST.get('text_search')
+    if text_search:
+        summaries = summaries.filter(
+            Q(display_name__icontains=text_search) | Q(org__icontains=text_search) | Q(run__icontains=text_search)
+        )
+
+    direction = '-' if request.REQUEST.get('direction', '').lower() == 'desc' else ''
+    summaries = summaries.order_by(direction + requested_sort, 'id')
+
+    total_count = summaries.count()
+    # If the query is beyond the final page, then return the final page instead
+    if requested_page > 0 and requested_page * requested_page_size >= total_count:
+        requested_page = max(int(math.ceil(float(total_count) / requested_page_size)) - 1, 0)
+    start = requested_page * requested_page_size
+    courses = [
+        _format_course_summary_for_view(summary)
+        for summary in summaries[start:start + requested_page_size]
+    ]
+
+    return JsonResponse({
+        'start': start,
+        'end': start + len(courses),
+        'page': requested_page,
+        'pageSize': requested_page_size,
+        'totalCount': total_count,
+        'sort': requested_sort,
+        'courses': courses,
+    })
+
+
 def _accessible_libraries_list(user):
     """
     List all libraries available to the logged in user by iterating through all libraries
@@ -424,7 +545,13 @@ def course_listing(request):
     """
     List all courses available to the logged in user
     """
-    courses, in_process_course_actions = get_courses_accessible_to_user(request)
+    in_process_course_actions = _in_process_course_actions(request.user)
+    in_process_course_keys = set(uca.course_key for uca in in_process_course_actions)
+    courses = [
+        _format_course_summary_for_view(summary)
+        for summary in _accessible_course_summaries(request.user).order_by('display_name', 'id')
+        if summary.course_id not in in_process_course_keys
+    ]
     libraries = _accessible_libraries_list(request.user) if LIBRARIES_ENABLED else []
 
     def format_in_process_course_view(uca):
@@ -461,7 +588,6 @@ def course_listing(request):
             'can_edit': has_studio_write_access(request.user, library.location.library_key),
         }
 
-    courses = _remove_in_process_courses(courses, in_process_course_actions)
     in_process_course_actions = [format_in_process_course_view(uca) for uca in in_process_course_actions]
 
     return render_to_response('index.html', {
@@ -718,6 +844,9 @@ def create_new_course_in_store(store, user, org, number, run, fields):
 
     # Initialize permissions for user in the new course
     initialize_permissions(new_course.id, user)
+
+    # List the new course in Studio right away rather than once it's published
+    CourseSummary.update_for_course(new_course)
     return new_course
 
 
@@ -731,7 +731,8 @@ def _get_module_info(xblock, rewrite_static_links=True, include_ancestor_info=Fa
 
 
 def create_xblock_info(xblock, data=None, metadata=None, include_ancestor_info=False, include_child_info=False,
-                       course_outline=False, include_children_predicate=NEVER, parent_xblock=None, graders=None):
+                       course_outline=False, include_children_predicate=NEVER, parent_xblock=None, graders=None,
+                       outline_state=None):
     """
     Creates the information needed for client-side XBlockInfo.
 
@@ -746,13 +747,25 @@ def create_xblock_info(xblock, data=None, metadata=None, include_ancestor_info=F
 
     In addition, an optional include_children_predicate argument can be provided to define whether or
     not a particular xblock should have its children included.
+
+    When rendering the course outline with child info, the publishing state of the whole tree is
+    computed up front by an XBlockOutlineState and shared with every child, rather than being
+    recomputed for each xblock. An existing outline_state can also be passed in explicitly.
     """
     is_library_block = isinstance(xblock.location, LibraryUsageLocator)
     is_xblock_unit = is_unit(xblock, parent_xblock)
+    if outline_state is None and course_outline and include_child_info and not is_library_block:
+        outline_state = XBlockOutlineState(xblock, include_children_predicate, parent_xblock=parent_xblock)
+    if outline_state is not None and xblock.location not in outline_state:
+        outline_state = None
+
     # this should not be calculated for Sections and Subsections on Unit page or for library blocks
     has_changes = None
     if (is_xblock_unit or course_outline) and not is_library_block:
-        has_changes = modulestore().has_changes(xblock)
+        if outline_state is not None:
+            has_changes = outline_state.has_changes(xblock)
+        else:
+            has_changes = modulestore().has_changes(xblock)
 
     if graders is None:
         if not is_library_block:
@@ -771,15 +784,23 @@ def create_xblock_info(xblock, data=None, metadata=None, include_ancestor_info=F
             course_outline,
             graders,
             include_children_predicate=include_children_predicate,
+            outline_state=outline_state,
         )
     else:
         child_info = None
 
-    if xblock.category != 'course':
+    if xblock.category == 'course':
+        visibility_state = None
+    elif outline_state is not None:
+        visibility_state = outline_state.visibility_state(xblock)
+    else:
         visibility_state = _compute_visibility_state(xblock, child_info, is_xblock_unit and has_changes)
+    if is_library_block:
+        published = None
+    elif outline_state is not None:
+        published = outline_state.is_published(xblock)
     else:
-        visibility_state = None
-    published = modulestore().has_published_version(xblock) if not is_library_block else None
+        published = modulestore().has_published_version(xblock)
 
     # defining the default value 'True' for delete, drag and add new child actions in xblock_actions for each xblock.
     xblock_actions = {'deletable': True, 'draggable': True, 'childAddable': True}
@@ -830,7 +851,10 @@ def create_xblock_info(xblock, data=None, metadata=None, include_ancestor_info=F
     if child_info:
         xblock_info['child_info'] = child_info
     if visibility_state == VisibilityState.staff_only:
-        xblock_info["ancestor_has_staff_lock"] = ancestor_has_staff_lock(xblock, parent_xblock)
+        if outline_state is not None:
+            xblock_info["ancestor_has_staff_lock"] = outline_state.ancestor_has_staff_lock(xblock)
+        else:
+            xblock_info["ancestor_has_staff_lock"] = ancestor_has_staff_lock(xblock, parent_xblock)
     else:
         xblock_info["ancestor_has_staff_lock"] = False
 
@@ -845,10 +869,13 @@ def create_xblock_info(xblock, data=None, metadata=None, include_ancestor_info=F
     return xblock_info
 
 
-def add_container_page_publishing_info(xblock, xblock_info):  # pylint: disable=invalid-name
+def add_container_page_publishing_info(xblock, xblock_info, outline_state=None):  # pylint: disable=invalid-name
     """
     Adds information about the xblock's publish state to the supplied
     xblock_info for the container page.
+
+    If an XBlockOutlineState containing the xblock is supplied, the release date
+    and staff lock sources are taken from it instead of walking the ancestors.
     """
     def safe_get_username(user_id):
         """
@@ -871,10 +898,12 @@ def add_container_page_publishing_info(xblock, xblock_info):  # pylint: disable=
     xblock_info["published_by"] = safe_get_username(xblock.published_by)
     xblock_info["currently_visible_to_students"] = is_currently_visible_to_students(xblock)
     xblock_info["has_content_group_components"] = has_children_visible_to_specific_content_groups(xblock)
+    if outline_state is not None and xblock.location not in outline_state:
+        outline_state = None
     if xblock_info["release_date"]:
-        xblock_info["release_date_from"] = _get_release_date_from(xblock)
+        xblock_info["release_date_from"] = _get_release_date_from(xblock, outline_state)
     if xblock_info["visibility_state"] == VisibilityState.staff_only:
-        xblock_info["staff_lock_from"] = _get_staff_lock_from(xblock)
+        xblock_info["staff_lock_from"] = _get_staff_lock_from(xblock, outline_state)
     else:
         xblock_info["staff_lock_from"] = None
 
@@ -909,6 +938,15 @@ def _compute_visibility_state(xblock, child_info, is_unit_with_changes):
     """
     Returns the current publish state for the specified xblock and its children
     """
+    children = child_info and child_info.get('children', [])
+    child_states = [child['visibility_state'] for child in children] if children else []
+    return _compute_visibility_state_from_children(xblock, child_states, is_unit_with_changes)
+
+
+def _compute_visibility_state_from_children(xblock, child_states, is_unit_with_changes):  # pylint: disable=invalid-name
+    """
+    Returns the current publish state for the specified xblock given the visibility states of its children
+    """
     if xblock.visible_to_staff_only:
         return VisibilityState.staff_only
     elif is_unit_with_changes:
@@ -917,13 +955,11 @@ def _compute_visibility_state(xblock, child_info, is_unit_with_changes):
         return VisibilityState.needs_attention
     is_unscheduled = xblock.start == DEFAULT_START_DATE
     is_live = datetime.now(UTC) > xblock.start
-    children = child_info and child_info.get('children', [])
-    if children and len(children) > 0:
+    if child_states:
         all_staff_only = True
         all_unscheduled = True
         all_live = True
-        for child in child_info['children']:
-            child_state = child['visibility_state']
+        for child_state in child_states:
             if child_state == VisibilityState.needs_attention:
                 return child_state
             elif not child_state == VisibilityState.staff_only:
@@ -948,6 +984,121 @@ def _compute_visibility_state(xblock, child_info, is_unit_with_changes):
         return VisibilityState.ready
 
 
+class XBlockOutlineState(object):
+    """
+    The publishing state of every xblock in an outline, computed in a single traversal of the tree.
+
+    Building the outline one xblock at a time asks the modulestore for each node's changes and
+    published version, and walks the ancestors of each node to find its release date and staff
+    lock sources. This class instead visits the tree once: inherited state (release date source,
+    staff lock source and ancestor staff lock) is passed down from each parent, while aggregate
+    state (has_changes and visibility) is rolled up from the children.
+
+    The traversal mirrors the one performed by create_xblock_info for the course outline, i.e. it
+    descends into an xblock's children only if include_children_predicate allows it and the xblock
+    is not a unit.
+    """
+    def __init__(self, root_xblock, include_children_predicate=ALWAYS, parent_xblock=None):
+        self.store = modulestore()
+        self._has_changes = {}
+        self._published = {}
+        self._visibility_states = {}
+        self._release_date_sources = {}
+        self._staff_lock_sources = {}
+        self._ancestor_has_staff_lock = {}
+        self._include_children_predicate = include_children_predicate
+
+        with self.store.bulk_operations(root_xblock.location.course_key):
+            # The root's inherited state is the only state that requires looking outside of the tree
+            self._visit(
+                root_xblock,
+                parent_xblock,
+                find_release_date_source(root_xblock),
+                find_staff_lock_source(root_xblock),
+                root_xblock.visible_to_staff_only and ancestor_has_staff_lock(root_xblock, parent_xblock),
+            )
+
+    def __contains__(self, location):
+        return location in self._visibility_states
+
+    def _visit(self, xblock, parent_xblock, release_date_source, staff_lock_source, has_locked_ancestor):
+        """
+        Records the state of xblock and its descendants, and returns whether xblock has changes.
+
+        The inherited state for xblock is passed in by its parent.
+        """
+        location = xblock.location
+        self._release_date_sources[location] = release_date_source
+        self._staff_lock_sources[location] = staff_lock_source
+        self._ancestor_has_staff_lock[location] = has_locked_ancestor
+        self._published[location] = self.store.has_published_version(xblock)
+
+        is_xblock_unit = is_unit(xblock, parent_xblock)
+        child_states = []
+        children_have_changes = False
+        if xblock.has_children and not is_xblock_unit and self._include_children_predicate(xblock):
+            for child in xblock.get_children():
+                if child.category == 'chapter' or child.start != xblock.start:
+                    child_release_date_source = child
+                else:
+                    child_release_date_source = release_date_source
+                if child.fields['visible_to_staff_only'].is_set_on(child):
+                    child_staff_lock_source = child
+                elif child.category == 'chapter':
+                    child_staff_lock_source = None
+                else:
+                    child_staff_lock_source = staff_lock_source
+                child_has_changes = self._visit(
+                    child, xblock, child_release_date_source, child_staff_lock_source, xblock.visible_to_staff_only
+                )
+                children_have_changes = children_have_changes or child_has_changes
+                child_states.append(self._visibility_states[child.location])
+
+        # A parent with changed children has changes itself, so only ask the modulestore otherwise
+        has_changes = children_have_changes or self.store.has_changes(xblock)
+        self._has_changes[location] = has_changes
+        self._visibility_states[location] = _compute_visibility_state_from_children(
+            xblock, child_states, is_xblock_unit and has_changes
+        )
+        return has_changes
+
+    def has_changes(self, xblock):
+        """
+        Returns True if the xblock or any of its descendants has unpublished changes.
+        """
+        return self._has_changes[xblock.location]
+
+    def is_published(self, xblock):
+        """
+        Returns True if the xblock has a published version.
+        """
+        return self._published[xblock.location]
+
+    def visibility_state(self, xblock):
+        """
+        Returns the VisibilityState of the xblock, taking its descendants into account.
+        """
+        return self._visibility_states[xblock.location]
+
+    def ancestor_has_staff_lock(self, xblock):
+        """
+        Returns True if the parent of the xblock is visible to staff only.
+        """
+        return self._ancestor_has_staff_lock[xblock.location]
+
+    def release_date_source(self, xblock):
+        """
+        Returns the xblock that sets the release date of the specified xblock.
+        """
+        return self._release_date_sources[xblock.location]
+
+    def staff_lock_source(self, xblock):
+        """
+        Returns the xblock that sets the staff lock of the specified xblock, or None if it is not staff locked.
+        """
+        return self._staff_lock_sources[xblock.location]
+
+
 def _create_xblock_ancestor_info(xblock, course_outline):
     """
     Returns information about the ancestors of an xblock. Note that the direct parent will also return
@@ -974,7 +1125,7 @@ def _create_xblock_ancestor_info(xblock, course_outline):
     }
 
 
-def _create_xblock_child_info(xblock, course_outline, graders, include_children_predicate=NEVER):
+def _create_xblock_child_info(xblock, course_outline, graders, include_children_predicate=NEVER, outline_state=None):
     """
     Returns information about the children of an xblock, as well as about the primary category
     of xblock expected as children.
@@ -992,7 +1143,8 @@ def _create_xblock_child_info(xblock, course_outline, graders, include_children_
                 child, include_child_info=True, course_outline=course_outline,
                 include_children_predicate=include_children_predicate,
                 parent_xblock=xblock,
-                graders=graders
+                graders=graders,
+                outline_state=outline_state,
             ) for child in xblock.get_children()
         ]
     return child_info
@@ -1006,18 +1158,25 @@ def _get_release_date(xblock):
     return get_default_time_display(xblock.start) if xblock.start != DEFAULT_START_DATE else None
 
 
-def _get_release_date_from(xblock):
+def _get_release_date_from(xblock, outline_state=None):
     """
     Returns a string representation of the section or subsection that sets the xblock's release date
     """
-    return _xblock_type_and_display_name(find_release_date_source(xblock))
+    if outline_state is not None:
+        source = outline_state.release_date_source(xblock)
+    else:
+        source = find_release_date_source(xblock)
+    return _xblock_type_and_display_name(source)
 
 
-def _get_staff_lock_from(xblock):
+def _get_staff_lock_from(xblock, outline_state=None):
     """
     Returns a string representation of the section or subsection that sets the xblock's release date
     """
-    source = find_staff_lock_source(xblock)
+    if outline_state is not None:
+        source = outline_state.staff_lock_source(xblock)
+    else:
+        source = find_staff_lock_source(xblock)
     return _xblock_type_and_display_name(source) if source else None
 
 
@@ -18,7 +18,8 @@ from contentstore.views.component import (
 )
 
 from contentstore.views.item import (
-    create_xblock_info, ALWAYS, VisibilityState, _xblock_type_and_display_name, add_container_page_publishing_info
+    create_xblock_info, ALWAYS, VisibilityState, _xblock_type_and_display_name, add_container_page_publishing_info,
+    XBlockOutlineState
 )
 from contentstore.tests.utils import CourseTestCase
 from student.tests.factories import UserFactory
@@ -1986,6 +1987,58 @@ class TestXBlockPublishingInfo(ItemTest):
         add_container_page_publishing_info(vertical, vertical_info)
         self.assertEqual(_xblock_type_and_display_name(vertical), vertical_info["staff_lock_from"])
 
+    def test_outline_state(self):
+        """
+        Tests that the single pass outline state matches the state computed for each xblock individually.
+        """
+        chapter = self._create_child(self.course, 'chapter', "Test Chapter")
+        sequential = self._create_child(chapter, 'sequential', "Test Sequential", staff_only=True)
+        unit = self._create_child(sequential, 'vertical', "Published Unit", publish_item=True)
+        draft_unit = self._create_child(sequential, 'vertical', "Draft Unit")
+        self._set_release_date(chapter.location, datetime.now(UTC) - timedelta(days=1))
+        chapter = modulestore().get_item(chapter.location)
+        sequential = modulestore().get_item(sequential.location)
+        unit = modulestore().get_item(unit.location)
+        draft_unit = modulestore().get_item(draft_unit.location)
+
+        outline_state = XBlockOutlineState(chapter)
+        self.assertIn(unit.location, outline_state)
+        self.assertTrue(outline_state.has_changes(chapter))
+        self.assertTrue(outline_state.has_changes(sequential))
+        self.assertFalse(outline_state.has_changes(unit))
+        self.assertTrue(outline_state.has_changes(draft_unit))
+        self.assertTrue(outline_state.is_published(unit))
+        self.assertFalse(outline_state.is_published(draft_unit))
+        self.assertEqual(outline_state.visibility_state(chapter), VisibilityState.staff_only)
+        self.assertFalse(outline_state.ancestor_has_staff_lock(sequential))
+        self.assertTrue(outline_state.ancestor_has_staff_lock(unit))
+        self.assertEqual(outline_state.release_date_source(unit).location, chapter.location)
+        self.assertIsNone(outline_state.staff_lock_source(chapter))
+        self.assertEqual(outline_state.staff_lock_source(unit).location, sequential.location)
+
+        unit_info = self._get_xblock_info(unit.location)
+        add_container_page_publishing_info(unit, unit_info, outline_state=outline_state)
+        self.assertEqual(_xblock_type_and_display_name(chapter), unit_info["release_date_from"])
+        self.assertEqual(_xblock_type_and_display_name(sequential), unit_info["staff_lock_from"])
+
+    def test_outline_matches_xblock_info(self):
+        """
+        Tests that the outline built from the shared outline state reports the same state as individual xblocks.
+        """
+        chapter = self._create_child(self.course, 'chapter', "Test Chapter")
+        sequential = self._create_child(chapter, 'sequential', "Test Sequential")
+        self._create_child(sequential, 'vertical', "Published Unit", publish_item=True)
+        self._create_child(sequential, 'vertical', "Staff Only Unit", staff_only=True)
+        self._set_release_date(chapter.location, datetime.now(UTC) + timedelta(days=1))
+        outline_info = self._get_xblock_outline_info(chapter.location)
+        for path in (None, self.FIRST_SUBSECTION_PATH, self.FIRST_UNIT_PATH, self.SECOND_UNIT_PATH):
+            child_info = outline_info
+            for index in path or []:
+                child_info = self._get_child_xblock_info(child_info, index)
+            xblock_info = create_xblock_info(modulestore().get_item(UsageKey.from_string(child_info['id'])))
+            for field in ('published', 'visibility_state', 'ancestor_has_staff_lock'):
+                self.assertEqual(child_info[field], xblock_info[field])
+
     def test_unscheduled_section_with_live_subsection(self):
         chapter = self._create_child(self.course, 'chapter', "Test Chapter")
         sequential = self._create_child(chapter, 'sequential', "Test Sequential")
@@ -14,6 +14,8 @@ class StudioConfig(ConfigurationModel):
     """
     Configuration for XBlockAsides.
     """
+    process_cache_timeout = 10
+
     disabled_blocks = TextField(
         default="about course_info static_tab",
         help_text="Space-separated list of XBlocks on which XBlockAsides should never render in studio",
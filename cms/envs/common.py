@@ -164,6 +164,24 @@ sys.path.append(COMMON_ROOT / 'lib')
 # For geolocation ip database
 GEOIP_PATH = REPO_ROOT / "common/static/data/geoip/GeoIP.dat"
 GEOIPV6_PATH = REPO_ROOT / "common/static/data/geoip/GeoIPv6.dat"
+# Number of recently looked up IP addresses whose country is cached in each process
+GEOIP_COUNTRY_CACHE_SIZE = 10000
+
+# Whether the configuration models that set a `process_cache_timeout` are also
+# cached in each process
+CONFIG_MODELS_PROCESS_CACHE_ENABLED = True
+
+# Number of seconds that the enrollment of a user in a course is cached
+COURSE_ENROLLMENT_CACHE_TIMEOUT = 60 * 60
+
+# Number of seconds that the course and org roles of a user are cached
+ACCESS_ROLE_CACHE_TIMEOUT = 60 * 60
+
+# Number of seconds that a user, their profile, standing and language preference are cached
+USER_IDENTITY_CACHE_TIMEOUT = 60 * 60
+
+# Number of (user, course) pairs whose anonymous id is remembered as saved in each process
+SAVED_ANONYMOUS_IDS_CACHE_SIZE = 100000
 
 ############################# WEB CONFIGURATION #############################
 # This is where we stick our compiled template files.
@@ -255,8 +273,9 @@ MIDDLEWARE_CLASSES = (
     'django.contrib.sessions.middleware.SessionMiddleware',
     'method_override.middleware.MethodOverrideMiddleware',
 
-    # Instead of AuthenticationMiddleware, we use a cache-backed version
-    'cache_toolbox.middleware.CacheBackedAuthenticationMiddleware',
+    # Instead of AuthenticationMiddleware, we use a version loading the user,
+    # their profile, standing and language preference from the cache
+    'student.middleware.CachedIdentityAuthenticationMiddleware',
     'student.middleware.UserStandingMiddleware',
     'contentserver.middleware.StaticContentServer',
     'crum.CurrentRequestUserMiddleware',
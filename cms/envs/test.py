@@ -212,6 +212,21 @@ PASSWORD_HASHERS = (
 # dummy segment-io key
 SEGMENT_IO_KEY = '***REMOVED***'
 
+# Tests mock the countries of IP addresses, so don't cache them.
+GEOIP_COUNTRY_CACHE_SIZE = 0
+
+# Tests clear the shared cache and roll back configuration entries, which the
+# process cache of configuration models would not notice.
+CONFIG_MODELS_PROCESS_CACHE_ENABLED = False
+
+# Each test's enrollments are rolled back and their ids reused, so don't cache them across requests.
+COURSE_ENROLLMENT_CACHE_TIMEOUT = 0
+ACCESS_ROLE_CACHE_TIMEOUT = 0
+USER_IDENTITY_CACHE_TIMEOUT = 0
+
+# Tests roll back the saved anonymous ids and may reuse user ids.
+SAVED_ANONYMOUS_IDS_CACHE_SIZE = 0
+
 FEATURES['ENABLE_SERVICE_STATUS'] = True
 
 # Toggles embargo on for testing
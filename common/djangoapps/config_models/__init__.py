@@ -53,6 +53,12 @@ timeout in each ``ConfigurationModel`` by setting the ``cache_timeout`` property
 You can change the name of the cache key used by the ``ConfigurationModel`` by overriding
 the ``cache_key_name`` function.
 
+Configurations read on most requests can also be cached in each process, by setting the
+``process_cache_timeout`` property to a short number of seconds. Once it expires, the
+configuration is only reloaded if a new entry was saved since, which is tracked by a
+generation key in the shared cache. New entries therefore take effect in every process
+within ``process_cache_timeout`` seconds.
+
 Extension
 ---------
 
@@ -1,15 +1,32 @@
 """
 Django Model baseclass for database-backed configuration.
 """
+import time
+from uuid import uuid4
+
+import dogstats_wrapper as dog_stats_api
+from django.conf import settings
 from django.db import models
 from django.contrib.auth.models import User
 from django.core.cache import get_cache, InvalidCacheBackendError
 
+from util.db import run_after_commit
+
 try:
     cache = get_cache('configuration')  # pylint: disable=invalid-name
 except InvalidCacheBackendError:
     from django.core.cache import cache
 
+# The number of seconds that the generation of the current configuration of
+# each model is kept in the shared cache. When it expires, every process
+# reloads its configuration once.
+GENERATION_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Maps the cache key of each ConfigurationModel cached in-process to the time
+# at which it expires, the generation of the configuration, its current entry
+# and the time at which that entry was loaded from the shared cache.
+_process_cache = {}  # pylint: disable=invalid-name
+
 
 class ConfigurationModel(models.Model):
     """
@@ -18,6 +35,9 @@ class ConfigurationModel(models.Model):
     Properties:
         cache_timeout (int): The number of seconds that this configuration
             should be cached
+        process_cache_timeout (int): The number of seconds that this
+            configuration should also be cached in each process, without
+            checking the shared cache. Zero disables the process cache.
     """
 
     class Meta(object):  # pylint: disable=missing-docstring
@@ -25,6 +45,7 @@ class ConfigurationModel(models.Model):
 
     # The number of seconds
     cache_timeout = 600
+    process_cache_timeout = 0
 
     change_date = models.DateTimeField(auto_now_add=True)
     changed_by = models.ForeignKey(User, editable=False, null=True, on_delete=models.PROTECT)
@@ -32,22 +53,90 @@ class ConfigurationModel(models.Model):
 
     def save(self, *args, **kwargs):
         """
-        Clear the cached value when saving a new configuration entry
+        Clear the cached value when saving a new configuration entry, and
+        again once the entry is committed, since other processes may cache
+        the previous entry until then.
         """
         super(ConfigurationModel, self).save(*args, **kwargs)
         cache.delete(self.cache_key_name())
+        _process_cache.pop(self.cache_key_name(), None)
+        run_after_commit(self._invalidate_after_commit)
+
+    def _invalidate_after_commit(self):
+        """
+        Clear the cached value and make the other processes reload the configuration.
+        """
+        cache.delete(self.cache_key_name())
+        if self.process_cache_timeout:
+            cache.set(self.generation_cache_key_name(), uuid4().hex, GENERATION_CACHE_TIMEOUT)
 
     @classmethod
     def cache_key_name(cls):
         """Return the name of the key to use to cache the current configuration"""
         return 'configuration/{}/current'.format(cls.__name__)
 
+    @classmethod
+    def generation_cache_key_name(cls):
+        """Return the name of the key to use to cache the generation of the current configuration"""
+        return 'configuration/{}/generation'.format(cls.__name__)
+
     @classmethod
     def current(cls):
         """
         Return the active configuration entry, either from cache,
         from the database, or by creating a new empty entry (which is not
         persisted).
+
+        If the model sets `process_cache_timeout`, the entry is first looked
+        up in the process cache. Once it expires there, the entry is kept as
+        long as the generation in the shared cache hasn't changed, but is
+        reloaded at least every `cache_timeout` seconds.
+        """
+        if cls.process_cache_timeout and settings.CONFIG_MODELS_PROCESS_CACHE_ENABLED:
+            return cls._process_cached_current()
+        return cls._shared_cached_current()
+
+    @classmethod
+    def _process_cached_current(cls):
+        """
+        Return the active configuration entry from the process cache,
+        refreshing it from the shared cache if its generation changed.
+        """
+        key = cls.cache_key_name()
+        tags = [u'model:{}'.format(cls.__name__)]
+        now = time.time()
+        cached = _process_cache.get(key)
+        if cached is not None and cached[0] > now:
+            dog_stats_api.increment('config_models.process_cache.hit', tags=tags)
+            return cached[2]
+
+        generation = cls._current_generation()
+        if cached is not None and cached[1] == generation and cached[3] + cls.cache_timeout > now:
+            dog_stats_api.increment('config_models.process_cache.revalidated', tags=tags)
+            current, loaded = cached[2], cached[3]
+        else:
+            dog_stats_api.increment('config_models.process_cache.miss', tags=tags)
+            current, loaded = cls._shared_cached_current(), now
+        _process_cache[key] = (now + cls.process_cache_timeout, generation, current, loaded)
+        return current
+
+    @classmethod
+    def _current_generation(cls):
+        """
+        Return the generation of the current configuration from the shared
+        cache, starting a new generation if there is none.
+        """
+        key = cls.generation_cache_key_name()
+        generation = cache.get(key)
+        if generation is None:
+            cache.add(key, uuid4().hex, GENERATION_CACHE_TIMEOUT)
+            generation = cache.get(key)
+        return generation
+
+    @classmethod
+    def _shared_cached_current(cls):
+        """
+        Return the active configuration entry from the shared cache or the database.
         """
         cached = cache.get(cls.cache_key_name())
         if cached is not None:
@@ -3,13 +3,15 @@ Tests of ConfigurationModel
 """
 
 from django.contrib.auth.models import User
-from django.db import models
-from django.test import TestCase
+from django.core.cache import cache
+from django.db import models, transaction
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import override_settings
 
 from freezegun import freeze_time
 
 from mock import patch
-from config_models.models import ConfigurationModel
+from config_models.models import ConfigurationModel, _process_cache
 
 
 class ExampleConfig(ConfigurationModel):
@@ -74,3 +76,94 @@ class ConfigurationModelTests(TestCase):
         ExampleConfig.current()
 
         mock_cache.set.assert_called_with(ExampleConfig.cache_key_name(), first, 300)
+
+
+@override_settings(CONFIG_MODELS_PROCESS_CACHE_ENABLED=True)
+@patch.object(ExampleConfig, 'process_cache_timeout', 60)
+class ProcessCacheTests(TransactionTestCase):
+    """
+    Tests of the process cache of ConfigurationModel, which is only
+    invalidated once new entries are committed.
+    """
+    def setUp(self):
+        self.user = User()
+        self.user.save()
+        cache.clear()
+        self.addCleanup(_process_cache.clear)
+
+        first = ExampleConfig(changed_by=self.user)
+        first.string_field = 'first'
+        first.save()
+
+    def _save_elsewhere(self, string_field):
+        """
+        Saves a new configuration entry, as another process would, without
+        clearing the process cache of this one.
+        """
+        cached = _process_cache.copy()
+        config = ExampleConfig(changed_by=self.user)
+        config.string_field = string_field
+        config.save()
+        _process_cache.update(cached)
+
+    def test_cached_in_process(self):
+        self.assertEquals(ExampleConfig.current().string_field, 'first')
+        with patch('config_models.models.cache') as mock_cache:
+            self.assertEquals(ExampleConfig.current().string_field, 'first')
+            self.assertFalse(mock_cache.get.called)
+
+    def test_save_clears_process_cache(self):
+        ExampleConfig.current()
+        second = ExampleConfig(changed_by=self.user)
+        second.string_field = 'second'
+        second.save()
+        self.assertEquals(ExampleConfig.current().string_field, 'second')
+
+    def test_expired_unchanged(self):
+        with patch('config_models.models.time.time', return_value=1000):
+            ExampleConfig.current()
+        with patch('config_models.models.time.time', return_value=1061):
+            with patch.object(ExampleConfig, '_shared_cached_current') as mock_shared_cached_current:
+                self.assertEquals(ExampleConfig.current().string_field, 'first')
+                self.assertFalse(mock_shared_cached_current.called)
+
+    def test_changed_in_other_process(self):
+        with patch('config_models.models.time.time', return_value=1000):
+            ExampleConfig.current()
+            self._save_elsewhere('second')
+            self.assertEquals(ExampleConfig.current().string_field, 'first')
+        with patch('config_models.models.time.time', return_value=1061):
+            self.assertEquals(ExampleConfig.current().string_field, 'second')
+
+    def test_revalidated_until_cache_timeout(self):
+        with patch('config_models.models.time.time', return_value=1000):
+            ExampleConfig.current()
+        with patch('config_models.models.time.time', return_value=1290):
+            with patch.object(ExampleConfig, '_shared_cached_current') as mock_shared_cached_current:
+                ExampleConfig.current()
+                self.assertFalse(mock_shared_cached_current.called)
+        with patch('config_models.models.time.time', return_value=1301):
+            with patch.object(ExampleConfig, '_shared_cached_current') as mock_shared_cached_current:
+                ExampleConfig.current()
+                self.assertTrue(mock_shared_cached_current.called)
+
+    def test_generation_changed_after_commit(self):
+        generation = ExampleConfig._current_generation()  # pylint: disable=protected-access
+        with transaction.commit_on_success():
+            self._save_elsewhere('second')
+            self.assertEquals(ExampleConfig._current_generation(), generation)  # pylint: disable=protected-access
+        self.assertNotEquals(ExampleConfig._current_generation(), generation)  # pylint: disable=protected-access
+
+    def test_generation_evicted(self):
+        with patch('config_models.models.time.time', return_value=1000):
+            ExampleConfig.current()
+            self._save_elsewhere('second')
+        cache.delete(ExampleConfig.generation_cache_key_name())
+        with patch('config_models.models.time.time', return_value=1061):
+            self.assertEquals(ExampleConfig.current().string_field, 'second')
+
+    @override_settings(CONFIG_MODELS_PROCESS_CACHE_ENABLED=False)
+    def test_disabled(self):
+        ExampleConfig.current()
+        self._save_elsewhere('second')
+        self.assertEquals(ExampleConfig.current().string_field, 'second')
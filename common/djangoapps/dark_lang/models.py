@@ -10,6 +10,8 @@ class DarkLangConfig(ConfigurationModel):
     """
     Configuration for the dark_lang django app
     """
+    process_cache_timeout = 10
+
     released_languages = models.TextField(
         blank=True,
         help_text="A comma-separated list of language codes to release to the public."
@@ -1,5 +1,6 @@
 import logging
 
+from django.core.cache import cache
 from django.db import models
 from django.contrib.auth.models import User
 
@@ -8,7 +9,7 @@ from django.db.models.signals import post_save
 from django.utils.translation import ugettext_noop
 from student.models import CourseEnrollment
 
-from xmodule.modulestore.django import modulestore
+from xmodule.modulestore.django import modulestore, SignalHandler
 from xmodule.modulestore.exceptions import ItemNotFoundError
 from xmodule_django.models import CourseKeyField, NoneToEmptyManager
 
@@ -17,6 +18,10 @@ FORUM_ROLE_MODERATOR = ugettext_noop('Moderator')
 FORUM_ROLE_COMMUNITY_TA = ugettext_noop('Community TA')
 FORUM_ROLE_STUDENT = ugettext_noop('Student')
 
+# Cache key of the index of a course's discussion modules, see
+# django_comment_client.utils.get_accessible_discussion_modules.
+DISCUSSION_MODULES_CACHE_KEY = u"django_comment.discussion_modules.{course_id}"
+
 
 @receiver(post_save, sender=CourseEnrollment)
 def assign_default_role_on_enrollment(sender, instance, **kwargs):
@@ -40,6 +45,14 @@ def assign_default_role_on_enrollment(sender, instance, **kwargs):
     assign_default_role(instance.course_id, instance.user)
 
 
+@receiver(SignalHandler.course_published)
+def invalidate_discussion_modules(sender, course_key, **kwargs):  # pylint: disable=unused-argument
+    """
+    Drop the cached index of the published course's discussion modules.
+    """
+    cache.delete(DISCUSSION_MODULES_CACHE_KEY.format(course_id=course_key))
+
+
 def assign_default_role(course_id, user):
     """
     Assign forum default role 'Student' to user
@@ -11,6 +11,7 @@ file and check it in at the same time as your model changes. To do that,
 3. Add the migration file created in edx-platform/common/djangoapps/embargo/migrations/
 """
 
+import bisect
 import ipaddr
 import json
 import logging
@@ -33,6 +34,9 @@ from embargo.messages import ENROLL_MESSAGES, COURSEWARE_MESSAGES
 
 log = logging.getLogger(__name__)
 
+# Maps the text of the current IP whitelist and blacklist to their compiled IPFilterList.
+_IP_FILTER_LISTS = {}
+
 
 class EmbargoedCourse(models.Model):
     """
@@ -75,6 +79,8 @@ class EmbargoedState(ConfigurationModel):
 
     Deprecated by `Country`.
     """
+    process_cache_timeout = 10
+
     # The countries to embargo
     embargoed_countries = models.TextField(
         blank=True,
@@ -629,6 +635,8 @@ class IPFilter(ConfigurationModel):
     """
     Register specific IP addresses to explicitly block or unblock.
     """
+    process_cache_timeout = 10
+
     whitelist = models.TextField(
         blank=True,
         help_text="A comma-separated list of IP addresses that should not fall under embargo restrictions."
@@ -642,11 +650,30 @@ class IPFilter(ConfigurationModel):
     class IPFilterList(object):
         """
         Represent a list of IP addresses with support of networks.
+
+        The networks are compiled into sorted, non-overlapping ranges of
+        integer addresses for each IP version, so that an address is looked
+        up with a binary search however many networks there are.
         """
 
         def __init__(self, ips):
             self.networks = [ipaddr.IPNetwork(ip) for ip in ips]
 
+            # Maps each IP version to the sorted starts and the ends of its ranges.
+            self.ranges = {}
+            for version in set(network.version for network in self.networks):
+                starts, ends = [], []
+                for start, end in sorted(
+                        (int(network.network), int(network.broadcast))
+                        for network in self.networks if network.version == version
+                ):
+                    if ends and start <= ends[-1] + 1:
+                        ends[-1] = max(ends[-1], end)
+                    else:
+                        starts.append(start)
+                        ends.append(end)
+                self.ranges[version] = (starts, ends)
+
         def __iter__(self):
             for network in self.networks:
                 yield network
@@ -657,26 +684,41 @@ class IPFilter(ConfigurationModel):
             except ValueError:
                 return False
 
-            for network in self.networks:
-                if network.Contains(ip):
-                    return True
+            if ip.version not in self.ranges:
+                return False
+            starts, ends = self.ranges[ip.version]
+            ip = int(ip)
+            index = bisect.bisect_right(starts, ip) - 1
+            return index >= 0 and ip <= ends[index]
 
-            return False
+    @classmethod
+    def _ip_filter_list(cls, ips):
+        """
+        Return the IPFilterList of the comma-separated addresses `ips`.
+
+        The lists compiled from the latest whitelist and blacklist are kept
+        in-process, so they are only compiled once per configuration entry.
+        """
+        if ips == '':
+            return []
+        ip_filter_list = _IP_FILTER_LISTS.get(ips)
+        if ip_filter_list is None:
+            ip_filter_list = cls.IPFilterList([addr.strip() for addr in ips.split(',')])
+            if len(_IP_FILTER_LISTS) >= 2:
+                _IP_FILTER_LISTS.clear()
+            _IP_FILTER_LISTS[ips] = ip_filter_list
+        return ip_filter_list
 
     @property
     def whitelist_ips(self):
         """
         Return a list of valid IP addresses to whitelist
         """
-        if self.whitelist == '':
-            return []
-        return self.IPFilterList([addr.strip() for addr in self.whitelist.split(',')])  # pylint: disable=no-member
+        return self._ip_filter_list(self.whitelist)
 
     @property
     def blacklist_ips(self):
         """
         Return a list of valid IP addresses to blacklist
         """
-        if self.blacklist == '':
-            return []
-        return self.IPFilterList([addr.strip() for addr in self.blacklist.split(',')])  # pylint: disable=no-member
+        return self._ip_filter_list(self.blacklist)
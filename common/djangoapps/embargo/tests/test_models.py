@@ -100,6 +100,32 @@ class EmbargoModelsTest(TestCase):
         self.assertTrue('1.1.1.0' in cblacklist)
         self.assertFalse('1.2.0.0' in cblacklist)
 
+    def test_ip_overlapping_networks(self):
+        blacklist = '1.1.0.0/16, 1.1.2.0/24, 1.2.0.0/16, 2001:db8::/32, 1.4.0.1, 10.0.0.0/8'
+        IPFilter(blacklist=blacklist).save()
+
+        cblacklist = IPFilter.current().blacklist_ips
+        for addr in ('1.1.0.0', '1.1.2.3', '1.2.255.255', '1.4.0.1', '10.20.30.40', '2001:db8::1'):
+            self.assertIn(addr, cblacklist)
+        for addr in ('1.0.255.255', '1.3.0.0', '1.4.0.0', '1.4.0.2', '11.0.0.0', '2001:db9::1', '::1', 'invalid'):
+            self.assertNotIn(addr, cblacklist)
+
+    def test_ip_filter_list_compiled_once(self):
+        blacklist = ', '.join('10.{}.{}.0/24'.format(i // 256, i % 256) for i in range(0, 20000, 2))
+        IPFilter(blacklist=blacklist).save()
+
+        self.assertIs(IPFilter.current().blacklist_ips, IPFilter.current().blacklist_ips)
+        cblacklist = IPFilter.current().blacklist_ips
+        self.assertIn('10.0.0.1', cblacklist)
+        self.assertIn('10.78.30.255', cblacklist)
+        self.assertNotIn('10.0.1.1', cblacklist)
+        self.assertNotIn('10.78.31.0', cblacklist)
+
+        IPFilter(blacklist='10.0.1.0/24').save()
+        cblacklist = IPFilter.current().blacklist_ips
+        self.assertNotIn('10.0.0.1', cblacklist)
+        self.assertIn('10.0.1.1', cblacklist)
+
 
 class RestrictedCourseTest(TestCase):
     """Test RestrictedCourse model. """
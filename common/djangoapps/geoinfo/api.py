@@ -0,0 +1,91 @@
+"""
+Process-wide lookup of the country of IP addresses.
+
+The IPv4 and IPv6 GeoIP databases are loaded in memory once per process,
+and reloaded when their file changes. The countries of the most recently
+looked up addresses are kept in a bounded cache.
+"""
+from collections import OrderedDict
+import logging
+import os
+import threading
+
+import pygeoip
+
+from django.conf import settings
+
+log = logging.getLogger(__name__)
+
+# Maps the path of each database to the modification time of its file and
+# the `pygeoip.GeoIP` reading it.
+_DATABASES = {}
+
+# Maps the most recently looked up IP addresses to their country code,
+# least recently used first.
+_COUNTRY_CODES = OrderedDict()
+
+_LOCK = threading.Lock()
+
+
+def _get_database(path):
+    """
+    Returns the `pygeoip.GeoIP` for the database at `path`, loading it in
+    memory if it isn't loaded yet or if its file changed since it was loaded.
+    """
+    mtime = os.path.getmtime(path)
+    loaded = _DATABASES.get(path)
+    if loaded is not None and loaded[0] == mtime:
+        return loaded[1]
+
+    with _LOCK:
+        loaded = _DATABASES.get(path)
+        if loaded is None or loaded[0] != mtime:
+            log.info(u"Loading GeoIP database %s", path)
+            loaded = (mtime, pygeoip.GeoIP(path, pygeoip.MEMORY_CACHE))
+            _DATABASES[path] = loaded
+            # Countries looked up in the previous version of the database may have changed.
+            _COUNTRY_CODES.clear()
+    return loaded[1]
+
+
+def country_code_by_addr(ip_address):
+    """
+    Return the country code associated with an IP address.
+    Handles both IPv4 and IPv6 addresses.
+
+    Args:
+        ip_address (str): The IP address to look up.
+
+    Returns:
+        str: A 2-letter country code.
+
+    """
+    if ip_address.find(':') >= 0:
+        database = _get_database(settings.GEOIPV6_PATH)
+    else:
+        database = _get_database(settings.GEOIP_PATH)
+
+    cache_size = settings.GEOIP_COUNTRY_CACHE_SIZE
+    if not cache_size:
+        return database.country_code_by_addr(ip_address)
+
+    with _LOCK:
+        if ip_address in _COUNTRY_CODES:
+            country_code = _COUNTRY_CODES.pop(ip_address)
+            _COUNTRY_CODES[ip_address] = country_code
+            return country_code
+
+    country_code = database.country_code_by_addr(ip_address)
+    with _LOCK:
+        _COUNTRY_CODES[ip_address] = country_code
+        while len(_COUNTRY_CODES) > cache_size:
+            _COUNTRY_CODES.popitem(last=False)
+    return country_code
+
+
+def clear_country_cache():
+    """
+    Forgets the countries of the recently looked up IP addresses.
+    """
+    with _LOCK:
+        _COUNTRY_CODES.clear()
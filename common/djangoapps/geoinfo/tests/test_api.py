@@ -0,0 +1,66 @@
+"""
+Tests of the lookup of the country of IP addresses.
+"""
+from mock import patch
+import pygeoip
+
+from django.test import TestCase
+from django.test.utils import override_settings
+
+from geoinfo import api as geoinfo_api
+
+
+@override_settings(GEOIP_COUNTRY_CACHE_SIZE=2)
+class CountryCodeByAddrTests(TestCase):
+    """
+    Tests of `country_code_by_addr`.
+    """
+    def setUp(self):
+        super(CountryCodeByAddrTests, self).setUp()
+        geoinfo_api.clear_country_cache()
+        self.addCleanup(geoinfo_api.clear_country_cache)
+        patcher = patch.object(pygeoip.GeoIP, 'country_code_by_addr', return_value='CN')
+        self.mock_country_code_by_addr = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_database_loaded_once(self):
+        with patch('geoinfo.api.pygeoip.GeoIP', wraps=pygeoip.GeoIP) as mock_geoip:
+            geoinfo_api._DATABASES.clear()  # pylint: disable=protected-access
+            self.assertEqual(geoinfo_api.country_code_by_addr('117.79.83.1'), 'CN')
+            self.assertEqual(geoinfo_api.country_code_by_addr('117.79.83.100'), 'CN')
+            self.assertEqual(geoinfo_api.country_code_by_addr('2001:da8:20f:1502:edcf:550b:4a9c:207d'), 'CN')
+            self.assertEqual(mock_geoip.call_count, 2)
+
+    def test_country_cached(self):
+        geoinfo_api.country_code_by_addr('117.79.83.1')
+        self.mock_country_code_by_addr.return_value = 'SD'
+        self.assertEqual(geoinfo_api.country_code_by_addr('117.79.83.1'), 'CN')
+        self.assertEqual(self.mock_country_code_by_addr.call_count, 1)
+
+    def test_least_recently_used_evicted(self):
+        geoinfo_api.country_code_by_addr('1.0.0.1')
+        geoinfo_api.country_code_by_addr('1.0.0.2')
+        geoinfo_api.country_code_by_addr('1.0.0.1')
+        geoinfo_api.country_code_by_addr('1.0.0.3')
+        self.assertEqual(self.mock_country_code_by_addr.call_count, 3)
+
+        # 1.0.0.2 was evicted, 1.0.0.1 wasn't.
+        geoinfo_api.country_code_by_addr('1.0.0.1')
+        self.assertEqual(self.mock_country_code_by_addr.call_count, 3)
+        geoinfo_api.country_code_by_addr('1.0.0.2')
+        self.assertEqual(self.mock_country_code_by_addr.call_count, 4)
+
+    @override_settings(GEOIP_COUNTRY_CACHE_SIZE=0)
+    def test_cache_disabled(self):
+        geoinfo_api.country_code_by_addr('117.79.83.1')
+        geoinfo_api.country_code_by_addr('117.79.83.1')
+        self.assertEqual(self.mock_country_code_by_addr.call_count, 2)
+
+    def test_database_reloaded_when_changed(self):
+        geoinfo_api.country_code_by_addr('117.79.83.1')
+        with patch('geoinfo.api.os.path.getmtime', return_value=0):
+            with patch('geoinfo.api.pygeoip.GeoIP', wraps=pygeoip.GeoIP) as mock_geoip:
+                self.mock_country_code_by_addr.return_value = 'SD'
+                self.assertEqual(geoinfo_api.country_code_by_addr('117.79.83.1'), 'SD')
+                self.assertEqual(geoinfo_api.country_code_by_addr('117.79.83.1'), 'SD')
+                self.assertEqual(mock_geoip.call_count, 1)
@@ -56,6 +56,25 @@ class TestMidcourseReverificationWindow(ModuleStoreTestCase):
             MidcourseReverificationWindow.get_window(self.course_id, datetime.now(pytz.utc))
         )
 
+    def test_get_windows(self):
+        other_course_id = CourseFactory.create().id
+        now = datetime.now(pytz.utc)
+        self.assertEqual(MidcourseReverificationWindow.get_windows([self.course_id, other_course_id], now), {})
+
+        MidcourseReverificationWindowFactory(
+            course_id=other_course_id,
+            start_date=now - timedelta(days=10),
+            end_date=now - timedelta(days=5)
+        )
+        window_valid = MidcourseReverificationWindowFactory(
+            course_id=self.course_id,
+            start_date=now - timedelta(days=3),
+            end_date=now + timedelta(days=3)
+        )
+        with self.assertNumQueries(1):
+            windows = MidcourseReverificationWindow.get_windows([self.course_id, other_course_id], now)
+        self.assertEqual(windows, {self.course_id: window_valid})
+
     def test_no_overlapping_windows(self):
         window_valid = MidcourseReverificationWindow(
             course_id=self.course_id,
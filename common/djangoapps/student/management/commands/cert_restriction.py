@@ -1,7 +1,7 @@
 from django.core.management.base import BaseCommand, CommandError
 import os
 from optparse import make_option
-from student.models import UserProfile
+from student.models import UserProfile, clear_user_identity
 import csv
 
 
@@ -87,8 +87,11 @@ class Command(BaseCommand):
                 raise CommandError(
                     "Unable to read student data from {0}".format(
                         options['import']))
-            UserProfile.objects.filter(user__username__in=students).update(
-                allow_certificate=False)
+            profiles = UserProfile.objects.filter(user__username__in=students)
+            user_ids = list(profiles.values_list('user_id', flat=True))
+            profiles.update(allow_certificate=False)
+            for user_id in user_ids:
+                clear_user_identity(user_id)
 
         elif options['enable']:
 
@@ -1,11 +1,32 @@
 """
-Middleware that checks user standing for the purpose of keeping users with
-disabled accounts from accessing the site.
+Middleware that authenticates users from their cached identity, and checks
+user standing for the purpose of keeping users with disabled accounts from
+accessing the site.
 """
+from django.contrib.auth import SESSION_KEY
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.contrib.auth.models import User
 from django.http import HttpResponseForbidden
 from django.utils.translation import ugettext as _
 from django.conf import settings
-from student.models import UserStanding
+from student.models import UserStanding, get_user_identity
+
+
+class CachedIdentityAuthenticationMiddleware(AuthenticationMiddleware):
+    """
+    Replacement for ``AuthenticationMiddleware`` that sets ``request.user``
+    from the cached identity of the logged in user, see
+    `student.models.get_user_identity`. The user's profile, standing and
+    language preference come along with it, so that authenticating the user,
+    checking their standing and reading their profile take a single cache
+    lookup.
+    """
+    def process_request(self, request):
+        try:
+            request.user = get_user_identity(request.session[SESSION_KEY]).user
+        except (KeyError, User.DoesNotExist):
+            # Fall back to the lazy lookup of the user, anonymous if nobody is logged in.
+            super(CachedIdentityAuthenticationMiddleware, self).process_request(request)
 
 
 class UserStandingMiddleware(object):
@@ -15,14 +36,8 @@ class UserStandingMiddleware(object):
     """
     def process_request(self, request):
         user = request.user
-        try:
-            user_account = UserStanding.objects.get(user=user.id)
-            # because user is a unique field in UserStanding, there will either be
-            # one or zero user_accounts associated with a UserStanding
-        except UserStanding.DoesNotExist:
-            pass
-        else:
-            if user_account.account_status == UserStanding.ACCOUNT_DISABLED:
+        if user.is_authenticated():
+            if get_user_identity(user).account_status == UserStanding.ACCOUNT_DISABLED:
                 msg = _(
                     'Your account has been disabled. If you believe '
                     'this was done in error, please contact us at '
@@ -16,7 +16,7 @@ import json
 import logging
 from pytz import UTC
 import uuid
-from collections import defaultdict, OrderedDict
+from collections import defaultdict, namedtuple, OrderedDict
 import dogstats_wrapper as dog_stats_api
 from django.db.models import Q
 import pytz
@@ -28,8 +28,10 @@ from django.utils import timezone
 from django.contrib.auth.models import User
 from django.contrib.auth.hashers import make_password
 from django.contrib.auth.signals import user_logged_in, user_logged_out
-from django.db import models, IntegrityError, transaction
+from django.core.cache import cache
+from django.db import models, IntegrityError, transaction, DEFAULT_DB_ALIAS
 from django.db.models import Count
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver, Signal
 from django.core.exceptions import ObjectDoesNotExist
 from django.utils.translation import ugettext_noop
@@ -38,12 +40,15 @@ from config_models.models import ConfigurationModel
 from track import contexts
 from eventtracking import tracker
 from importlib import import_module
+from lang_pref import LANGUAGE_KEY
+from crum import get_current_request
 
 from opaque_keys.edx.locations import SlashSeparatedCourseKey
 from xmodule.modulestore import Location
 from opaque_keys import InvalidKeyError
 
 import lms.lib.comment_client as cc
+from util.db import in_dirty_transaction, run_after_commit
 from util.query import use_read_replica_if_available
 from xmodule_django.models import CourseKeyField, NoneToEmptyManager
 from xmodule.modulestore.exceptions import ItemNotFoundError
@@ -55,6 +60,7 @@ from certificates.models import GeneratedCertificate
 from course_modes.models import CourseMode
 
 from ratelimitbackend import admin
+from request_cache.middleware import RequestCache
 
 import analytics
 
@@ -82,20 +88,34 @@ class AnonymousUserId(models.Model):
     unique_together = (user, course_id)
 
 
-def anonymous_id_for_user(user, course_id, save=True):
-    """
-    Return a unique id for a (user, course) pair, suitable for inserting
-    into e.g. personalized survey links.
+# The (user id, course id) pairs whose AnonymousUserId this process found
+# already saved. Pairs it inserts itself aren't added, since their transaction
+# may still be rolled back. The ids never change, so the set is only cleared
+# when it reaches `settings.SAVED_ANONYMOUS_IDS_CACHE_SIZE` pairs.
+_SAVED_ANONYMOUS_IDS = set()
 
-    If user is an `AnonymousUser`, returns `None`
+# Number of users whose AnonymousUserId are looked up in one query.
+ANONYMOUS_IDS_CHUNK_SIZE = 500
 
-    Keyword arguments:
-    save -- Whether the id should be saved in an AnonymousUserId object.
+
+def _mark_anonymous_ids_saved(course_id, user_ids):
     """
-    # This part is for ability to get xblock instance in xblock_noauth handlers, where user is unauthenticated.
-    if user.is_anonymous():
-        return None
+    Remembers that the AnonymousUserId of the users with ids `user_ids` in
+    course `course_id` are saved.
+    """
+    cache_size = settings.SAVED_ANONYMOUS_IDS_CACHE_SIZE
+    if len(user_ids) > cache_size:
+        return
+    if len(_SAVED_ANONYMOUS_IDS) + len(user_ids) > cache_size:
+        _SAVED_ANONYMOUS_IDS.clear()
+    _SAVED_ANONYMOUS_IDS.update((user_id, course_id) for user_id in user_ids)
 
+
+def _anonymous_id_digest(user, course_id):
+    """
+    Returns the anonymous id of `user` in course `course_id`, computed
+    without saving it, and remembers it on `user`.
+    """
     cached_id = getattr(user, '_anonymous_id', {}).get(course_id)
     if cached_id is not None:
         return cached_id
@@ -112,12 +132,34 @@ def anonymous_id_for_user(user, course_id, save=True):
         user._anonymous_id = {}  # pylint: disable=protected-access
 
     user._anonymous_id[course_id] = digest  # pylint: disable=protected-access
+    return digest
 
-    if save is False:
+
+def anonymous_id_for_user(user, course_id, save=True):
+    """
+    Return a unique id for a (user, course) pair, suitable for inserting
+    into e.g. personalized survey links.
+
+    If user is an `AnonymousUser`, returns `None`
+
+    The ids are computed rather than looked up, and once an id is known to
+    be saved, it isn't saved again by the same process. To save the ids of
+    many users at once, use `anonymous_ids_for_users`.
+
+    Keyword arguments:
+    save -- Whether the id should be saved in an AnonymousUserId object.
+    """
+    # This part is for ability to get xblock instance in xblock_noauth handlers, where user is unauthenticated.
+    if user.is_anonymous():
+        return None
+
+    digest = _anonymous_id_digest(user, course_id)
+
+    if save is False or (user.id, course_id) in _SAVED_ANONYMOUS_IDS:
         return digest
 
     try:
-        anonymous_user_id, __ = AnonymousUserId.objects.get_or_create(
+        anonymous_user_id, created = AnonymousUserId.objects.get_or_create(
             defaults={'anonymous_user_id': digest},
             user=user,
             course_id=course_id
@@ -135,10 +177,79 @@ def anonymous_id_for_user(user, course_id, save=True):
         # Another thread has already created this entry, so
         # continue
         pass
+    else:
+        if not created:
+            _mark_anonymous_ids_saved(course_id, [user.id])
 
     return digest
 
 
+def anonymous_ids_for_users(users, course_id, save=True):
+    """
+    Returns a dict mapping the ids of `users` to their unique ids in course
+    `course_id`, as returned by `anonymous_id_for_user`. Anonymous users are
+    left out.
+
+    The missing AnonymousUserId objects are saved with a single bulk insert,
+    after looking the existing ones up with a query per
+    ANONYMOUS_IDS_CHUNK_SIZE users. The ids are also remembered on each
+    user, so that calling `anonymous_id_for_user` for them afterwards
+    doesn't query the database.
+
+    Keyword arguments:
+    save -- Whether the ids should be saved in AnonymousUserId objects.
+    """
+    users = [user for user in users if not user.is_anonymous()]
+    digests = {user.id: _anonymous_id_digest(user, course_id) for user in users}
+    if save is False:
+        return digests
+
+    unsaved_user_ids = [
+        user_id for user_id in digests
+        if (user_id, course_id) not in _SAVED_ANONYMOUS_IDS
+    ]
+    saved_ids = {}
+    for start in xrange(0, len(unsaved_user_ids), ANONYMOUS_IDS_CHUNK_SIZE):
+        saved_ids.update(
+            AnonymousUserId.objects.filter(
+                user_id__in=unsaved_user_ids[start:start + ANONYMOUS_IDS_CHUNK_SIZE],
+                course_id=course_id,
+            ).values_list('user_id', 'anonymous_user_id')
+        )
+
+    for user_id, anonymous_user_id in saved_ids.iteritems():
+        if anonymous_user_id != digests[user_id]:
+            log.error(
+                u"Stored anonymous user id %r for user %r "
+                u"in course %r doesn't match computed id %r",
+                user_id,
+                course_id,
+                anonymous_user_id,
+                digests[user_id]
+            )
+
+    new_user_ids = set(unsaved_user_ids) - set(saved_ids)
+    if new_user_ids:
+        savepoint = transaction.savepoint()
+        try:
+            AnonymousUserId.objects.bulk_create([
+                AnonymousUserId(user_id=user_id, course_id=course_id, anonymous_user_id=digests[user_id])
+                for user_id in new_user_ids
+            ])
+        except IntegrityError:
+            # Another thread has already created some of these entries, so
+            # save them one by one.
+            transaction.savepoint_rollback(savepoint)
+            for user in users:
+                if user.id in new_user_ids:
+                    anonymous_id_for_user(user, course_id)
+        else:
+            transaction.savepoint_commit(savepoint)
+
+    _mark_anonymous_ids_saved(course_id, saved_ids.keys())
+    return digests
+
+
 def user_by_anonymous_id(uid):
     """
     Return user by anonymous_user_id using AnonymousUserId lookup table.
@@ -283,6 +394,129 @@ class UserProfile(models.Model):
         self.save()
 
 
+# A user along with their profile, the status of their account and their
+# preferred language, as returned by `get_user_identity`. `profile`,
+# `account_status` and `language` are None when the user has none.
+UserIdentity = namedtuple('UserIdentity', ['user', 'profile', 'account_status', 'language'])  # pylint: disable=invalid-name
+
+IDENTITY_CACHE_KEY = u"student.identity.{user_id}"
+
+
+def get_user_identity(user):
+    """
+    Returns the UserIdentity of `user`, a User or the id of one.
+
+    The identity is looked up once per User instance, i.e. once per request
+    for `request.user`, and is cached for `settings.USER_IDENTITY_CACHE_TIMEOUT`
+    seconds as a single entry of the shared cache. Saving or deleting the
+    user, their profile, standing or language preference invalidates it.
+
+    The profile is also set on the returned user, so that `user.profile`
+    doesn't query the database.
+
+    Raises User.DoesNotExist if there is no such user.
+    """
+    identity = getattr(user, '_identity', None)
+    if identity is not None:
+        return identity
+
+    user_id = getattr(user, 'id', user)
+    timeout = settings.USER_IDENTITY_CACHE_TIMEOUT
+    cache_key = IDENTITY_CACHE_KEY.format(user_id=user_id)
+    fields = cache.get(cache_key) if timeout else None
+    if fields is None:
+        fields = _load_user_identity_fields(user_id)
+        if timeout:
+            cache.set(cache_key, fields, timeout)
+
+    identity_user = _instance_from_fields(User, fields['user'])
+    profile = None
+    if fields['profile'] is not None:
+        profile = _instance_from_fields(UserProfile, fields['profile'])
+        setattr(profile, UserProfile._meta.get_field('user').get_cache_name(), identity_user)  # pylint: disable=protected-access
+        setattr(identity_user, User.profile.cache_name, profile)
+    identity = UserIdentity(identity_user, profile, fields['account_status'], fields['language'])
+
+    identity_user._identity = identity  # pylint: disable=protected-access
+    if isinstance(user, User):
+        user._identity = identity  # pylint: disable=protected-access
+    return identity
+
+
+def _load_user_identity_fields(user_id):
+    """
+    Returns the field values making up the identity of the user with id
+    `user_id`, as cached by `get_user_identity`, from the database.
+    """
+    # TODO: remove circular dependency on openedx from common
+    from openedx.core.djangoapps.user_api.models import UserPreference
+
+    user = User.objects.get(id=user_id)
+    try:
+        profile = _instance_fields(UserProfile.objects.get(user_id=user_id))
+    except UserProfile.DoesNotExist:
+        profile = None
+    account_statuses = UserStanding.objects.filter(user_id=user_id).values_list('account_status', flat=True)
+    languages = UserPreference.objects.filter(user_id=user_id, key=LANGUAGE_KEY).values_list('value', flat=True)
+    return {
+        'user': _instance_fields(user),
+        'profile': profile,
+        'account_status': account_statuses[0] if account_statuses else None,
+        'language': languages[0] if languages else None,
+    }
+
+
+def _instance_fields(instance):
+    """
+    Returns a dict mapping the attribute names of the fields of the model
+    instance `instance` to their values.
+    """
+    return {field.attname: getattr(instance, field.attname) for field in instance._meta.fields}  # pylint: disable=protected-access
+
+
+def _instance_from_fields(model, fields):
+    """
+    Returns the existing `model` instance whose fields have the values in
+    `fields`, as returned by `_instance_fields`.
+    """
+    instance = model(**fields)
+    # The instance exists in the database, so saving it must update it.
+    instance._state.adding = False  # pylint: disable=protected-access
+    instance._state.db = DEFAULT_DB_ALIAS  # pylint: disable=protected-access
+    return instance
+
+
+def clear_user_identity(user_id):
+    """
+    Drops the cached identity of the user with id `user_id`.
+
+    Needed after changes the model save signals don't notice, such as
+    `QuerySet.update`.
+    """
+    cache.delete(IDENTITY_CACHE_KEY.format(user_id=user_id))
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user_identity(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """
+    Invalidates the cached identity of a user when they are saved or deleted.
+    """
+    clear_user_identity(instance.id)
+
+
+@receiver(post_save, sender=UserProfile)
+@receiver(post_delete, sender=UserProfile)
+@receiver(post_save, sender=UserStanding)
+@receiver(post_delete, sender=UserStanding)
+def invalidate_user_identity_parts(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """
+    Invalidates the cached identity of a user when their profile or standing
+    is saved or deleted.
+    """
+    clear_user_identity(instance.user_id)
+
+
 class UserSignupSource(models.Model):
     """
     This table contains information about users registering
@@ -640,6 +874,30 @@ class AlreadyEnrolledError(CourseEnrollmentException):
     pass
 
 
+# The state of a user's enrollment in a course, as cached by CourseEnrollment.
+# All the fields are None if the user has no enrollment record for the course.
+EnrollmentState = namedtuple('EnrollmentState', ['id', 'mode', 'is_active', 'created'])  # pylint: disable=invalid-name
+NO_ENROLLMENT = EnrollmentState(None, None, None, None)
+
+ENROLLMENT_CACHE_KEY = u"student.enrollment.{user_id}.{course_id}"
+
+
+def _enrollment_request_cache():
+    """
+    Returns the dict caching the enrollment states looked up in the current
+    request, or None outside of a request.
+
+    The dict maps `(user_id, course_key)` to EnrollmentState under 'states',
+    and has the ids of the users whose enrollments were all prefetched
+    under 'prefetched_users'.
+    """
+    if get_current_request() is None:
+        return None
+    return RequestCache.get_request_cache().data.setdefault(
+        'course_enrollments', {'states': {}, 'prefetched_users': set()}
+    )
+
+
 class CourseEnrollment(models.Model):
     """
     Represents a Student's Enrollment record for a single Course. You should
@@ -703,6 +961,17 @@ class CourseEnrollment(models.Model):
         if user.id is None:
             user.save()
 
+        state = cls._get_enrollment_state(user, course_key)
+        if state.id is not None:
+            return cls(
+                id=state.id,
+                user=user,
+                course_id=course_key,
+                mode=state.mode,
+                is_active=state.is_active,
+                created=state.created,
+            )
+
         enrollment, created = CourseEnrollment.objects.get_or_create(
             user=user,
             course_id=course_key,
@@ -1016,11 +1285,7 @@ class CourseEnrollment(models.Model):
 
         `course_id` is our usual course_id string (e.g. "edX/Test101/2013_Fall)
         """
-        try:
-            record = CourseEnrollment.objects.get(user=user, course_id=course_key)
-            return record.is_active
-        except cls.DoesNotExist:
-            return False
+        return bool(cls._get_enrollment_state(user, course_key).is_active)
 
     @classmethod
     def is_enrolled_by_partial(cls, user, course_id_partial):
@@ -1062,11 +1327,72 @@ class CourseEnrollment(models.Model):
             and is_active is whether the enrollment is active.
         Returns (None, None) if the courseenrollment record does not exist.
         """
+        state = cls._get_enrollment_state(user, course_id)
+        return (state.mode, state.is_active)
+
+    @classmethod
+    def _get_enrollment_state(cls, user, course_key):
+        """
+        Returns the EnrollmentState of `user` in the course `course_key`.
+
+        The state is cached for the current request, and for
+        `settings.COURSE_ENROLLMENT_CACHE_TIMEOUT` seconds in the shared cache
+        unless it was read in a transaction with uncommitted changes. Saving
+        or deleting the enrollment invalidates both.
+        """
+        if user.id is None:
+            return cls._load_enrollment_state(user, course_key)
+
+        request_cache = _enrollment_request_cache()
+        if request_cache is not None:
+            state = request_cache['states'].get((user.id, course_key))
+            if state is not None:
+                return state
+            if user.id in request_cache['prefetched_users']:
+                return NO_ENROLLMENT
+
+        timeout = settings.COURSE_ENROLLMENT_CACHE_TIMEOUT
+        cache_key = ENROLLMENT_CACHE_KEY.format(user_id=user.id, course_id=course_key)
+        state = cache.get(cache_key) if timeout else None
+        if state is None:
+            state = cls._load_enrollment_state(user, course_key)
+            if timeout and not in_dirty_transaction():
+                cache.set(cache_key, state, timeout)
+
+        if request_cache is not None:
+            request_cache['states'][(user.id, course_key)] = state
+        return state
+
+    @classmethod
+    def _load_enrollment_state(cls, user, course_key):
+        """
+        Returns the EnrollmentState of `user` in the course `course_key` from the database.
+        """
         try:
-            record = CourseEnrollment.objects.get(user=user, course_id=course_id)
-            return (record.mode, record.is_active)
+            record = CourseEnrollment.objects.get(user=user, course_id=course_key)
         except cls.DoesNotExist:
-            return (None, None)
+            return NO_ENROLLMENT
+        return EnrollmentState(record.id, record.mode, record.is_active, record.created)
+
+    @classmethod
+    def prefetch_enrollments_for_user(cls, user):
+        """
+        Returns all the enrollment records of `user`, active or not, loading
+        them in a single query.
+
+        During a request, their states are also cached for the rest of the
+        request, so that looking up the user's enrollment in any course, e.g.
+        with `is_enrolled`, doesn't query the database again.
+        """
+        enrollments = list(CourseEnrollment.objects.filter(user=user))
+        request_cache = _enrollment_request_cache()
+        if request_cache is not None and user.id is not None:
+            for record in enrollments:
+                request_cache['states'][(user.id, record.course_id)] = EnrollmentState(
+                    record.id, record.mode, record.is_active, record.created
+                )
+            request_cache['prefetched_users'].add(user.id)
+        return enrollments
 
     @classmethod
     def enrollments_for_user(cls, user):
@@ -1096,11 +1422,14 @@ class CourseEnrollment(models.Model):
         enroll_dict['total'] = total
         return enroll_dict
 
-    def is_paid_course(self):
+    def is_paid_course(self, modes_dict=None):
         """
         Returns True, if course is paid
+
+        `modes_dict` maps the slugs of the course's unexpired modes to the
+        modes, if they are already loaded.
         """
-        paid_course = CourseMode.is_white_label(self.course_id)
+        paid_course = CourseMode.is_white_label(self.course_id, modes_dict=modes_dict)
         if paid_course or CourseMode.is_professional_slug(self.mode):
             return True
 
@@ -1120,10 +1449,13 @@ class CourseEnrollment(models.Model):
         """Changes this `CourseEnrollment` record's mode to `mode`.  Saves immediately."""
         self.update_enrollment(mode=mode)
 
-    def refundable(self):
+    def refundable(self, user_certificates=None, course_modes=None):
         """
         For paid/verified certificates, students may receive a refund if they have
         a verified certificate and the deadline for refunds has not yet passed.
+
+        To avoid querying them, `user_certificates` can map course ids to the
+        user's certificates, and `course_modes` can list the course's unexpired modes.
         """
         # In order to support manual refunds past the deadline, set can_refund on this object.
         # On unenrolling, the "UNENROLL_DONE" signal calls CertificateItem.refund_cert_callback(),
@@ -1134,12 +1466,16 @@ class CourseEnrollment(models.Model):
             return True
 
         # If the student has already been given a certificate they should not be refunded
-        if GeneratedCertificate.certificate_for_student(self.user, self.course_id) is not None:
+        if user_certificates is None:
+            certificate = GeneratedCertificate.certificate_for_student(self.user, self.course_id)
+        else:
+            certificate = user_certificates.get(self.course_id)
+        if certificate is not None:
             return False
 
         #TODO - When Course administrators to define a refund period for paid courses then refundable will be supported. # pylint: disable=fixme
 
-        course_mode = CourseMode.mode_for_course(self.course_id, 'verified')
+        course_mode = CourseMode.mode_for_course(self.course_id, 'verified', modes=course_modes)
         if course_mode is None:
             return False
         else:
@@ -1160,6 +1496,25 @@ class CourseEnrollment(models.Model):
         return CourseMode.is_verified_slug(self.mode)
 
 
+@receiver(post_save, sender=CourseEnrollment)
+@receiver(post_delete, sender=CourseEnrollment)
+def invalidate_enrollment_cache(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """
+    Invalidates the cached state of an enrollment when it is saved, e.g. by
+    `update_enrollment`, or deleted.
+
+    The shared cache entry is deleted again once the change is committed,
+    since other processes may cache the state they still read until then.
+    """
+    cache_key = ENROLLMENT_CACHE_KEY.format(user_id=instance.user_id, course_id=instance.course_id)
+    cache.delete(cache_key)
+    run_after_commit(lambda: cache.delete(cache_key))
+    request_cache = _enrollment_request_cache()
+    if request_cache is not None:
+        request_cache['states'].pop((instance.user_id, instance.course_id), None)
+        request_cache['prefetched_users'].discard(instance.user_id)
+
+
 class CourseEnrollmentAllowed(models.Model):
     """
     Table of users (specified by email address strings) who are allowed to enroll in a specified course.
@@ -1381,6 +1736,8 @@ class DashboardConfiguration(ConfigurationModel):
     Includes configuration options for the dashboard, which impact behavior and rendering for the application.
 
     """
+    process_cache_timeout = 10
+
     recent_enrollment_time_delta = models.PositiveIntegerField(
         default=0,
         help_text="The number of seconds in which a new enrollment is considered 'recent'. "
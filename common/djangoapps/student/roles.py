@@ -5,10 +5,17 @@ adding users, removing users, and listing members
 
 from abc import ABCMeta, abstractmethod
 
+from crum import get_current_request
+from django.conf import settings
 from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
 import logging
 
+from request_cache.middleware import RequestCache
 from student.models import CourseAccessRole
+from util.db import in_dirty_transaction, run_after_commit
 from xmodule_django.models import CourseKeyField
 
 
@@ -17,6 +24,8 @@ log = logging.getLogger(__name__)
 # A list of registered access roles.
 REGISTERED_ACCESS_ROLES = {}
 
+ROLE_CACHE_KEY = u"student.roles.{user_id}"
+
 
 def register_access_role(cls):
     """
@@ -34,25 +43,148 @@ def register_access_role(cls):
     return cls
 
 
+def _role_request_cache():
+    """
+    Returns the dict mapping user ids to the roles of the users looked up in
+    the current request, or None outside of a request.
+    """
+    if get_current_request() is None:
+        return None
+    return RequestCache.get_request_cache().data.setdefault('access_roles', {})
+
+
+def _access_role_key(access_role):
+    """
+    Returns the (role, course_id, org) tuple identifying a CourseAccessRole in a RoleCache.
+    """
+    course_id = access_role.course_id
+    return (access_role.role, unicode(course_id) if course_id is not None else None, access_role.org)
+
+
 class RoleCache(object):
     """
     A cache of the CourseAccessRoles held by a particular user
+
+    The roles of a user are shared by all of the user's RoleCaches in the
+    current request, and kept for `settings.ACCESS_ROLE_CACHE_TIMEOUT` seconds
+    in the shared cache, until the user's roles change. Roles read in a
+    transaction with uncommitted changes aren't put in the shared cache.
     """
-    def __init__(self, user):
-        self._roles = set(
-            CourseAccessRole.objects.filter(user=user).all()
-        )
+    def __init__(self, user, roles=None):
+        if roles is None:
+            roles = self._get_roles(user)
+        self._roles = roles
+
+    @classmethod
+    def _get_roles(cls, user):
+        """
+        Returns the frozenset of (role, course_id, org) tuples of `user`'s roles, course_id being unicode.
+        """
+        request_cache = _role_request_cache()
+        if request_cache is not None and user.id in request_cache:
+            return request_cache[user.id]
+
+        timeout = settings.ACCESS_ROLE_CACHE_TIMEOUT
+        cache_key = ROLE_CACHE_KEY.format(user_id=user.id)
+        roles = cache.get(cache_key) if timeout else None
+        if roles is None:
+            roles = frozenset(_access_role_key(access_role) for access_role in CourseAccessRole.objects.filter(user=user))
+            if timeout and not in_dirty_transaction():
+                cache.set(cache_key, roles, timeout)
+
+        if request_cache is not None:
+            request_cache[user.id] = roles
+        return roles
+
+    @classmethod
+    def prefetch(cls, users):
+        """
+        Sets the RoleCache of each of `users`, loading the roles of all the
+        users that aren't cached yet in one query.
+        """
+        # pylint: disable=protected-access
+        users = [user for user in users if not hasattr(user, '_roles') and user.id is not None]
+        if not users:
+            return
+
+        request_cache = _role_request_cache()
+        timeout = settings.ACCESS_ROLE_CACHE_TIMEOUT
+        roles_by_user_id = {}
+        if request_cache is not None:
+            roles_by_user_id.update(
+                (user.id, request_cache[user.id]) for user in users if user.id in request_cache
+            )
+        if timeout:
+            cache_keys = dict(
+                (ROLE_CACHE_KEY.format(user_id=user.id), user.id)
+                for user in users if user.id not in roles_by_user_id
+            )
+            cached = cache.get_many(cache_keys.keys())
+            roles_by_user_id.update((cache_keys[key], roles) for key, roles in cached.iteritems())
+
+        missing_user_ids = set(user.id for user in users) - set(roles_by_user_id)
+        if missing_user_ids:
+            loaded = dict((user_id, set()) for user_id in missing_user_ids)
+            for access_role in CourseAccessRole.objects.filter(user__id__in=missing_user_ids):
+                loaded[access_role.user_id].add(_access_role_key(access_role))
+            loaded = dict((user_id, frozenset(roles)) for user_id, roles in loaded.iteritems())
+            if timeout and not in_dirty_transaction():
+                cache.set_many(
+                    dict((ROLE_CACHE_KEY.format(user_id=user_id), roles) for user_id, roles in loaded.iteritems()),
+                    timeout
+                )
+            roles_by_user_id.update(loaded)
+
+        if request_cache is not None:
+            request_cache.update(roles_by_user_id)
+        for user in users:
+            user._roles = cls(user, roles_by_user_id[user.id])
+
+    @classmethod
+    def invalidate(cls, user_id):
+        """
+        Forgets the cached roles of the user with id `user_id`.
+
+        The shared cache entry is deleted again once the change is committed,
+        since other processes may cache the roles they still read until then.
+        """
+        cache_key = ROLE_CACHE_KEY.format(user_id=user_id)
+        cache.delete(cache_key)
+        run_after_commit(lambda: cache.delete(cache_key))
+        request_cache = _role_request_cache()
+        if request_cache is not None:
+            request_cache.pop(user_id, None)
 
     def has_role(self, role, course_id, org):
         """
         Return whether this RoleCache contains a role with the specified role, course_id, and org
         """
-        return any(
-            access_role.role == role and
-            access_role.course_id == course_id and
-            access_role.org == org
-            for access_role in self._roles
-        )
+        return (role, unicode(course_id) if course_id is not None else None, org) in self._roles
+
+
+@receiver(post_save, sender=CourseAccessRole)
+@receiver(post_delete, sender=CourseAccessRole)
+def invalidate_role_cache(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """
+    Invalidates the cached roles of a user when one of the user's roles is added or removed.
+    """
+    RoleCache.invalidate(instance.user_id)
+
+
+def check_course_roles(role_name, user_course_pairs):
+    """
+    Returns a list with whether the user of each (user, course_key) pair in
+    `user_course_pairs` has the role `role_name` in the course, either for the
+    course itself or for its whole org.
+
+    The roles of all the users are loaded at once, so that this can be used to
+    check many users or courses, e.g. for listings.
+    """
+    RoleCache.prefetch([user for user, __ in user_course_pairs])
+    return [
+        CourseRole(role_name, course_key).has_user(user) or OrgRole(role_name, course_key.org).has_user(user)
+        for user, course_key in user_course_pairs
+    ]
 
 
 class AccessRole(object):
@@ -0,0 +1,124 @@
+"""
+Tests of the caching of CourseEnrollment lookups.
+"""
+from django.core.cache import cache
+from django.db import transaction
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import override_settings
+from mock import Mock, patch
+from opaque_keys.edx.locations import SlashSeparatedCourseKey
+
+from request_cache.middleware import RequestCache
+from student.models import ENROLLMENT_CACHE_KEY, NO_ENROLLMENT, CourseEnrollment
+from student.tests.factories import UserFactory
+
+
+class EnrollmentCacheTestCase(TestCase):
+    """
+    Tests of the shared and request caches of enrollments.
+    """
+    def setUp(self):
+        super(EnrollmentCacheTestCase, self).setUp()
+        patcher = patch('student.models.tracker')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        cache.clear()
+        RequestCache().clear_request_cache()
+        self.addCleanup(RequestCache().clear_request_cache)
+        self.user = UserFactory.create()
+        self.course_key = SlashSeparatedCourseKey("edX", "Test101", "2013")
+        self.other_course_key = SlashSeparatedCourseKey("edX", "Test102", "2013")
+
+    def _in_request(self):
+        """
+        Returns a context manager making lookups happen as if during a request.
+        """
+        return patch('student.models.get_current_request', return_value=Mock())
+
+    def test_cached_in_request(self):
+        CourseEnrollment.enroll(self.user, self.course_key)
+        with self._in_request():
+            self.assertTrue(CourseEnrollment.is_enrolled(self.user, self.course_key))
+            with self.assertNumQueries(0):
+                self.assertTrue(CourseEnrollment.is_enrolled(self.user, self.course_key))
+
+            CourseEnrollment.unenroll(self.user, self.course_key)
+            self.assertFalse(CourseEnrollment.is_enrolled(self.user, self.course_key))
+
+        # Outside of a request, enrollments aren't cached when the shared cache is disabled.
+        with self.assertNumQueries(1):
+            self.assertFalse(CourseEnrollment.is_enrolled(self.user, self.course_key))
+
+    def test_prefetch_enrollments(self):
+        CourseEnrollment.enroll(self.user, self.course_key, mode="verified")
+        with self._in_request():
+            with self.assertNumQueries(1):
+                enrollments = CourseEnrollment.prefetch_enrollments_for_user(self.user)
+            self.assertEqual([enrollment.course_id for enrollment in enrollments], [self.course_key])
+
+            with self.assertNumQueries(0):
+                self.assertTrue(CourseEnrollment.is_enrolled(self.user, self.course_key))
+                self.assertFalse(CourseEnrollment.is_enrolled(self.user, self.other_course_key))
+                self.assertEqual(
+                    CourseEnrollment.enrollment_mode_for_user(self.user, self.course_key), ("verified", True)
+                )
+
+            CourseEnrollment.enroll(self.user, self.other_course_key)
+            self.assertTrue(CourseEnrollment.is_enrolled(self.user, self.other_course_key))
+
+
+@override_settings(COURSE_ENROLLMENT_CACHE_TIMEOUT=60)
+class SharedEnrollmentCacheTestCase(TransactionTestCase):
+    """
+    Tests of the shared cache of enrollments, which only caches committed enrollments.
+    """
+    def setUp(self):
+        super(SharedEnrollmentCacheTestCase, self).setUp()
+        patcher = patch('student.models.tracker')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        cache.clear()
+        self.user = UserFactory.create()
+        self.course_key = SlashSeparatedCourseKey("edX", "Test101", "2013")
+
+    def test_cached_across_requests(self):
+        self.assertFalse(CourseEnrollment.is_enrolled(self.user, self.course_key))
+        with self.assertNumQueries(0):
+            self.assertFalse(CourseEnrollment.is_enrolled(self.user, self.course_key))
+
+        CourseEnrollment.enroll(self.user, self.course_key, mode="audit")
+        self.assertTrue(CourseEnrollment.is_enrolled(self.user, self.course_key))
+        with self.assertNumQueries(0):
+            self.assertEqual(CourseEnrollment.enrollment_mode_for_user(self.user, self.course_key), ("audit", True))
+
+        CourseEnrollment.unenroll(self.user, self.course_key)
+        self.assertEqual(CourseEnrollment.enrollment_mode_for_user(self.user, self.course_key), ("audit", False))
+
+    def test_get_or_create_cached_enrollment(self):
+        enrollment = CourseEnrollment.enroll(self.user, self.course_key)
+        CourseEnrollment.is_enrolled(self.user, self.course_key)
+        with self.assertNumQueries(0):
+            cached_enrollment = CourseEnrollment.get_or_create_enrollment(self.user, self.course_key)
+        self.assertEqual(cached_enrollment.id, enrollment.id)
+        self.assertEqual(cached_enrollment.created, enrollment.created)
+
+        cached_enrollment.update_enrollment(is_active=False)
+        self.assertFalse(CourseEnrollment.is_enrolled(self.user, self.course_key))
+        self.assertFalse(CourseEnrollment.objects.get(id=enrollment.id).is_active)
+
+    def test_not_cached_before_commit(self):
+        self.assertFalse(CourseEnrollment.is_enrolled(self.user, self.course_key))
+        with self.assertRaises(ValueError):
+            with transaction.commit_on_success():
+                CourseEnrollment.enroll(self.user, self.course_key)
+                self.assertTrue(CourseEnrollment.is_enrolled(self.user, self.course_key))
+                raise ValueError()
+        self.assertFalse(CourseEnrollment.is_enrolled(self.user, self.course_key))
+
+    def test_invalidated_after_commit(self):
+        self.assertFalse(CourseEnrollment.is_enrolled(self.user, self.course_key))
+        with transaction.commit_on_success():
+            CourseEnrollment.enroll(self.user, self.course_key)
+            # Another process caching the state it read before the commit
+            cache.set(ENROLLMENT_CACHE_KEY.format(user_id=self.user.id, course_id=self.course_key), NO_ENROLLMENT, 60)
+        self.assertTrue(CourseEnrollment.is_enrolled(self.user, self.course_key))
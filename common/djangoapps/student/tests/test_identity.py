@@ -0,0 +1,103 @@
+"""
+Tests of the cached identity of users and of the middleware using it.
+"""
+from django.contrib.auth import SESSION_KEY
+from django.core.cache import cache
+from django.test import TestCase
+from django.test.client import RequestFactory
+from django.test.utils import override_settings
+
+from lang_pref import LANGUAGE_KEY
+from openedx.core.djangoapps.user_api.models import UserPreference
+from student.middleware import CachedIdentityAuthenticationMiddleware, UserStandingMiddleware
+from student.models import UserStanding, get_user_identity
+from student.tests.factories import UserFactory, UserStandingFactory
+
+
+@override_settings(USER_IDENTITY_CACHE_TIMEOUT=60)
+class UserIdentityTestCase(TestCase):
+    """
+    Tests of `get_user_identity`.
+    """
+    def setUp(self):
+        super(UserIdentityTestCase, self).setUp()
+        cache.clear()
+        self.user = UserFactory.create()
+
+    def test_cached(self):
+        name = self.user.profile.name
+        identity = get_user_identity(self.user.id)
+        self.assertEqual(identity.user, self.user)
+        self.assertEqual(identity.profile.name, name)
+        self.assertIsNone(identity.account_status)
+        self.assertIsNone(identity.language)
+
+        with self.assertNumQueries(0):
+            identity = get_user_identity(self.user.id)
+            self.assertEqual(identity.user.username, self.user.username)
+            self.assertEqual(identity.user.profile.name, name)
+            self.assertEqual(identity.user.profile.user, identity.user)
+
+    def test_looked_up_once_per_user_instance(self):
+        identity = get_user_identity(self.user)
+        cache.clear()
+        with self.assertNumQueries(0):
+            self.assertIs(get_user_identity(self.user), identity)
+            self.assertIs(get_user_identity(identity.user), identity)
+
+    def test_invalidated(self):
+        get_user_identity(self.user.id)
+        self.user.profile.name = u"New name"
+        self.user.profile.save()
+        self.assertEqual(get_user_identity(self.user.id).profile.name, u"New name")
+
+        UserStandingFactory.create(
+            user=self.user, account_status=UserStanding.ACCOUNT_DISABLED, changed_by=UserFactory.create()
+        )
+        self.assertEqual(get_user_identity(self.user.id).account_status, UserStanding.ACCOUNT_DISABLED)
+
+        UserPreference.set_preference(self.user, LANGUAGE_KEY, 'eo')
+        self.assertEqual(get_user_identity(self.user.id).language, 'eo')
+
+        self.user.email = 'new@example.com'
+        self.user.save()
+        self.assertEqual(get_user_identity(self.user.id).user.email, 'new@example.com')
+
+    def test_cached_user_saved(self):
+        user = get_user_identity(self.user.id).user
+        user.first_name = u"Robert"
+        user.save()
+        self.assertEqual(get_user_identity(self.user.id).user.first_name, u"Robert")
+
+
+@override_settings(USER_IDENTITY_CACHE_TIMEOUT=60)
+class IdentityMiddlewareTestCase(TestCase):
+    """
+    Tests of the authentication and standing middleware.
+    """
+    def setUp(self):
+        super(IdentityMiddlewareTestCase, self).setUp()
+        cache.clear()
+        self.user = UserFactory.create()
+        self.request = RequestFactory().get('/')
+        self.request.session = {SESSION_KEY: self.user.id}
+
+    def test_authenticated_from_cache(self):
+        get_user_identity(self.user.id)
+        with self.assertNumQueries(0):
+            CachedIdentityAuthenticationMiddleware().process_request(self.request)
+            self.assertEqual(self.request.user, self.user)
+            self.assertIsNone(UserStandingMiddleware().process_request(self.request))
+
+    def test_anonymous(self):
+        self.request.session = {}
+        CachedIdentityAuthenticationMiddleware().process_request(self.request)
+        self.assertFalse(self.request.user.is_authenticated())
+        self.assertIsNone(UserStandingMiddleware().process_request(self.request))
+
+    def test_disabled_account(self):
+        UserStandingFactory.create(
+            user=self.user, account_status=UserStanding.ACCOUNT_DISABLED, changed_by=UserFactory.create()
+        )
+        CachedIdentityAuthenticationMiddleware().process_request(self.request)
+        self.assertEqual(UserStandingMiddleware().process_request(self.request).status_code, 403)
@@ -2,15 +2,21 @@
 Tests of student.roles
 """
 import ddt
-from django.test import TestCase
+from django.contrib.auth.models import User
+from django.core.cache import cache as django_cache
+from django.db import transaction
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import override_settings
+from mock import Mock, patch
 
 from courseware.tests.factories import UserFactory, StaffFactory, InstructorFactory
 from student.tests.factories import AnonymousUserFactory
 
 from student.roles import (
     GlobalStaff, CourseRole, CourseStaffRole, CourseInstructorRole,
-    OrgStaffRole, OrgInstructorRole, RoleCache, CourseBetaTesterRole
+    OrgStaffRole, OrgInstructorRole, RoleCache, CourseBetaTesterRole, check_course_roles
 )
+from request_cache.middleware import RequestCache
 from opaque_keys.edx.locations import SlashSeparatedCourseKey
 
 
@@ -191,3 +197,87 @@ class RoleCacheTestCase(TestCase):
     def test_empty_cache(self, role, target):
         cache = RoleCache(self.user)
         self.assertFalse(cache.has_role(*target))
+
+
+class SharedRoleCacheTestCase(TestCase):
+    """
+    Tests of the caching of roles across RoleCaches.
+    """
+    def setUp(self):
+        super(SharedRoleCacheTestCase, self).setUp()
+        django_cache.clear()
+        RequestCache().clear_request_cache()
+        self.addCleanup(RequestCache().clear_request_cache)
+        self.course_key = SlashSeparatedCourseKey('edX', 'toy', '2012_Fall')
+        self.other_course_key = SlashSeparatedCourseKey('edX', 'toy', '2013_Fall')
+        self.user = UserFactory()
+
+    def _fresh_user(self):
+        """Returns a new object for self.user, without its RoleCache."""
+        return User.objects.get(id=self.user.id)
+
+    def test_shared_in_request(self):
+        CourseStaffRole(self.course_key).add_users(self.user)
+        with patch('student.roles.get_current_request', return_value=Mock()):
+            self.assertTrue(CourseStaffRole(self.course_key).has_user(self._fresh_user()))
+            user = self._fresh_user()
+            with self.assertNumQueries(0):
+                self.assertTrue(CourseStaffRole(self.course_key).has_user(user))
+
+            CourseStaffRole(self.course_key).remove_users(self.user)
+            self.assertFalse(CourseStaffRole(self.course_key).has_user(self._fresh_user()))
+
+    def test_check_course_roles(self):
+        other_user = UserFactory()
+        CourseStaffRole(self.course_key).add_users(self.user)
+        OrgStaffRole(self.course_key.org).add_users(other_user)
+        pairs = [
+            (self._fresh_user(), self.course_key),
+            (self._fresh_user(), self.other_course_key),
+            (User.objects.get(id=other_user.id), self.other_course_key),
+        ]
+        with self.assertNumQueries(1):
+            self.assertEqual(check_course_roles('staff', pairs), [True, False, True])
+        self.assertEqual(check_course_roles('instructor', pairs), [False, False, False])
+
+
+@override_settings(ACCESS_ROLE_CACHE_TIMEOUT=60)
+class CommittedRoleCacheTestCase(TransactionTestCase):
+    """
+    Tests of the caching of roles across requests, which only caches committed roles.
+    """
+    def setUp(self):
+        super(CommittedRoleCacheTestCase, self).setUp()
+        django_cache.clear()
+        self.course_key = SlashSeparatedCourseKey('edX', 'toy', '2012_Fall')
+        self.user = UserFactory()
+
+    def _fresh_user(self):
+        """Returns a new object for self.user, without its RoleCache."""
+        return User.objects.get(id=self.user.id)
+
+    def test_shared_across_requests(self):
+        self.assertFalse(CourseInstructorRole(self.course_key).has_user(self._fresh_user()))
+        user = self._fresh_user()
+        with self.assertNumQueries(0):
+            self.assertFalse(CourseInstructorRole(self.course_key).has_user(user))
+
+        CourseInstructorRole(self.course_key).add_users(self.user)
+        self.assertTrue(CourseInstructorRole(self.course_key).has_user(self._fresh_user()))
+
+    def test_invalidated_after_commit(self):
+        self.assertFalse(CourseInstructorRole(self.course_key).has_user(self._fresh_user()))
+        with transaction.commit_on_success():
+            CourseInstructorRole(self.course_key).add_users(self.user)
+            # Roles read before the commit, as by another process, aren't kept.
+            self.assertTrue(CourseInstructorRole(self.course_key).has_user(self._fresh_user()))
+            django_cache.set(u"student.roles.{}".format(self.user.id), frozenset(), 60)
+        self.assertTrue(CourseInstructorRole(self.course_key).has_user(self._fresh_user()))
+
+    def test_rolled_back(self):
+        with self.assertRaises(ValueError):
+            with transaction.commit_on_success():
+                CourseInstructorRole(self.course_key).add_users(self.user)
+                self.assertTrue(CourseInstructorRole(self.course_key).has_user(self._fresh_user()))
+                raise ValueError()
+        self.assertFalse(CourseInstructorRole(self.course_key).has_user(self._fresh_user()))
@@ -17,12 +17,14 @@ from django.contrib.sessions.middleware import SessionMiddleware
 from django.core.urlresolvers import reverse
 from django.test import TestCase
 from django.test.client import RequestFactory, Client
+from django.test.utils import override_settings
 from mock import Mock, patch
 from opaque_keys.edx.locations import SlashSeparatedCourseKey
 
+from student import models as student_models
 from student.models import (
-    anonymous_id_for_user, user_by_anonymous_id, CourseEnrollment, unique_id_for_user,
-    LinkedInAddToProfileConfiguration
+    anonymous_id_for_user, anonymous_ids_for_users, user_by_anonymous_id, AnonymousUserId, CourseEnrollment,
+    unique_id_for_user, LinkedInAddToProfileConfiguration
 )
 from student.views import (process_survey_link, _cert_info,
                            change_enrollment, complete_course_mode_info)
@@ -864,3 +866,53 @@ class AnonymousLookupTable(ModuleStoreTestCase):
         real_user = user_by_anonymous_id(anonymous_id)
         self.assertEqual(self.user, real_user)
         self.assertEqual(anonymous_id, anonymous_id_for_user(self.user, course2.id, save=False))
+
+    def test_bulk_ids(self):
+        users = [self.user, UserFactory(), UserFactory(), AnonymousUser()]
+        anonymous_id_for_user(users[1], self.course.id)
+        anonymous_ids = anonymous_ids_for_users(users, self.course.id)
+
+        self.assertEqual(anonymous_ids, {
+            user.id: anonymous_id_for_user(User.objects.get(id=user.id), self.course.id, save=False)
+            for user in users[:3]
+        })
+        for user in users[:3]:
+            self.assertEqual(user_by_anonymous_id(anonymous_ids[user.id]), user)
+        self.assertEqual(AnonymousUserId.objects.filter(course_id=self.course.id).count(), 3)
+
+    def test_bulk_ids_not_saved(self):
+        anonymous_ids = anonymous_ids_for_users([self.user], self.course.id, save=False)
+        self.assertEqual(anonymous_ids, {self.user.id: anonymous_id_for_user(self.user, self.course.id, save=False)})
+        self.assertFalse(AnonymousUserId.objects.filter(user=self.user).exists())
+
+    @override_settings(SAVED_ANONYMOUS_IDS_CACHE_SIZE=10)
+    def test_saved_once_per_process(self):
+        student_models._SAVED_ANONYMOUS_IDS.clear()  # pylint: disable=protected-access
+        self.addCleanup(student_models._SAVED_ANONYMOUS_IDS.clear)  # pylint: disable=protected-access
+        users = [self.user, UserFactory()]
+        anonymous_ids = anonymous_ids_for_users(users, self.course.id)
+
+        # Ids inserted by this process aren't remembered until they're found saved.
+        fresh_users = [User.objects.get(id=user.id) for user in users]
+        with self.assertNumQueries(1):
+            self.assertEqual(anonymous_ids_for_users(fresh_users, self.course.id), anonymous_ids)
+
+        # Fresh instances don't remember their ids, but the process knows they're saved.
+        fresh_users = [User.objects.get(id=user.id) for user in users]
+        with self.assertNumQueries(0):
+            self.assertEqual(anonymous_ids_for_users(fresh_users, self.course.id), anonymous_ids)
+            self.assertEqual(anonymous_id_for_user(fresh_users[0], self.course.id), anonymous_ids[self.user.id])
+
+    @override_settings(SAVED_ANONYMOUS_IDS_CACHE_SIZE=10)
+    def test_inserted_id_not_remembered(self):
+        student_models._SAVED_ANONYMOUS_IDS.clear()  # pylint: disable=protected-access
+        self.addCleanup(student_models._SAVED_ANONYMOUS_IDS.clear)  # pylint: disable=protected-access
+        anonymous_id = anonymous_id_for_user(self.user, self.course.id)
+        self.assertNotIn((self.user.id, self.course.id), student_models._SAVED_ANONYMOUS_IDS)  # pylint: disable=protected-access
+
+        fresh_user = User.objects.get(id=self.user.id)
+        with self.assertNumQueries(1):
+            self.assertEqual(anonymous_id_for_user(fresh_user, self.course.id), anonymous_id)
+        fresh_user = User.objects.get(id=self.user.id)
+        with self.assertNumQueries(0):
+            self.assertEqual(anonymous_id_for_user(fresh_user, self.course.id), anonymous_id)
@@ -55,11 +55,13 @@ from student.models import (
     PendingEmailChange, CourseEnrollment, unique_id_for_user,
     CourseEnrollmentAllowed, UserStanding, LoginFailures,
     create_comments_service_user, PasswordHistory, UserSignupSource,
-    DashboardConfiguration, LinkedInAddToProfileConfiguration)
+    DashboardConfiguration, LinkedInAddToProfileConfiguration, get_user_identity)
 from student.forms import AccountCreationForm, PasswordResetFormNoActive
 
 from verify_student.models import SoftwareSecurePhotoVerification, MidcourseReverificationWindow
-from certificates.models import CertificateStatuses, certificate_status_for_student
+from certificates.models import (
+    CertificateStatuses, certificate_status, certificate_status_for_student, certificates_for_student
+)
 from dark_lang.models import DarkLangConfig
 
 from xmodule.modulestore.django import modulestore
@@ -174,10 +176,12 @@ def process_survey_link(survey_link, user):
     return survey_link.format(UNIQUE_ID=unique_id_for_user(user))
 
 
-def cert_info(user, course, course_mode):
+def cert_info(user, course, course_mode, cert_status=None):
     """
     Get the certificate info needed to render the dashboard section for the given
-    student and course.  Returns a dictionary with keys:
+    student and course, whose certificate status, as returned by
+    `certificate_status_for_student`, may be passed as `cert_status`.
+    Returns a dictionary with keys:
 
     'status': one of 'generating', 'ready', 'notpassing', 'processing', 'restricted'
     'show_download_url': bool
@@ -190,10 +194,12 @@ def cert_info(user, course, course_mode):
     if not course.may_certify():
         return {}
 
-    return _cert_info(user, course, certificate_status_for_student(user, course.id), course_mode)
+    if cert_status is None:
+        cert_status = certificate_status_for_student(user, course.id)
+    return _cert_info(user, course, cert_status, course_mode)
 
 
-def reverification_info(course_enrollment_pairs, user, statuses):
+def reverification_info(course_enrollment_pairs, user, statuses, windows=None):
     """
     Returns reverification-related information for *all* of user's enrollments whose
     reverification status is in status_list
@@ -203,15 +209,25 @@ def reverification_info(course_enrollment_pairs, user, statuses):
         user (User): the user whose information we want
         statuses (list): a list of reverification statuses we want information for
             example: ["must_reverify", "denied"]
+        windows (dict): the open reverification windows of the courses, as returned
+            by `MidcourseReverificationWindow.get_windows`, if already loaded
 
     Returns:
         dictionary of lists: dictionary with one key per status, e.g.
             dict["must_reverify"] = []
             dict["must_reverify"] = [some information]
     """
+    if windows is None:
+        windows = MidcourseReverificationWindow.get_windows(
+            [course.id for course, __ in course_enrollment_pairs], datetime.datetime.now(UTC)
+        )
+
     reverifications = defaultdict(list)
     for (course, enrollment) in course_enrollment_pairs:
-        info = single_course_reverification_info(user, course, enrollment)
+        window = windows.get(course.id)
+        if window is None:
+            continue
+        info = single_course_reverification_info(user, course, enrollment, window=window)
         if info:
             reverifications[info.status].append(info)
 
@@ -222,7 +238,7 @@ def reverification_info(course_enrollment_pairs, user, statuses):
     return reverifications
 
 
-def single_course_reverification_info(user, course, enrollment):  # pylint: disable=invalid-name
+def single_course_reverification_info(user, course, enrollment, window=None):  # pylint: disable=invalid-name
     """Returns midcourse reverification-related information for user with enrollment in course.
 
     If a course has an open re-verification window, and that user has a verified enrollment in
@@ -232,12 +248,14 @@ def single_course_reverification_info(user, course, enrollment):  # pylint: disa
         user (User): the user we want to get information for
         course (Course): the course in which the student is enrolled
         enrollment (CourseEnrollment): the object representing the type of enrollment user has in course
+        window (MidcourseReverificationWindow): the open window of the course, if already loaded
 
     Returns:
         ReverifyInfo: (course_id, course_name, course_number, date, status)
         OR, None: None if there is no re-verification info for this enrollment
     """
-    window = MidcourseReverificationWindow.get_window(course.id, datetime.datetime.now(UTC))
+    if window is None:
+        window = MidcourseReverificationWindow.get_window(course.id, datetime.datetime.now(UTC))
 
     # If there's no window OR the user is not verified, we don't get reverification info
     if (not window) or (enrollment.mode != "verified"):
@@ -255,7 +273,10 @@ def get_course_enrollment_pairs(user, course_org_filter, org_filter_out_set):
     Get the relevant set of (Course, CourseEnrollment) pairs to be displayed on
     a student's dashboard.
     """
-    for enrollment in CourseEnrollment.enrollments_for_user(user):
+    # Prefetching the enrollments also caches them for the access checks of the dashboard.
+    for enrollment in CourseEnrollment.prefetch_enrollments_for_user(user):
+        if not enrollment.is_active:
+            continue
         store = modulestore()
         with store.bulk_operations(enrollment.course_id):
             course = store.get_course(enrollment.course_id)
@@ -488,6 +509,46 @@ def is_course_blocked(request, redeemed_registration_codes, course_key):
     return blocked
 
 
+DashboardCourseData = namedtuple('DashboardCourseData', [  # pylint: disable=invalid-name
+    'all_course_modes', 'unexpired_course_modes', 'certificates', 'reverification_windows',
+    'email_enabled_course_ids', 'redeemed_registration_codes',
+])
+
+
+def load_dashboard_course_data(user, course_ids):
+    """
+    Loads the data the dashboard shows about each of the user's courses, with
+    a fixed number of queries however many courses the user is enrolled in.
+
+    Args:
+        user (User): the user whose dashboard is rendered
+        course_ids (list): the ids of the courses listed on the dashboard
+
+    Returns:
+        DashboardCourseData, whose fields are dicts keyed by course id, except
+        `email_enabled_course_ids`, the set of the courses for which bulk email
+        is enabled. `redeemed_registration_codes` maps courses to the lists of
+        registration codes the user redeemed for them.
+    """
+    all_course_modes, unexpired_course_modes = CourseMode.all_and_unexpired_modes_for_courses(course_ids)
+
+    redeemed_registration_codes = defaultdict(list)
+    redeemed_codes = CourseRegistrationCode.objects.filter(
+        course_id__in=course_ids, registrationcoderedemption__redeemed_by=user
+    ).select_related('invoice_item__invoice')
+    for registration_code in redeemed_codes:
+        redeemed_registration_codes[registration_code.course_id].append(registration_code)
+
+    return DashboardCourseData(
+        all_course_modes=all_course_modes,
+        unexpired_course_modes=unexpired_course_modes,
+        certificates=certificates_for_student(user, course_ids),
+        reverification_windows=MidcourseReverificationWindow.get_windows(course_ids, datetime.datetime.now(UTC)),
+        email_enabled_course_ids=CourseAuthorization.instructor_email_enabled_for_courses(course_ids),
+        redeemed_registration_codes=redeemed_registration_codes,
+    )
+
+
 @login_required
 @ensure_csrf_cookie
 def dashboard(request):
@@ -513,9 +574,11 @@ def dashboard(request):
     # sort the enrollment pairs by the enrollment date
     course_enrollment_pairs.sort(key=lambda x: x[1].created, reverse=True)
 
-    # Retrieve the course modes for each course
+    # Retrieve the course modes, certificates, etc. of all the courses at once
     enrolled_course_ids = [course.id for course, __ in course_enrollment_pairs]
-    all_course_modes, unexpired_course_modes = CourseMode.all_and_unexpired_modes_for_courses(enrolled_course_ids)
+    course_data = load_dashboard_course_data(user, enrolled_course_ids)
+    all_course_modes = course_data.all_course_modes
+    unexpired_course_modes = course_data.unexpired_course_modes
     course_modes_by_course = {
         course_id: {
             mode.slug: mode
@@ -584,7 +647,10 @@ def dashboard(request):
         all_course_modes
     )
     cert_statuses = {
-        course.id: cert_info(request.user, course, _enrollment.mode)
+        course.id: cert_info(
+            request.user, course, _enrollment.mode,
+            cert_status=certificate_status(course_data.certificates.get(course.id))
+        )
         for course, _enrollment in course_enrollment_pairs
     }
 
@@ -593,7 +659,7 @@ def dashboard(request):
         course.id for course, _enrollment in course_enrollment_pairs if (
             settings.FEATURES['ENABLE_INSTRUCTOR_EMAIL'] and
             modulestore().get_modulestore_type(course.id) != ModuleStoreEnum.Type.xml and
-            CourseAuthorization.instructor_email_enabled(course.id)
+            course.id in course_data.email_enabled_course_ids
         )
     )
 
@@ -603,16 +669,27 @@ def dashboard(request):
 
     # Gets data for midcourse reverifications, if any are necessary or have failed
     statuses = ["approved", "denied", "pending", "must_reverify"]
-    reverifications = reverification_info(course_enrollment_pairs, user, statuses)
+    reverifications = reverification_info(
+        course_enrollment_pairs, user, statuses, windows=course_data.reverification_windows
+    )
 
-    show_refund_option_for = frozenset(course.id for course, _enrollment in course_enrollment_pairs
-                                       if _enrollment.refundable())
+    show_refund_option_for = frozenset(
+        course.id for course, _enrollment in course_enrollment_pairs
+        if _enrollment.refundable(
+            user_certificates=course_data.certificates,
+            course_modes=unexpired_course_modes[course.id]
+        )
+    )
 
-    block_courses = frozenset(course.id for course, enrollment in course_enrollment_pairs
-                              if is_course_blocked(request, CourseRegistrationCode.objects.filter(course_id=course.id, registrationcoderedemption__redeemed_by=request.user), course.id))
+    block_courses = frozenset(
+        course.id for course, enrollment in course_enrollment_pairs
+        if is_course_blocked(request, course_data.redeemed_registration_codes[course.id], course.id)
+    )
 
-    enrolled_courses_either_paid = frozenset(course.id for course, _enrollment in course_enrollment_pairs
-                                             if _enrollment.is_paid_course())
+    enrolled_courses_either_paid = frozenset(
+        course.id for course, _enrollment in course_enrollment_pairs
+        if _enrollment.is_paid_course(modes_dict=course_modes_by_course[course.id])
+    )
     # get info w.r.t ExternalAuthMap
     external_auth_map = None
     try:
@@ -632,11 +709,8 @@ def dashboard(request):
         # Re-alphabetize language options
         language_options.sort()
 
-    # TODO: remove circular dependency on openedx from common
-    from openedx.core.djangoapps.user_api.models import UserPreference
-
     # try to get the prefered language for the user
-    cur_pref_lang_code = UserPreference.get_preference(request.user, LANGUAGE_KEY)
+    cur_pref_lang_code = get_user_identity(request.user).language
     # try and get the current language of the user
     cur_lang_code = get_language()
     if cur_pref_lang_code and cur_pref_lang_code in settings.LANGUAGE_DICT:
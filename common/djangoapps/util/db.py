@@ -2,11 +2,14 @@
 Utility functions related to databases.
 """
 from functools import wraps
+import logging
 import random
 
-from django.db import connection, transaction
+from django.db import DEFAULT_DB_ALIAS, connection, connections, transaction
 
 
+log = logging.getLogger(__name__)
+
 MYSQL_MAX_INT = (2 ** 31) - 1
 
 
@@ -57,3 +60,62 @@ def generate_int_id(minimum=0, maximum=MYSQL_MAX_INT, used_ids=None):
         cid = random.randint(minimum, maximum)
 
     return cid
+
+
+def in_dirty_transaction(using=None):
+    """
+    Returns whether the current transaction of the database `using` has
+    uncommitted changes, which other processes can't see yet and which may
+    still be rolled back.
+    """
+    return bool(transaction.is_managed(using=using) and transaction.is_dirty(using=using))
+
+
+def run_after_commit(func, using=None):
+    """
+    Calls `func` once the current transaction of the database `using` is
+    committed, or right away outside of transaction management. If the
+    transaction is rolled back, `func` isn't called.
+
+    Django has no hook for this, so the connection's `commit` and `rollback`
+    are wrapped the first time it's needed on the connection.
+    """
+    if not transaction.is_managed(using=using):
+        func()
+        return
+    _after_commit_callbacks(connections[using or DEFAULT_DB_ALIAS]).append(func)
+
+
+def _after_commit_callbacks(db_connection):
+    """
+    Returns the list of functions to call once the current transaction of
+    `db_connection` is committed.
+    """
+    # pylint: disable=protected-access
+    callbacks = getattr(db_connection, '_after_commit_callbacks', None)
+    if callbacks is not None:
+        return callbacks
+
+    callbacks = db_connection._after_commit_callbacks = []
+    commit = db_connection.commit
+    rollback = db_connection.rollback
+
+    def commit_and_run_callbacks():
+        """Commits, then calls the functions waiting for the commit."""
+        commit()
+        pending = list(callbacks)
+        del callbacks[:]
+        for pending_func in pending:
+            try:
+                pending_func()
+            except Exception:  # pylint: disable=broad-except
+                log.exception(u"Error calling %r after commit", pending_func)
+
+    def rollback_and_drop_callbacks():
+        """Rolls back, and forgets the functions waiting for a commit."""
+        rollback()
+        del callbacks[:]
+
+    db_connection.commit = commit_and_run_callbacks
+    db_connection.rollback = rollback_and_drop_callbacks
+    return callbacks
@@ -1,9 +1,35 @@
 """ Utility functions related to database queries """
 from django.conf import settings
 
+# Number of rows fetched per query by iterate_in_batches.
+DEFAULT_BATCH_SIZE = 1000
+
 
 def use_read_replica_if_available(queryset):
     """
     If there is a database called 'read_replica', use that database for the queryset.
     """
     return queryset.using("read_replica") if "read_replica" in settings.DATABASES else queryset
+
+
+def iterate_in_batches(queryset, batch_size=DEFAULT_BATCH_SIZE, key='pk'):
+    """
+    Yield the objects of `queryset`, ordered by `key`, fetching at most
+    `batch_size` of them per query.
+
+    Batches are selected with a `key > last key seen` condition rather than an
+    offset, so each query only reads the rows it returns. `key` must be a
+    unique field. Each batch is evaluated in full, so `select_related` and
+    `prefetch_related` on `queryset` are applied per batch, and no more than
+    `batch_size` objects are held in memory at once.
+    """
+    queryset = queryset.order_by(key)
+    last_key = None
+    while True:
+        batch_queryset = queryset if last_key is None else queryset.filter(**{key + '__gt': last_key})
+        batch = list(batch_queryset[:batch_size])
+        for obj in batch:
+            yield obj
+        if len(batch) < batch_size:
+            return
+        last_key = getattr(batch[-1], key)
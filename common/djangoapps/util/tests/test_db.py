@@ -1,6 +1,7 @@
 """Tests for util.db module."""
 
 import ddt
+from mock import Mock
 import threading
 import time
 import unittest
@@ -10,7 +11,7 @@ from django.db import connection, IntegrityError
 from django.db.transaction import commit_on_success, TransactionManagementError
 from django.test import TestCase, TransactionTestCase
 
-from util.db import commit_on_success_with_read_committed, generate_int_id
+from util.db import commit_on_success_with_read_committed, generate_int_id, in_dirty_transaction, run_after_commit
 
 
 @ddt.ddt
@@ -101,6 +102,40 @@ class TransactionIsolationLevelsTestCase(TransactionTestCase):
                     commit_on_success_with_read_committed(do_nothing)()
 
 
+class RunAfterCommitTestCase(TransactionTestCase):
+    """Tests for `run_after_commit` and `in_dirty_transaction`"""
+    def test_outside_transaction(self):
+        func = Mock()
+        run_after_commit(func)
+        func.assert_called_once_with()
+        self.assertFalse(in_dirty_transaction())
+
+    def test_committed(self):
+        func = Mock()
+        with commit_on_success():
+            User.objects.create(username='student')
+            self.assertTrue(in_dirty_transaction())
+            run_after_commit(func)
+            self.assertFalse(func.called)
+        func.assert_called_once_with()
+
+        # It's called once only, for the transaction it was waiting for.
+        with commit_on_success():
+            User.objects.create(username='student2')
+        self.assertEqual(func.call_count, 1)
+
+    def test_rolled_back(self):
+        func = Mock()
+        with self.assertRaises(ValueError):
+            with commit_on_success():
+                User.objects.create(username='student')
+                run_after_commit(func)
+                raise ValueError()
+        with commit_on_success():
+            User.objects.create(username='student2')
+        self.assertFalse(func.called)
+
+
 @ddt.ddt
 class GenerateIntIdTestCase(TestCase):
     """Tests for `generate_int_id`"""
@@ -0,0 +1,32 @@
+"""
+Tests for util/query.py
+"""
+
+import ddt
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from student.tests.factories import UserFactory
+from util.query import iterate_in_batches
+
+
+@ddt.ddt
+class IterateInBatchesTest(TestCase):
+    """
+    Tests for iterate_in_batches.
+    """
+    def setUp(self):
+        super(IterateInBatchesTest, self).setUp()
+        self.users = [UserFactory.create(username='user{}'.format(i)) for i in range(5)]
+
+    @ddt.data((1, 6), (2, 3), (4, 2), (5, 2), (10, 1))
+    @ddt.unpack
+    def test_batches(self, batch_size, num_queries):
+        with self.assertNumQueries(num_queries):
+            users = list(iterate_in_batches(User.objects.all(), batch_size=batch_size))
+        self.assertEqual(users, sorted(self.users, key=lambda user: user.pk))
+
+    def test_key(self):
+        queryset = User.objects.filter(username__in=['user3', 'user1', 'user4'])
+        users = list(iterate_in_batches(queryset, batch_size=2, key='username'))
+        self.assertEqual([user.username for user in users], ['user1', 'user3', 'user4'])
@@ -1,6 +1,10 @@
+import datetime
+import hashlib
 import pymongo
 import gridfs
+from bson.objectid import ObjectId
 from gridfs.errors import NoFile
+from gridfs.grid_file import GridOut
 
 from xmodule.contentstore.content import XASSET_LOCATION_TAG
 
@@ -12,6 +16,7 @@ from fs.osfs import OSFS
 import os
 import json
 from bson.son import SON
+from pytz import UTC
 from opaque_keys.edx.keys import AssetKey
 from xmodule.modulestore.django import ASSET_IGNORE_REGEX
 
@@ -41,7 +46,11 @@ class MongoContentStore(ContentStore):
 
         self.fs = gridfs.GridFS(_db, bucket)
 
+        self.fs_root = _db[bucket]
         self.fs_files = _db[bucket + ".files"]  # the underlying collection GridFS uses
+        self.fs_chunks = _db[bucket + ".chunks"]
+        # Reference counts for file data shared between copies of an asset. See `copy_all_course_assets`.
+        self.fs_blobs = _db[bucket + ".blobs"]
 
     def close_connections(self):
         """
@@ -83,15 +92,106 @@ class MongoContentStore(ContentStore):
     def delete(self, location_or_id):
         if isinstance(location_or_id, AssetKey):
             location_or_id, _ = self.asset_db_key(location_or_id)
-        # Deletes of non-existent files are considered successful
-        self.fs.delete(location_or_id)
+        file_document = self.fs_files.find_one({'_id': location_or_id}, fields=['data_id'])
+        self._delete_file(location_or_id, file_document)
+
+    def _delete_file(self, file_id, file_document):
+        """
+        Delete the GridFS file file_id whose fs.files entry is file_document (None if there isn't one).
+        Data shared with copies of the file is only removed along with the last copy.
+        """
+        if file_document is None or 'data_id' not in file_document:
+            # Deletes of non-existent files are considered successful
+            self.fs.delete(file_id)
+        else:
+            self.fs_files.remove({'_id': file_id})
+            self._release_file_data(file_document['data_id'])
+
+    def _open_file(self, content_id):
+        """
+        Open the GridFS file stored as content_id. Copies made by `copy_all_course_assets` have their own
+        fs.files entry but read the chunks stored under their shared data_id.
+        """
+        file_document = self.fs_files.find_one({'_id': content_id})
+        if file_document is None:
+            raise NoFile(content_id)
+        if 'data_id' in file_document:
+            file_document['_id'] = file_document['data_id']
+        return GridOut(self.fs_root, file_document=file_document)
+
+    def _share_file_data(self, file_document):
+        """
+        Returns the id of the chunks which a new copy of the file in file_document should read, and
+        counts the copy as a reference to them.
+
+        The first time a file is copied its chunks are moved out from under its own _id, so that
+        the original can be deleted or re-saved independently of its copies. If another file with
+        the same content is already shared, its chunks are used and the file's own are dropped.
+        Files are only considered the same if their md5, length and chunk size (which the chunks
+        are read with) match, and then if the sha1 of their data does.
+        """
+        if 'data_id' in file_document:
+            self.fs_blobs.update({'_id': file_document['data_id']}, {'$inc': {'refcount': 1}})
+            return file_document['data_id']
+
+        file_id = self.make_id_son(file_document)
+        content = {
+            'md5': file_document['md5'], 'length': file_document['length'], 'chunkSize': file_document['chunkSize']
+        }
+        blob = None
+        sha1 = None
+        for candidate in self.fs_blobs.find(dict(content, refcount={'$gt': 0})):
+            if sha1 is None:
+                sha1 = self._data_sha1(file_id)
+            if 'sha1' not in candidate:
+                # The sha1 of shared data is only computed once another file may share it.
+                candidate['sha1'] = self._data_sha1(candidate['_id'])
+                self.fs_blobs.update({'_id': candidate['_id']}, {'$set': {'sha1': candidate['sha1']}})
+            if candidate['sha1'] == sha1:
+                blob = self.fs_blobs.find_and_modify(
+                    {'_id': candidate['_id'], 'refcount': {'$gt': 0}}, {'$inc': {'refcount': 2}}
+                )
+                if blob is not None:
+                    break
+
+        if blob is not None:
+            data_id = blob['_id']
+            self.fs_files.update({'_id': file_id}, {'$set': {'data_id': data_id}})
+            self.fs_chunks.remove({'files_id': file_id})
+        else:
+            data_id = ObjectId()
+            blob = dict(content, _id=data_id, refcount=2)
+            if sha1 is not None:
+                blob['sha1'] = sha1
+            self.fs_blobs.insert(blob)
+            self.fs_chunks.update({'files_id': file_id}, {'$set': {'files_id': data_id}}, multi=True)
+            self.fs_files.update({'_id': file_id}, {'$set': {'data_id': data_id}})
+        return data_id
+
+    def _data_sha1(self, files_id):
+        """
+        Returns the hex sha1 of the data in the chunks stored under files_id.
+        """
+        hasher = hashlib.sha1()
+        for chunk in self.fs_chunks.find({'files_id': files_id}, sort=[('n', pymongo.ASCENDING)]):
+            hasher.update(chunk['data'])
+        return hasher.hexdigest()
+
+    def _release_file_data(self, data_id):
+        """
+        Drop one reference to the shared chunks data_id, removing them once nothing reads them.
+        """
+        blob = self.fs_blobs.find_and_modify({'_id': data_id}, {'$inc': {'refcount': -1}}, new=True)
+        if blob is None or blob['refcount'] <= 0:
+            self.fs_chunks.remove({'files_id': data_id})
+            self.fs_blobs.remove({'_id': data_id})
 
     def find(self, location, throw_on_not_found=True, as_stream=False):
         content_id, __ = self.asset_db_key(location)
 
         try:
             if as_stream:
-                fp = self.fs.get(content_id)
+                fp = self._open_file(content_id)
                 thumbnail_location = getattr(fp, 'thumbnail_location', None)
                 if thumbnail_location:
                     thumbnail_location = location.course_key.make_asset_key(
@@ -105,7 +205,7 @@ class MongoContentStore(ContentStore):
                     length=fp.length, locked=getattr(fp, 'locked', False)
                 )
             else:
-                with self.fs.get(content_id) as fp:
+                with self._open_file(content_id) as fp:
                     thumbnail_location = getattr(fp, 'thumbnail_location', None)
                     if thumbnail_location:
                         thumbnail_location = location.course_key.make_asset_key(
@@ -163,7 +263,7 @@ class MongoContentStore(ContentStore):
             # to look. -- pmitros
             self.export(asset['asset_key'], output_directory)
             for attr, value in asset.iteritems():
-                if attr not in ['_id', 'md5', 'uploadDate', 'length', 'chunkSize', 'asset_key']:
+                if attr not in ['_id', 'md5', 'uploadDate', 'length', 'chunkSize', 'asset_key', 'data_id']:
                     policy.setdefault(asset['asset_key'].name, {})[attr] = value
 
         with open(assets_policy_file, 'w') as f:
@@ -192,7 +292,7 @@ class MongoContentStore(ContentStore):
             items = self.fs_files.find(query)
             assets_to_delete = assets_to_delete + items.count()
             for asset in items:
-                self.fs.delete(asset[prefix])
+                self._delete_file(self.make_id_son(asset), asset)
 
             self.fs_files.remove(query)
         return assets_to_delete
@@ -271,7 +371,7 @@ class MongoContentStore(ContentStore):
         :param location:  a c4x asset location
         """
         for attr in attr_dict.iterkeys():
-            if attr in ['_id', 'md5', 'uploadDate', 'length']:
+            if attr in ['_id', 'md5', 'uploadDate', 'length', 'data_id']:
                 raise AttributeError("{} is a protected attribute.".format(attr))
         asset_db_key, __ = self.asset_db_key(location)
         # catch upsert error and raise NotFoundError if asset doesn't exist
@@ -299,14 +399,14 @@ class MongoContentStore(ContentStore):
         """
         See :meth:`.ContentStore.copy_all_course_assets`
 
-        This implementation fairly expensively copies all of the data
+        This implementation copies only the fs.files entries. The copies share the source's chunks
+        (see `_share_file_data`), which are reference counted in fs.blobs.
         """
         source_query = query_for_course(source_course_key)
-        # it'd be great to figure out how to do all of this on the db server and not pull the bits over
-        for asset in self.fs_files.find(source_query):
+        # _share_file_data updates the source entries, so read them all before iterating
+        for asset in list(self.fs_files.find(source_query)):
+            data_id = self._share_file_data(asset)
             asset_key = self.make_id_son(asset)
-            # don't convert from string until fs access
-            source_content = self.fs.get(asset_key)
             if isinstance(asset_key, basestring):
                 asset_key = AssetKey.from_string(asset_key)
                 __, asset_key = self.asset_db_key(asset_key)
@@ -322,17 +422,19 @@ class MongoContentStore(ContentStore):
                     dest_course_key.make_asset_key(asset_key['category'], asset_key['name']).for_branch(None)
                 )
 
-            self.fs.put(
-                source_content.read(),
-                _id=asset_id, filename=asset['filename'], content_type=asset['contentType'],
-                displayname=asset['displayname'], content_son=asset_key,
+            self.fs_files.insert({
+                '_id': asset_id, 'filename': asset['filename'], 'contentType': asset['contentType'],
+                'displayname': asset['displayname'], 'content_son': asset_key,
                 # thumbnail is not technically correct but will be functionally correct as the code
                 # only looks at the name which is not course relative.
-                thumbnail_location=asset['thumbnail_location'],
-                import_path=asset['import_path'],
+                'thumbnail_location': asset['thumbnail_location'],
+                'import_path': asset['import_path'],
                 # getattr b/c caching may mean some pickled instances don't have attr
-                locked=asset.get('locked', False)
-            )
+                'locked': asset.get('locked', False),
+                'length': asset['length'], 'chunkSize': asset['chunkSize'], 'md5': asset['md5'],
+                'uploadDate': datetime.datetime.now(UTC),
+                'data_id': data_id,
+            })
 
     def delete_all_course_assets(self, course_key):
         """
@@ -344,7 +446,7 @@ class MongoContentStore(ContentStore):
         matching_assets = self.fs_files.find(course_query)
         for asset in matching_assets:
             asset_key = self.make_id_son(asset)
-            self.fs.delete(asset_key)
+            self._delete_file(asset_key, asset)
 
     # codifying the original order which pymongo used for the dicts coming out of location_to_dict
     # stability of order is more important than sanity of order as any changes to order make things
@@ -386,7 +488,8 @@ class MongoContentStore(ContentStore):
     def ensure_indexes(self):
 
         # Index needed thru 'category' by `_get_all_content_for_course` and others. That query also takes a sort
-        # which can be `uploadDate`, `display_name`,
+        # which can be `uploadDate` or `displayname`, so the equality fields of `query_for_course` lead each
+        # index and the sort field follows, letting mongo page through the assets without an in-memory sort.
 
         self.fs_files.create_index(
             [('_id.org', pymongo.ASCENDING), ('_id.course', pymongo.ASCENDING), ('_id.name', pymongo.ASCENDING)],
@@ -396,21 +499,26 @@ class MongoContentStore(ContentStore):
             [('content_son.org', pymongo.ASCENDING), ('content_son.course', pymongo.ASCENDING), ('content_son.name', pymongo.ASCENDING)],
             sparse=True
         )
-        self.fs_files.create_index(
-            [('_id.org', pymongo.ASCENDING), ('_id.course', pymongo.ASCENDING), ('uploadDate', pymongo.ASCENDING)],
-            sparse=True
-        )
-        self.fs_files.create_index(
-            [('_id.org', pymongo.ASCENDING), ('_id.course', pymongo.ASCENDING), ('display_name', pymongo.ASCENDING)],
-            sparse=True
-        )
-        self.fs_files.create_index(
-            [('content_son.org', pymongo.ASCENDING), ('content_son.course', pymongo.ASCENDING), ('uploadDate', pymongo.ASCENDING)],
-            sparse=True
-        )
-        self.fs_files.create_index(
-            [('content_son.org', pymongo.ASCENDING), ('content_son.course', pymongo.ASCENDING), ('display_name', pymongo.ASCENDING)],
-            sparse=True
+        for sort_field in ('uploadDate', 'displayname'):
+            self.fs_files.create_index(
+                [
+                    ('_id.org', pymongo.ASCENDING), ('_id.course', pymongo.ASCENDING),
+                    ('_id.category', pymongo.ASCENDING), (sort_field, pymongo.ASCENDING),
+                ],
+                sparse=True
+            )
+            self.fs_files.create_index(
+                [
+                    ('content_son.org', pymongo.ASCENDING), ('content_son.course', pymongo.ASCENDING),
+                    ('content_son.run', pymongo.ASCENDING), ('content_son.category', pymongo.ASCENDING),
+                    (sort_field, pymongo.ASCENDING),
+                ],
+                sparse=True
+            )
+
+        # Copies of shared file data are looked up by content when assets are copied.
+        self.fs_blobs.create_index(
+            [('md5', pymongo.ASCENDING), ('length', pymongo.ASCENDING), ('chunkSize', pymongo.ASCENDING)]
         )
 
 
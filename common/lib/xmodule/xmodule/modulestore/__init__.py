@@ -643,6 +643,21 @@ class ModuleStoreAssetWriteInterface(ModuleStoreAssetBase):
         """
         raise NotImplementedError()
 
+    @contract(asset_keys='list(AssetKey)')
+    def delete_asset_metadata_list(self, asset_keys, user_id):
+        """
+        Deletes the metadata of several assets of one course. Modulestores which can delete
+        them all at once should over-ride this.
+
+        Arguments:
+            asset_keys (list(AssetKey)): keys containing original asset filenames
+            user_id (int): user ID deleting the asset metadata
+
+        Returns:
+            Number of asset metadata entries deleted
+        """
+        return sum(self.delete_asset_metadata(asset_key, user_id) for asset_key in asset_keys)
+
     @contract(asset_key='AssetKey', attr=str)
     def set_asset_metadata_attr(self, asset_key, attr, value, user_id):
         """
@@ -458,6 +458,23 @@ class MixedModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase):
         store = self._get_modulestore_for_courselike(asset_key.course_key)
         return store.delete_asset_metadata(asset_key, user_id)
 
+    @contract(asset_keys='list(AssetKey)', user_id='int|long')
+    def delete_asset_metadata_list(self, asset_keys, user_id):
+        """
+        Deletes the metadata of several assets of one course.
+
+        Arguments:
+            asset_keys (list(AssetKey)): locators containing original asset filenames
+            user_id (int_long): user deleting the metadata
+
+        Returns:
+            Number of asset metadata entries deleted
+        """
+        if len(asset_keys) == 0:
+            return 0
+        store = self._get_modulestore_for_courselike(asset_keys[0].course_key)
+        return store.delete_asset_metadata_list(asset_keys, user_id)
+
     @contract(source_course_key='CourseKey', dest_course_key='CourseKey', user_id='int|long')
     def copy_all_asset_metadata(self, source_course_key, dest_course_key, user_id):
         """
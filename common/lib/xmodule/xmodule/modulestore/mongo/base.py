@@ -16,6 +16,7 @@ import pymongo
 import sys
 import logging
 import copy
+from collections import defaultdict
 import re
 from uuid import uuid4
 
@@ -542,6 +543,9 @@ class MongoModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase, Mongo
             if asset_collection is None:
                 asset_collection = self.DEFAULT_ASSET_COLLECTION_NAME
             self.asset_collection = self.database[asset_collection]
+            # Collection which stores one document per asset, so that asset metadata can be
+            # sorted, paged and updated without rewriting the per-course document.
+            self.asset_item_collection = self.database[asset_collection + '.items']
 
             if user is not None and password is not None:
                 self.database.authenticate(user, password)
@@ -1580,19 +1584,23 @@ class MongoModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase, Mongo
         field_data = KvsFieldData(kvs)
         return field_data
 
-    def _find_course_assets(self, course_key):
+    def _find_course_asset_doc(self, course_key):
         """
-        Internal; finds (or creates) course asset info about all assets for a particular course
+        Internal; finds (or creates) the per-course asset document which marks that asset metadata
+        may exist for a course. Asset metadata saved inline in that document by older code is moved
+        into the per-asset collection the first time the course is touched.
 
         Arguments:
             course_key (CourseKey): course identifier
 
         Returns:
-            CourseAssetsFromStorage object, wrapping the relevant Mongo doc. If asset metadata
-            exists, other keys will be the other asset types with values as lists of asset metadata.
+            The course_key, with the run filled in.
+
+        Raises:
+            ItemNotFoundError if the course does not exist.
         """
         # Using the course_key, find or insert the course asset metadata document.
-        # A single document exists per course to store the course asset metadata.
+        # A single document exists per course to mark its asset metadata.
         course_key = self.fill_in_run(course_key)
         if course_key.run is None:
             log.warning(u'No run found for combo org "{}" course "{}" on asset request.'.format(
@@ -1605,33 +1613,156 @@ class MongoModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase, Mongo
                 {'course_id': unicode(course_key)},
             )
 
-        doc_id = None if course_assets is None else course_assets['_id']
         if course_assets is None:
             # Check to see if the course is created in the course collection.
             if self.get_course(course_key) is None:
                 raise ItemNotFoundError(course_key)
             else:
                 # Course exists, so create matching assets document.
-                course_assets = {'course_id': unicode(course_key), 'assets': {}}
-                doc_id = self.asset_collection.insert(course_assets)
-        elif isinstance(course_assets['assets'], list):
-            # This record is in the old course assets format.
-            # Ensure that no data exists before updating the format.
-            assert len(course_assets['assets']) == 0
-            # Update the format to a dict.
+                self.asset_collection.insert({'course_id': unicode(course_key), 'assets': {}})
+        elif course_assets['assets'] != {}:
+            # This record is in an older course assets format, which either used a list or
+            # kept every asset inline in a dict keyed by asset type.
+            if isinstance(course_assets['assets'], dict):
+                self._upsert_asset_items(course_key, [
+                    asset for assets in course_assets['assets'].itervalues() for asset in assets
+                ])
+            # Update the format to an empty dict.
             self.asset_collection.update(
-                {'_id': doc_id},
+                {'_id': course_assets['_id']},
                 {'$set': {'assets': {}}}
             )
+        return course_key
+
+    def _find_course_assets(self, course_key):
+        """
+        Internal; finds (or creates) course asset info about all assets for a particular course
 
-        # Pass back wrapped 'assets' dict with the '_id' key added to it for document update purposes.
-        return CourseAssetsFromStorage(course_key, doc_id, course_assets['assets'])
+        Arguments:
+            course_key (CourseKey): course identifier
+
+        Returns:
+            CourseAssetsFromStorage object. Keys are the asset types with values as lists
+            of asset metadata sorted by filename.
+        """
+        course_key = self._find_course_asset_doc(course_key)
+        assets_by_type = defaultdict(list)
+        cursor = self.asset_item_collection.find(
+            self._asset_item_query(course_key), sort=[('filename', pymongo.ASCENDING)]
+        )
+        for asset in cursor:
+            assets_by_type[asset['asset_type']].append(self._asset_item_to_storable(asset))
+        return CourseAssetsFromStorage(course_key, None, dict(assets_by_type))
 
-    def _make_mongo_asset_key(self, asset_type):
+    def _asset_item_query(self, course_key, asset_type=None, filename=None):
         """
-        Given a asset type, form a key needed to update the proper embedded field in the Mongo doc.
+        Build a query against the per-asset collection for a course's assets, optionally
+        restricted to a single asset type and filename.
+        """
+        query = {'course_id': unicode(course_key)}
+        if asset_type is not None:
+            query['asset_type'] = asset_type
+        if filename is not None:
+            query['filename'] = filename
+        return query
+
+    def _asset_item_to_storable(self, asset_item):
+        """
+        Strip the per-asset collection bookkeeping from an asset document, leaving the
+        storable format produced by AssetMetadata.to_storable.
+        """
+        asset_item.pop('_id', None)
+        asset_item.pop('course_id', None)
+        return asset_item
+
+    def _upsert_asset_items(self, course_key, storable_assets):
+        """
+        Internal; inserts or replaces each of the storable asset metadata dicts in a single
+        unordered bulk write against the per-asset collection.
+        """
+        if not storable_assets:
+            return
+        bulk = self.asset_item_collection.initialize_unordered_bulk_op()
+        for storable in storable_assets:
+            asset_item = dict(storable, course_id=unicode(course_key))
+            bulk.find(
+                self._asset_item_query(course_key, storable['asset_type'], storable['filename'])
+            ).upsert().replace_one(asset_item)
+        bulk.execute()
+
+    @contract(asset_key='AssetKey')
+    def find_asset_metadata(self, asset_key, **kwargs):
+        """
+        Find the metadata for a particular course asset.
+
+        Arguments:
+            asset_key (AssetKey): key containing original asset filename
+
+        Returns:
+            asset metadata (AssetMetadata) -or- None if not found
+        """
+        course_key = self._find_course_asset_doc(asset_key.course_key)
+        asset_item = self.asset_item_collection.find_one(
+            self._asset_item_query(course_key, asset_key.asset_type, asset_key.path)
+        )
+        if asset_item is None:
+            return None
+
+        mdata = AssetMetadata(asset_key, asset_key.path, **kwargs)
+        mdata.from_storable(self._asset_item_to_storable(asset_item))
+        return mdata
+
+    @contract(
+        course_key='CourseKey', asset_type='None | basestring',
+        start='int | None', maxresults='int | None', sort='tuple(str,(int,>=1,<=2))|None'
+    )
+    def get_all_asset_metadata(self, course_key, asset_type, start=0, maxresults=-1, sort=None, **kwargs):
         """
-        return 'assets.{}'.format(asset_type)
+        Returns a list of asset metadata for all assets of the given asset_type in the course.
+        Sorting and paging are done by the database using the per-asset collection's indexes.
+
+        Args:
+            course_key (CourseKey): course identifier
+            asset_type (str): the block_type of the assets to return. If None, return assets of all types.
+            start (int): optional - start at this asset number. Zero-based!
+            maxresults (int): optional - return at most this many, -1 means no limit
+            sort (array): optional - None means no sort
+                (sort_by (str), sort_order (str))
+                sort_by - one of 'uploadDate' or 'displayname'
+                sort_order - one of SortOrder.ascending or SortOrder.descending
+
+        Returns:
+            List of AssetMetadata objects.
+        """
+        course_key = self._find_course_asset_doc(course_key)
+        if maxresults == 0:
+            return []
+
+        # Determine the proper sort - with defaults of ('displayname', SortOrder.ascending).
+        sort_field = 'filename'
+        direction = pymongo.ASCENDING
+        if sort:
+            if sort[0] == 'uploadDate':
+                sort_field = 'edit_info.edited_on'
+            if sort[1] == ModuleStoreEnum.SortOrder.descending:
+                direction = pymongo.DESCENDING
+
+        cursor = self.asset_item_collection.find(
+            self._asset_item_query(course_key, asset_type),
+            sort=[(sort_field, direction)],
+            skip=start or 0,
+        )
+        if maxresults > 0:
+            cursor = cursor.limit(maxresults)
+
+        ret_assets = []
+        for asset_item in cursor:
+            raw_asset = self._asset_item_to_storable(asset_item)
+            asset_key = course_key.make_asset_key(raw_asset['asset_type'], raw_asset['filename'])
+            new_asset = AssetMetadata(asset_key)
+            new_asset.from_storable(raw_asset)
+            ret_assets.append(new_asset)
+        return ret_assets
 
     @contract(asset_metadata_list='list(AssetMetadata)', user_id='int|long')
     def _save_asset_metadata_list(self, asset_metadata_list, user_id, import_only):
@@ -1644,19 +1775,21 @@ class MongoModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase, Mongo
             import_only (bool): True if edited_on/by data should remain unchanged.
         """
         course_key = asset_metadata_list[0].asset_id.course_key
-        course_assets = self._find_course_assets(course_key)
-        assets_by_type = self._save_assets_by_type(course_key, asset_metadata_list, course_assets, user_id, import_only)
-
-        # Build an update set with potentially multiple embedded fields.
-        updates_by_type = {}
-        for asset_type, assets in assets_by_type.iteritems():
-            updates_by_type[self._make_mongo_asset_key(asset_type)] = assets.as_list()
-
-        # Update the document.
-        self.asset_collection.update(
-            {'_id': course_assets.doc_id},
-            {'$set': updates_by_type}
-        )
+        course_key_with_run = self._find_course_asset_doc(course_key)
+
+        storable_assets = []
+        for asset_md in asset_metadata_list:
+            if asset_md.asset_id.course_key != course_key:
+                # pylint: disable=logging-format-interpolation
+                log.warning("Asset's course {} does not match other assets for course {} - not saved.".format(
+                    asset_md.asset_id.course_key, course_key
+                ))
+                continue
+            if not import_only:
+                asset_md.update({'edited_by': user_id, 'edited_on': datetime.now(UTC)})
+            storable_assets.append(asset_md.to_storable())
+
+        self._upsert_asset_items(course_key_with_run, storable_assets)
         return True
 
     @contract(asset_metadata='AssetMetadata', user_id='int|long')
@@ -1701,11 +1834,18 @@ class MongoModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase, Mongo
             source_course_key (CourseKey): identifier of course to copy from
             dest_course_key (CourseKey): identifier of course to copy to
         """
-        source_assets = self._find_course_assets(source_course_key)
-        dest_assets = {'assets': source_assets.asset_md.copy(), 'course_id': unicode(dest_course_key)}
+        source_course_key = self._find_course_asset_doc(source_course_key)
         self.asset_collection.remove({'course_id': unicode(dest_course_key)})
-        # Update the document.
-        self.asset_collection.insert(dest_assets)
+        self.asset_item_collection.remove(self._asset_item_query(dest_course_key))
+        self.asset_collection.insert({'course_id': unicode(dest_course_key), 'assets': {}})
+
+        dest_items = []
+        for asset_item in self.asset_item_collection.find(self._asset_item_query(source_course_key)):
+            asset_item = self._asset_item_to_storable(asset_item)
+            asset_item['course_id'] = unicode(dest_course_key)
+            dest_items.append(asset_item)
+        if dest_items:
+            self.asset_item_collection.insert(dest_items)
 
     @contract(asset_key='AssetKey', attr_dict=dict, user_id='int|long')
     def set_asset_metadata_attrs(self, asset_key, attr_dict, user_id):
@@ -1720,23 +1860,12 @@ class MongoModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase, Mongo
             ItemNotFoundError if no such item exists
             AttributeError is attr is one of the build in attrs.
         """
-        course_assets, asset_idx = self._find_course_asset(asset_key)
-        if asset_idx is None:
+        md = self.find_asset_metadata(asset_key)
+        if md is None:
             raise ItemNotFoundError(asset_key)
 
-        # Form an AssetMetadata.
-        all_assets = course_assets[asset_key.asset_type]
-        md = AssetMetadata(asset_key, asset_key.path)
-        md.from_storable(all_assets[asset_idx])
         md.update(attr_dict)
-
-        # Generate a Mongo doc from the metadata and update the course asset info.
-        all_assets[asset_idx] = md.to_storable()
-
-        self.asset_collection.update(
-            {'_id': course_assets.doc_id},
-            {"$set": {self._make_mongo_asset_key(asset_key.asset_type): all_assets}}
-        )
+        self._upsert_asset_items(self.fill_in_run(asset_key.course_key), [md.to_storable()])
 
     @contract(asset_key='AssetKey', user_id='int|long')
     def delete_asset_metadata(self, asset_key, user_id):
@@ -1749,19 +1878,34 @@ class MongoModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase, Mongo
         Returns:
             Number of asset metadata entries deleted (0 or 1)
         """
-        course_assets, asset_idx = self._find_course_asset(asset_key)
-        if asset_idx is None:
-            return 0
+        return self.delete_asset_metadata_list([asset_key], user_id)
 
-        all_asset_info = course_assets[asset_key.asset_type]
-        all_asset_info.pop(asset_idx)
+    @contract(asset_keys='list(AssetKey)', user_id='int|long')
+    def delete_asset_metadata_list(self, asset_keys, user_id):
+        """
+        Deletes the metadata of several assets of one course with a single query.
 
-        # Update the document.
-        self.asset_collection.update(
-            {'_id': course_assets.doc_id},
-            {'$set': {self._make_mongo_asset_key(asset_key.asset_type): all_asset_info}}
-        )
-        return 1
+        Arguments:
+            asset_keys (list(AssetKey)): keys containing original asset filenames
+            user_id (int|long): user deleting the metadata
+
+        Returns:
+            Number of asset metadata entries deleted
+        """
+        if not asset_keys:
+            return 0
+        course_key = self._find_course_asset_doc(asset_keys[0].course_key)
+
+        filenames_by_type = defaultdict(list)
+        for asset_key in asset_keys:
+            filenames_by_type[asset_key.asset_type].append(asset_key.path)
+        query = self._asset_item_query(course_key)
+        query['$or'] = [
+            {'asset_type': asset_type, 'filename': {'$in': filenames}}
+            for asset_type, filenames in filenames_by_type.iteritems()
+        ]
+        result = self.asset_item_collection.remove(query)
+        return result['n']
 
     # pylint: disable=unused-argument
     @contract(course_key='CourseKey', user_id='int|long')
@@ -1772,14 +1916,9 @@ class MongoModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase, Mongo
         Arguments:
             course_key (CourseKey): course_identifier
         """
-        # Using the course_id, find the course asset metadata document.
-        # A single document exists per course to store the course asset metadata.
-        try:
-            course_assets = self._find_course_assets(course_key)
-            self.asset_collection.remove(course_assets.doc_id)
-        except ItemNotFoundError:
-            # When deleting asset metadata, if a course's asset metadata is not present, no big deal.
-            pass
+        course_key = self.fill_in_run(course_key)
+        self.asset_collection.remove({'course_id': unicode(course_key)})
+        self.asset_item_collection.remove(self._asset_item_query(course_key))
 
     def heartbeat(self):
         """
@@ -1816,6 +1955,28 @@ class MongoModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase, Mongo
         # To allow prioritizing draft vs published material
         self.collection.create_index('_id.revision')
 
+        # Asset metadata is looked up by filename and paged by filename or upload date, either
+        # within one asset type or across all of a course's assets:
+        self.asset_collection.create_index('course_id')
+        self.asset_item_collection.create_index([
+            ('course_id', pymongo.ASCENDING),
+            ('asset_type', pymongo.ASCENDING),
+            ('filename', pymongo.ASCENDING),
+        ], unique=True)
+        self.asset_item_collection.create_index([
+            ('course_id', pymongo.ASCENDING),
+            ('filename', pymongo.ASCENDING),
+        ])
+        self.asset_item_collection.create_index([
+            ('course_id', pymongo.ASCENDING),
+            ('asset_type', pymongo.ASCENDING),
+            ('edit_info.edited_on', pymongo.ASCENDING),
+        ])
+        self.asset_item_collection.create_index([
+            ('course_id', pymongo.ASCENDING),
+            ('edit_info.edited_on', pymongo.ASCENDING),
+        ])
+
     # Some overrides that still need to be implemented by subclasses
     def convert_to_draft(self, location, user_id):
         raise NotImplementedError()
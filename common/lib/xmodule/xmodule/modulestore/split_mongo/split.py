@@ -1679,6 +1679,7 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
         definition_fields = self._serialize_fields(root_category, partitioned_fields.get(Scope.content, {}))
 
         # build from inside out: definition, structure, index entry
+        reuses_structure = False
         # if building a wholly new structure
         if versions_dict is None or master_branch not in versions_dict:
             # create new definition and structure
@@ -1723,12 +1724,15 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
             versions_dict[master_branch] = new_id
         else:  # Pointing to an existing course structure
             new_id = versions_dict[master_branch]
+            reuses_structure = True
             draft_version = CourseLocator(version_guid=new_id)
             draft_structure = self._lookup_course(draft_version).structure
 
         locator = locator.replace(version_guid=new_id)
         with self.bulk_operations(locator):
-            self.update_structure(locator, draft_structure)
+            # An existing structure is shared as is, so there's nothing to write for it
+            if not reuses_structure:
+                self.update_structure(locator, draft_structure)
             index_entry = {
                 '_id': ObjectId(),
                 'org': locator.org,
@@ -2612,6 +2616,51 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
         except ItemNotFoundError:
             return 0
 
+    @contract(asset_keys='list(AssetKey)')
+    def delete_asset_metadata_list(self, asset_keys, user_id):
+        """
+        Deletes the metadata of several assets of one course, versioning the structure only once.
+
+        Arguments:
+            asset_keys (list(AssetKey)): keys containing original asset filenames
+
+        Returns:
+            Number of asset metadata entries deleted
+        """
+        if not asset_keys:
+            return 0
+        course_key = asset_keys[0].course_key
+
+        with self.bulk_operations(course_key):
+            original_structure = self._lookup_course(course_key).structure
+            filenames_by_type = defaultdict(set)
+            for asset_key in asset_keys:
+                filenames_by_type[asset_key.asset_type].add(asset_key.path)
+
+            course_assets = original_structure.get('assets', {})
+            remaining_by_type = {}
+            num_deleted = 0
+            for asset_type, filenames in filenames_by_type.iteritems():
+                all_assets = course_assets.get(asset_type, [])
+                remaining = [asset for asset in all_assets if asset['filename'] not in filenames]
+                if len(remaining) != len(all_assets):
+                    remaining_by_type[asset_type] = remaining
+                    num_deleted += len(all_assets) - len(remaining)
+            if num_deleted == 0:
+                return 0
+
+            index_entry = self._get_index_if_valid(course_key)
+            new_structure = self.version_structure(course_key, original_structure, user_id)
+            new_structure.setdefault('assets', {}).update(remaining_by_type)
+
+            # update index if appropriate and structures
+            self.update_structure(course_key, new_structure)
+
+            if index_entry is not None:
+                # update the index entry if appropriate
+                self._update_head(course_key, index_entry, asset_keys[0].branch, new_structure['_id'])
+        return num_deleted
+
     @contract(source_course_key='CourseKey', dest_course_key='CourseKey')
     def copy_all_asset_metadata(self, source_course_key, dest_course_key, user_id):
         """
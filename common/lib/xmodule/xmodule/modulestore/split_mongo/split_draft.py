@@ -2,6 +2,8 @@
 Module for the dual-branch fall-back Draft->Published Versioning ModuleStore
 """
 
+from collections import OrderedDict
+
 from xmodule.modulestore.split_mongo.split import SplitMongoModuleStore, EXCLUDE_ALL
 from xmodule.exceptions import InvalidVersionError
 from xmodule.modulestore import ModuleStoreEnum
@@ -20,6 +22,14 @@ class DraftVersioningModuleStore(SplitMongoModuleStore, ModuleStoreDraftAndPubli
     A subclass of Split that supports a dual-branch fall-back versioning framework
         with a Draft branch that falls back to a Published branch.
     """
+    # The maximum number of (draft version, published version) pairs whose changed blocks are cached
+    CHANGED_BLOCKS_CACHE_SIZE = 64
+
+    def __init__(self, *args, **kwargs):
+        super(DraftVersioningModuleStore, self).__init__(*args, **kwargs)
+        # Structures are immutable once saved, so the diff between two versions never goes stale
+        self._changed_blocks_cache = OrderedDict()
+
     def create_course(self, org, course, run, user_id, skip_auto_publish=False, **kwargs):
         """
         Creates and returns the course.
@@ -307,36 +317,89 @@ class DraftVersioningModuleStore(SplitMongoModuleStore, ModuleStoreDraftAndPubli
         :param xblock: the block to check
         :return: True if the draft and published versions differ
         """
-        def get_course(branch_name):
-            return self._lookup_course(xblock.location.course_key.for_branch(branch_name)).structure
-
-        def get_block(course_structure, block_key):
-            return self._get_block_from_structure(course_structure, block_key)
-
-        draft_course = get_course(ModuleStoreEnum.BranchName.draft)
-        published_course = get_course(ModuleStoreEnum.BranchName.published)
-
-        def has_changes_subtree(block_key):
-            draft_block = get_block(draft_course, block_key)
-            if draft_block is None:  # temporary fix for bad pointers TNL-1141
-                return True
-            published_block = get_block(published_course, block_key)
-            if published_block is None:
-                return True
-
-            # check if the draft has changed since the published was created
-            if self._get_version(draft_block) != self._get_version(published_block):
-                return True
-
-            # check the children in the draft
-            if 'children' in draft_block.fields:
-                return any(
-                    [has_changes_subtree(child_block_id) for child_block_id in draft_block.fields['children']]
+        block_key = BlockKey.from_usage_key(xblock.location)
+        changed_blocks = self.get_changed_blocks(xblock.location.course_key)
+        # temporary fix for bad pointers TNL-1141: a block missing from the draft is always changed
+        return block_key in changed_blocks or block_key not in self._get_draft_blocks(xblock.location.course_key)
+
+    def _get_draft_blocks(self, course_key):
+        """
+        Returns the blocks of the draft structure for the given course
+        """
+        return self._lookup_course(course_key.for_branch(ModuleStoreEnum.BranchName.draft)).structure['blocks']
+
+    def get_changed_blocks(self, course_key):
+        """
+        Returns the set of BlockKeys in the draft branch of the given course which have unpublished changes,
+        i.e. whose draft and published versions differ or which have a descendant with unpublished changes.
+
+        The draft and published structures are compared in a single pass and the result is cached per
+        (draft version, published version) pair, so that repeated has_changes calls are set lookups.
+        """
+        def get_structure(branch_name):
+            return self._lookup_course(course_key.for_branch(branch_name)).structure
+
+        draft_structure = get_structure(ModuleStoreEnum.BranchName.draft)
+        published_structure = get_structure(ModuleStoreEnum.BranchName.published)
+
+        # Structures being edited in an active bulk operation are mutated in place, so don't cache their diff
+        bulk_write_record = self._get_bulk_ops_record(course_key)
+        cacheable = not (bulk_write_record.active and bulk_write_record.dirty_branches)
+        cache_key = (draft_structure['_id'], published_structure['_id'])
+        if cacheable and cache_key in self._changed_blocks_cache:
+            return self._changed_blocks_cache[cache_key]
+
+        changed_blocks = self._compute_changed_blocks(draft_structure, published_structure)
+
+        if cacheable:
+            self._changed_blocks_cache[cache_key] = changed_blocks
+            while len(self._changed_blocks_cache) > self.CHANGED_BLOCKS_CACHE_SIZE:
+                self._changed_blocks_cache.popitem(last=False)
+        return changed_blocks
+
+    def _compute_changed_blocks(self, draft_structure, published_structure):
+        """
+        Returns a frozenset of the BlockKeys in draft_structure which differ from published_structure
+        either themselves or in any of their descendants.
+        """
+        draft_blocks = draft_structure['blocks']
+        published_blocks = published_structure['blocks']
+        has_changes = {}
+        in_progress = set()
+
+        for root_key in draft_blocks:
+            if root_key in has_changes:
+                continue
+            # Iterative post-order traversal, so that deep structures can't exhaust the stack
+            stack = [(root_key, False)]
+            while stack:
+                block_key, children_visited = stack.pop()
+                if block_key in has_changes:
+                    continue
+                draft_block = draft_blocks.get(block_key)
+                if draft_block is None:  # temporary fix for bad pointers TNL-1141
+                    has_changes[block_key] = True
+                    continue
+                children = draft_block.fields.get('children', [])
+                if not children_visited:
+                    # Mark the block as in progress so that a (malformed) cycle can't loop forever
+                    in_progress.add(block_key)
+                    stack.append((block_key, True))
+                    stack.extend(
+                        (child_key, False) for child_key in children
+                        if child_key not in has_changes and child_key not in in_progress
+                    )
+                    continue
+
+                published_block = published_blocks.get(block_key)
+                has_changes[block_key] = (
+                    published_block is None or
+                    # check if the draft has changed since the published was created
+                    self._get_version(draft_block) != self._get_version(published_block) or
+                    any(has_changes.get(child_key, False) for child_key in children)
                 )
 
-            return False
-
-        return has_changes_subtree(BlockKey.from_usage_key(xblock.location))
+        return frozenset(block_key for block_key, changed in has_changes.iteritems() if changed)
 
     def publish(self, location, user_id, blacklist=None, **kwargs):
         """
@@ -559,6 +622,18 @@ class DraftVersioningModuleStore(SplitMongoModuleStore, ModuleStoreDraftAndPubli
         for k in asset_keys:
             asset_md.asset_id = k
 
+    def delete_asset_metadata_list(self, asset_keys, user_id):
+        """
+        Deletes from both the published and draft branches, and returns the number of entries
+        deleted from both.
+        """
+        num_deleted = 0
+        for revision in [ModuleStoreEnum.RevisionOption.published_only, ModuleStoreEnum.RevisionOption.draft_only]:
+            num_deleted += super(DraftVersioningModuleStore, self).delete_asset_metadata_list(
+                [self._map_revision_to_branch(asset_key, revision) for asset_key in asset_keys], user_id
+            )
+        return num_deleted
+
     def _find_course_asset(self, asset_key):
         return super(DraftVersioningModuleStore, self)._find_course_asset(
             self._map_revision_to_branch(asset_key)
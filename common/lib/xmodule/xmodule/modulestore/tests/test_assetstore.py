@@ -16,7 +16,7 @@ from xmodule.modulestore.exceptions import ItemNotFoundError
 from xmodule.modulestore.tests.factories import CourseFactory
 from xmodule.modulestore.tests.test_cross_modulestore_import_export import (
     MIXED_MODULESTORE_BOTH_SETUP, MODULESTORE_SETUPS, MongoContentstoreBuilder,
-    XmlModulestoreBuilder, MixedModulestoreBuilder
+    MongoModulestoreBuilder, XmlModulestoreBuilder, MixedModulestoreBuilder, VersioningModulestoreBuilder
 )
 
 
@@ -191,6 +191,68 @@ class TestMongoAssetMetadataStorage(unittest.TestCase):
             self.assertEquals(store.delete_asset_metadata(new_asset_loc, ModuleStoreEnum.UserID.test), 1)
             self.assertEquals(len(store.get_all_asset_metadata(course.id, 'asset')), 0)
 
+    @ddt.data(*MODULESTORE_SETUPS)
+    def test_delete_metadata_list(self, storebuilder):
+        """
+        Delete the metadata of several assets of different types at once
+        """
+        with storebuilder.build() as (__, store):
+            course = CourseFactory.create(modulestore=store)
+            self.assertEquals(store.delete_asset_metadata_list([], ModuleStoreEnum.UserID.test), 0)
+            store.save_asset_metadata_list(
+                [self._make_asset_metadata(course.id.make_asset_key(*info)) for info in self.alls],
+                ModuleStoreEnum.UserID.test
+            )
+
+            asset_keys = [course.id.make_asset_key(*info) for info in self.differents + self.vrmls]
+            asset_keys.append(course.id.make_asset_key('vrml', 'not_here.vrml'))
+            # Split keeps the metadata of each asset in both its draft and published branches.
+            num_branches = 2 if store.get_modulestore_type(course.id) == ModuleStoreEnum.Type.split else 1
+            self.assertEquals(
+                store.delete_asset_metadata_list(asset_keys, ModuleStoreEnum.UserID.test), 3 * num_branches
+            )
+
+            assets = store.get_all_asset_metadata(course.id, None)
+            self.assertEquals(len(assets), len(self.regular_assets))
+            self._check_asset_values(assets, self.regular_assets)
+
+    def test_delete_metadata_list_both_branches(self):
+        """
+        Delete the metadata of assets saved in both the draft and published branches of a split course
+        """
+        with MixedModulestoreBuilder([('split', VersioningModulestoreBuilder())]).build() as (__, store):
+            course = CourseFactory.create(modulestore=store)
+            asset_keys = [course.id.make_asset_key(*info) for info in self.differents + self.vrmls]
+            store.save_asset_metadata_list(
+                [self._make_asset_metadata(asset_key) for asset_key in asset_keys], ModuleStoreEnum.UserID.test
+            )
+
+            self.assertEquals(
+                store.delete_asset_metadata_list(asset_keys, ModuleStoreEnum.UserID.test), 2 * len(asset_keys)
+            )
+            for branch_setting in (ModuleStoreEnum.Branch.draft_preferred, ModuleStoreEnum.Branch.published_only):
+                with store.branch_setting(branch_setting, course.id):
+                    self.assertEquals(len(store.get_all_asset_metadata(course.id, None)), 0)
+
+    def test_inline_course_assets_moved_to_items(self):
+        """
+        Asset metadata stored inline in the per-course document by older code is moved into
+        the per-asset collection when the course's assets are next accessed.
+        """
+        with MongoModulestoreBuilder().build() as (__, store):
+            course = CourseFactory.create(modulestore=store)
+            asset_key = course.id.make_asset_key('asset', 'burnside.jpg')
+            asset_md = self._make_asset_metadata(asset_key)
+            store.asset_collection.insert({
+                'course_id': unicode(course.id),
+                'assets': {'asset': [asset_md.to_storable()]},
+            })
+
+            self.assertEquals(store.find_asset_metadata(asset_key), asset_md)
+            self.assertEquals(len(store.get_all_asset_metadata(course.id, 'asset')), 1)
+            self.assertEquals(store.asset_collection.find_one({'course_id': unicode(course.id)})['assets'], {})
+            self.assertEquals(store.asset_item_collection.find({'course_id': unicode(course.id)}).count(), 1)
+
     @ddt.data(*MODULESTORE_SETUPS)
     def test_find_non_existing_assets(self, storebuilder):
         """
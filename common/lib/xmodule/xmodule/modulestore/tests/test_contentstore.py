@@ -197,6 +197,68 @@ class TestContentstore(unittest.TestCase):
         __, count = self.contentstore.get_all_content_for_course(dest_course)
         self.assertEqual(count, len(self.course1_files))
 
+    @ddt.data(True, False)
+    def test_copy_assets_shares_data(self, deprecated):
+        """
+        copy_all_course_assets shares the copied data, deduplicated by content, until the last copy is deleted
+        """
+        self.set_up_assets(deprecated)
+        num_chunks = self.contentstore.fs_chunks.count()
+        dest_course = CourseLocator('test', 'destination', 'copy')
+        self.contentstore.copy_all_course_assets(self.course1_key, dest_course)
+        # course2's picture1.jpg has the same content as course1's, so copying it reuses the shared data
+        self.contentstore.copy_all_course_assets(self.course2_key, CourseLocator('test', 'destination2', 'copy'))
+        self.assertLess(self.contentstore.fs_chunks.count(), num_chunks)
+
+        filename = self.course1_files[1]
+        asset_key = self.course1_key.make_asset_key('asset', filename)
+        dest_key = dest_course.make_asset_key('asset', filename)
+        data = self.contentstore.find(asset_key).data
+        self.contentstore.delete(asset_key)
+        self.assertEqual(self.contentstore.find(dest_key).data, data)
+        self.assertEqual(self.contentstore.find(dest_key, as_stream=True).copy_to_in_mem().data, data)
+
+        # the source can be saved again without disturbing its copies
+        self.save_asset(self.course1_files[0], asset_key, filename, False)
+        self.assertNotEqual(self.contentstore.find(asset_key).data, data)
+        self.assertEqual(self.contentstore.find(dest_key).data, data)
+
+        self.contentstore.delete_all_course_assets(dest_course)
+        self.contentstore.delete_all_course_assets(CourseLocator('test', 'destination2', 'copy'))
+        self.contentstore.delete_all_course_assets(self.course1_key)
+        self.contentstore.delete_all_course_assets(self.course2_key)
+        self.assertEqual(self.contentstore.fs_blobs.count(), 0)
+        self.assertEqual(self.contentstore.fs_chunks.count(), 0)
+
+    @ddt.data(True, False)
+    def test_copy_assets_different_chunk_sizes(self, deprecated):
+        """
+        copy_all_course_assets doesn't share data between files with the same content but chunked differently
+        """
+        self.set_up_assets(deprecated)
+        filename = 'picture1.jpg'
+        asset_key = self.course2_key.make_asset_key('asset', filename)
+        data = self.contentstore.find(self.course1_key.make_asset_key('asset', filename)).data
+        # Save course2's copy of the picture as if it had been uploaded with another chunk size.
+        self.contentstore.delete(asset_key)
+        content_id, content_son = self.contentstore.asset_db_key(asset_key)
+        with self.contentstore.fs.new_file(
+            _id=content_id, filename=unicode(asset_key), content_type='image/jpeg', displayname=filename,
+            content_son=content_son, thumbnail_location=None, import_path=None, locked=False, chunkSize=1000
+        ) as fp:
+            fp.write(data)
+
+        dest_course1 = CourseLocator('test', 'destination', 'copy')
+        dest_course2 = CourseLocator('test', 'destination2', 'copy')
+        self.contentstore.copy_all_course_assets(self.course1_key, dest_course1)
+        self.contentstore.copy_all_course_assets(self.course2_key, dest_course2)
+
+        for course_key in (self.course1_key, self.course2_key, dest_course1, dest_course2):
+            self.assertEqual(self.contentstore.find(course_key.make_asset_key('asset', filename)).data, data)
+        self.assertEqual(
+            self.contentstore.fs_blobs.find({'length': len(data)}).count(), 2
+        )
+
     @ddt.data(True, False)
     def test_delete_assets(self, deprecated):
         """
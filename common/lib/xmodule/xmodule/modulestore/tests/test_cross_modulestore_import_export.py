@@ -305,10 +305,10 @@ class MixedModulestoreBuilder(StoreBuilderBase):
             return None
 
         store = all_stores[0]
-        if hasattr(store, 'asset_collection'):
+        if hasattr(store, 'asset_item_collection'):
             # Mongo modulestore beneath mixed.
-            # Returns the entire collection with *all* courses' asset metadata.
-            return store.asset_collection
+            # Returns the entire collection with *all* courses' per-asset metadata documents.
+            return store.asset_item_collection
         else:
             # Split modulestore beneath mixed.
             # Split stores all asset metadata in the structure collection.
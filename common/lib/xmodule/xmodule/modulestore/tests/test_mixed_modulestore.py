@@ -38,6 +38,7 @@ from xmodule.modulestore import ModuleStoreEnum
 from xmodule.modulestore.draft_and_published import UnsupportedRevisionError, DIRECT_ONLY_CATEGORIES
 from xmodule.modulestore.exceptions import ItemNotFoundError, DuplicateCourseError, ReferentialIntegrityError, NoPathToItem
 from xmodule.modulestore.mixed import MixedModuleStore
+from xmodule.modulestore.split_mongo import BlockKey
 from xmodule.modulestore.search import path_to_location
 from xmodule.modulestore.tests.factories import check_mongo_calls, check_exact_number_of_calls, \
     mongo_uses_error_check
@@ -599,6 +600,26 @@ class TestMixedModuleStore(CourseComparisonTest):
         self.assertFalse(self._has_changes(locations['grandparent']))
         self.assertFalse(self._has_changes(locations['parent']))
 
+    def test_get_changed_blocks_split(self):
+        """
+        Tests that split computes the changed blocks of a course in one pass and caches them per version pair.
+        """
+        locations = self.setup_has_changes('split')
+        split_store = self.store._get_modulestore_for_courselike(self.course.id)  # pylint: disable=protected-access
+        self.assertEqual(split_store.get_changed_blocks(self.course.id), frozenset())
+        # the diff of unchanged versions is served from the cache
+        self.assertIs(split_store.get_changed_blocks(self.course.id), split_store.get_changed_blocks(self.course.id))
+
+        child = self.store.get_item(locations['child'])
+        child.display_name = 'Changed Display Name'
+        self.store.update_item(child, self.user_id)
+
+        changed_blocks = split_store.get_changed_blocks(self.course.id)
+        for key in ('grandparent', 'parent', 'child'):
+            self.assertIn(BlockKey.from_usage_key(locations[key]), changed_blocks)
+        for key in ('parent_sibling', 'child_sibling'):
+            self.assertNotIn(BlockKey.from_usage_key(locations[key]), changed_blocks)
+
     @ddt.data('draft', 'split')
     def test_has_changes_add_remove_child(self, default_ms):
         """
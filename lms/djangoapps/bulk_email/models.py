@@ -20,7 +20,7 @@ from html_to_text import html_to_text
 from mail_utils import wrap_message
 
 from xmodule_django.models import CourseKeyField
-from util.keyword_substitution import substitute_keywords_with_data
+from util.keyword_substitution import KEYWORD_FUNCTION_MAP, substitute_keywords, substitute_keywords_with_data
 
 log = logging.getLogger(__name__)
 
@@ -150,6 +150,12 @@ class Optout(models.Model):
 # the location where the email message body is to be inserted.
 COURSE_EMAIL_MESSAGE_BODY_TAG = '{{message_body}}'
 
+# Keys of the email context whose values differ between the recipients of an email.
+RECIPIENT_CONTEXT_KEYS = ('name', 'email', 'user_id')
+
+# Stands for the value of a recipient context key in a template formatted for all recipients.
+RECIPIENT_CONTEXT_MARKER = u'\x00{key}\x00'
+
 
 class CourseEmailTemplate(models.Model):
     """
@@ -229,6 +235,66 @@ class CourseEmailTemplate(models.Model):
         return CourseEmailTemplate._render(self.html_template, htmltext, context)
 
 
+class CourseEmailRenderer(object):
+    """
+    Renders the plain text and HTML messages of a course email for each of
+    its recipients.
+
+    The templates are formatted with the context shared by all recipients
+    once. Rendering a recipient's messages then only fills in the values of
+    RECIPIENT_CONTEXT_KEYS and the %%KEYWORD%% substitutions of the message
+    bodies. The messages are the same as those of `render_plaintext` and
+    `render_htmltext`.
+    """
+    def __init__(self, template, plaintext, htmltext, context):
+        """
+        `template` is the CourseEmailTemplate, `plaintext` and `htmltext` the
+        message bodies and `context` the context shared by all recipients.
+        """
+        self.markers = {key: RECIPIENT_CONTEXT_MARKER.format(key=key) for key in RECIPIENT_CONTEXT_KEYS}
+        shared_context = dict(context, **self.markers)
+        self.plain_template = template.plain_template.format(**shared_context)
+        self.html_template = template.html_template.format(**shared_context)
+        self.plaintext = plaintext
+        self.htmltext = htmltext
+        # Whether a message body has %%KEYWORD%%s, which are substituted with
+        # data of the recipient and the course.
+        self.has_keywords = any(
+            keyword in body
+            for body in (plaintext, htmltext) if body
+            for keyword in KEYWORD_FUNCTION_MAP
+        )
+
+    def _render(self, formatted_template, message_body, recipient_context, user, course):
+        """
+        Fill in a formatted template for one recipient, see
+        `CourseEmailTemplate._render`.
+        """
+        if self.has_keywords:
+            message_body = substitute_keywords(message_body, user, course)
+
+        result = formatted_template
+        for key, marker in self.markers.iteritems():
+            result = result.replace(marker, unicode(recipient_context[key]))
+
+        message_body_tag = COURSE_EMAIL_MESSAGE_BODY_TAG.format()
+        result = result.replace(message_body_tag, message_body, 1)
+        return wrap_message(result)
+
+    def render(self, recipient_context, user=None, course=None):
+        """
+        Returns the plain text and HTML messages for one recipient.
+
+        `recipient_context` has the values of RECIPIENT_CONTEXT_KEYS for the
+        recipient. The recipient's User and the course descriptor are only
+        needed, to substitute keywords, if `has_keywords`.
+        """
+        return (
+            self._render(self.plain_template, self.plaintext, recipient_context, user, course),
+            self._render(self.html_template, self.htmltext, recipient_context, user, course),
+        )
+
+
 class CourseAuthorization(models.Model):
     """
     Enable the course email feature on a course-by-course basis.
@@ -257,6 +323,19 @@ class CourseAuthorization(models.Model):
         except cls.DoesNotExist:
             return False
 
+    @classmethod
+    def instructor_email_enabled_for_courses(cls, course_ids):
+        """
+        Returns the set of the ids of the courses in `course_ids` for which
+        email is enabled, checked in a single query.
+        """
+        if not settings.FEATURES['REQUIRE_COURSE_EMAIL_AUTH']:
+            return set(course_ids)
+
+        return set(
+            cls.objects.filter(course_id__in=course_ids, email_enabled=True).values_list('course_id', flat=True)
+        )
+
     def __unicode__(self):
         not_en = "Not "
         if self.email_enabled:
@@ -0,0 +1,113 @@
+"""
+Sending of the messages of a bulk email over several mail connections at
+once, at a limited rate.
+"""
+from Queue import Queue
+import threading
+import time
+
+
+class TokenBucket(object):
+    """
+    Limits the rate of an operation to `rate` per second, allowing bursts of
+    up to `capacity` operations.
+
+    Can be shared by several threads.
+    """
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity or max(rate, 1))
+        self.tokens = self.capacity
+        self.last_refill = time.time()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Waits until the operation may be performed once more.
+        """
+        while True:
+            with self.lock:
+                now = time.time()
+                self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.rate)
+                self.last_refill = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+def send_concurrently(connections, send, items, rate_limiter=None, is_stopping_error=lambda exc: True):
+    """
+    Sends `items` over `connections`, one item per connection at a time.
+
+    `send(connection, item)` sends one item, e.g. an email message, over one
+    of the open `connections`. `items` is iterated in the calling thread,
+    only as connections become free, so items can be built lazily. If there
+    are several connections, each sends from its own thread.
+
+    Yields `(item, exception)` for each item sent, in the calling thread,
+    `exception` being None if sending succeeded. Once an exception for
+    which `is_stopping_error` is true is yielded, no more items are sent,
+    but the results of the items already being sent are still yielded.
+
+    `rate_limiter` is an optional TokenBucket acquired before each send.
+    """
+    def send_item(connection, item):
+        """Sends `item`, returning the exception raised, if any."""
+        if rate_limiter is not None:
+            rate_limiter.acquire()
+        try:
+            send(connection, item)
+        except Exception as exc:  # pylint: disable=broad-except
+            return exc
+        return None
+
+    if len(connections) == 1:
+        for item in items:
+            exception = send_item(connections[0], item)
+            yield item, exception
+            if exception is not None and is_stopping_error(exception):
+                return
+        return
+
+    pending = Queue()
+    results = Queue()
+
+    def sender(connection):
+        """Sends the items queued in `pending` until it gets None."""
+        while True:
+            item = pending.get()
+            if item is None:
+                return
+            results.put((item, send_item(connection, item)))
+
+    threads = [threading.Thread(target=sender, args=(connection,)) for connection in connections]
+    for thread in threads:
+        thread.daemon = True
+        thread.start()
+
+    items = iter(items)
+    num_sending = 0
+    stopped = False
+    try:
+        while True:
+            while not stopped and num_sending < len(connections):
+                try:
+                    pending.put(next(items))
+                except StopIteration:
+                    stopped = True
+                else:
+                    num_sending += 1
+            if num_sending == 0:
+                return
+            item, exception = results.get()
+            num_sending -= 1
+            if exception is not None and is_stopping_error(exception):
+                stopped = True
+            yield item, exception
+    finally:
+        for __ in threads:
+            pending.put(None)
+        for thread in threads:
+            thread.join()
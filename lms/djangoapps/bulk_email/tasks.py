@@ -5,7 +5,6 @@ to a course.
 import re
 import random
 import json
-from time import sleep
 from collections import Counter
 import logging
 
@@ -34,10 +33,11 @@ from django.core.mail import EmailMultiAlternatives, get_connection
 from django.core.urlresolvers import reverse
 
 from bulk_email.models import (
-    CourseEmail, Optout, CourseEmailTemplate,
+    CourseEmail, Optout, CourseEmailTemplate, CourseEmailRenderer,
     SEND_TO_MYSELF, SEND_TO_ALL, TO_OPTIONS,
     SEND_TO_STAFF,
 )
+from bulk_email.sending import TokenBucket, send_concurrently
 from courseware.courses import get_course, course_image_url
 from student.roles import CourseStaffRole, CourseInstructorRole
 from instructor_task.models import InstructorTask
@@ -48,6 +48,7 @@ from instructor_task.subtasks import (
     update_subtask_status,
 )
 from util.query import use_read_replica_if_available
+from xmodule.modulestore.django import modulestore
 
 log = logging.getLogger('edx.celery.task')
 
@@ -427,7 +428,6 @@ def _send_course_email(entry_id, email_id, to_list, global_email_context, subtas
     parent_task_id = InstructorTask.objects.get(pk=entry_id).task_id
     task_id = subtask_status.task_id
     total_recipients = len(to_list)
-    recipient_num = 0
     total_recipients_successful = 0
     total_recipients_failed = 0
     recipients_info = Counter()
@@ -470,31 +470,22 @@ def _send_course_email(entry_id, email_id, to_list, global_email_context, subtas
 
     # use the CourseEmailTemplate that was associated with the CourseEmail
     course_email_template = course_email.get_template()
-    try:
-        connection = get_connection()
-        connection.open()
-
-        # Define context values to use in all course emails:
-        email_context = {'name': '', 'email': ''}
-        email_context.update(global_email_context)
 
-        while to_list:
-            # Update context with user-specific values from the user at the end of the list.
-            # At the end of processing this user, they will be popped off of the to_list.
-            # That way, the to_list will always contain the recipients remaining to be emailed.
-            # This is convenient for retries, which will need to send to those who haven't
-            # yet been emailed, but not send to those who have already been sent to.
-            recipient_num += 1
-            current_recipient = to_list[-1]
+    def _create_messages():
+        """
+        Yields the recipient number, recipient and message of each recipient,
+        starting from the end of the to_list.
+        """
+        for recipient_num, current_recipient in enumerate(reversed(list(to_list)), start=1):
             email = current_recipient['email']
-            email_context['email'] = email
-            email_context['name'] = current_recipient['profile__name']
-            email_context['user_id'] = current_recipient['pk']
-            email_context['course_id'] = course_email.course_id
+            recipient_context = {
+                'email': email,
+                'name': current_recipient['profile__name'],
+                'user_id': current_recipient['pk'],
+            }
 
             # Construct message content using templates and context:
-            plaintext_msg = course_email_template.render_plaintext(course_email.text_message, email_context)
-            html_msg = course_email_template.render_htmltext(course_email.html_message, email_context)
+            plaintext_msg, html_msg = renderer.render(recipient_context, users.get(current_recipient['pk']), course)
 
             # Create email:
             email_msg = EmailMultiAlternatives(
@@ -502,34 +493,72 @@ def _send_course_email(entry_id, email_id, to_list, global_email_context, subtas
                 plaintext_msg,
                 from_addr,
                 [email],
-                connection=connection
             )
             email_msg.attach_alternative(html_msg, 'text/html')
 
-            # Throttle if we have gotten the rate limiter.  This is not very high-tech,
-            # but if a task has been retried for rate-limiting reasons, then we sleep
-            # for a period of time between all emails within this task.  Choice of
-            # the value depends on the number of workers that might be sending email in
-            # parallel, and what the SES throttle rate is.
-            if subtask_status.retried_nomax > 0:
-                sleep(settings.BULK_EMAIL_RETRY_DELAY_BETWEEN_SENDS)
-
-            try:
-                log.info(
-                    "BulkEmail ==> Task: %s, SubTask: %s, EmailId: %s, Recipient num: %s/%s, \
-                    Recipient name: %s, Email address: %s",
-                    parent_task_id,
-                    task_id,
-                    email_id,
-                    recipient_num,
-                    total_recipients,
-                    current_recipient['profile__name'],
-                    email
-                )
-                with dog_stats_api.timer('course_email.single_send.time.overall', tags=[_statsd_tag(course_title)]):
-                    connection.send_messages([email_msg])
+            log.info(
+                "BulkEmail ==> Task: %s, SubTask: %s, EmailId: %s, Recipient num: %s/%s, \
+                Recipient name: %s, Email address: %s",
+                parent_task_id,
+                task_id,
+                email_id,
+                recipient_num,
+                total_recipients,
+                current_recipient['profile__name'],
+                email
+            )
+            yield recipient_num, current_recipient, email_msg
+
+    def _send_message(connection, message_info):
+        """Sends a message from `_create_messages` over one of the connections."""
+        email_msg = message_info[2]
+        with dog_stats_api.timer('course_email.single_send.time.overall', tags=[_statsd_tag(course_title)]):
+            connection.send_messages([email_msg])
+
+    # Throttle if we have gotten the rate limiter.  This is not very high-tech,
+    # but if a task has been retried for rate-limiting reasons, then we only
+    # send one email per BULK_EMAIL_RETRY_DELAY_BETWEEN_SENDS within this task.
+    # Choice of the value depends on the number of workers that might be
+    # sending email in parallel, and what the SES throttle rate is.
+    max_rate = settings.BULK_EMAIL_MAX_SENDS_PER_SECOND
+    rate_limiter = None
+    if subtask_status.retried_nomax > 0 and settings.BULK_EMAIL_RETRY_DELAY_BETWEEN_SENDS > 0:
+        throttled_rate = 1.0 / settings.BULK_EMAIL_RETRY_DELAY_BETWEEN_SENDS
+        rate_limiter = TokenBucket(min(max_rate or throttled_rate, throttled_rate), capacity=1)
+    elif max_rate:
+        rate_limiter = TokenBucket(max_rate)
+
+    connections = []
+    try:
+        # Define context values to use in all course emails, and format the templates with them once:
+        email_context = {'course_id': course_email.course_id}
+        email_context.update(global_email_context)
+        renderer = CourseEmailRenderer(
+            course_email_template, course_email.text_message, course_email.html_message, email_context
+        )
 
-            except SMTPDataError as exc:
+        # Users and course are only needed to substitute keywords, so only load them then.
+        users = {}
+        course = None
+        if renderer.has_keywords:
+            users = User.objects.in_bulk([recipient['pk'] for recipient in to_list])
+            course = modulestore().get_course(course_email.course_id, depth=0)
+
+        # Each connection is kept open, and reused, for all the emails it sends in this task.
+        num_connections = max(1, min(settings.BULK_EMAIL_CONNECTIONS_PER_TASK, len(to_list)))
+        for __ in range(num_connections):
+            connection = get_connection()
+            connections.append(connection)
+            connection.open()
+
+        # The first error that stops the sending, once the emails being sent are accounted for.
+        stopping_exception = None
+        sent_messages = send_concurrently(
+            connections, _send_message, _create_messages(), rate_limiter, _is_stopping_send_error
+        )
+        for (recipient_num, current_recipient, __), exc in sent_messages:
+            email = current_recipient['email']
+            if isinstance(exc, SMTPDataError):
                 # According to SMTP spec, we'll retry error codes in the 4xx range.  5xx range indicates hard failure.
                 total_recipients_failed += 1
                 log.error(
@@ -542,9 +571,10 @@ def _send_course_email(entry_id, email_id, to_list, global_email_context, subtas
                     total_recipients,
                     email
                 )
-                if exc.smtp_code >= 400 and exc.smtp_code < 500:
+                if _is_stopping_send_error(exc):
                     # This will cause the outer handler to catch the exception and retry the entire task.
-                    raise exc
+                    stopping_exception = stopping_exception or exc
+                    continue
                 else:
                     # This will fall through and not retry the message.
                     log.warning(
@@ -561,7 +591,7 @@ def _send_course_email(entry_id, email_id, to_list, global_email_context, subtas
                     dog_stats_api.increment('course_email.error', tags=[_statsd_tag(course_title)])
                     subtask_status.increment(failed=1)
 
-            except SINGLE_EMAIL_FAILURE_ERRORS as exc:
+            elif isinstance(exc, SINGLE_EMAIL_FAILURE_ERRORS):
                 # This will fall through and not retry the message.
                 total_recipients_failed += 1
                 log.error(
@@ -578,6 +608,11 @@ def _send_course_email(entry_id, email_id, to_list, global_email_context, subtas
                 dog_stats_api.increment('course_email.error', tags=[_statsd_tag(course_title)])
                 subtask_status.increment(failed=1)
 
+            elif exc is not None:
+                # Handled by the outer handlers, once the emails being sent are accounted for.
+                stopping_exception = stopping_exception or exc
+                continue
+
             else:
                 total_recipients_successful += 1
                 log.info(
@@ -597,11 +632,16 @@ def _send_course_email(entry_id, email_id, to_list, global_email_context, subtas
                     log.debug('Email with id %s sent to %s', email_id, email)
                 subtask_status.increment(succeeded=1)
 
-            # Pop the user that was emailed off the end of the list only once they have
+            # Remove the user that was emailed from the list only once they have
             # successfully been processed.  (That way, if there were a failure that
-            # needed to be retried, the user is still on the list.)
+            # needed to be retried, the user is still on the list.)  The to_list
+            # will always contain the recipients remaining to be emailed, which
+            # is convenient for retries.
             recipients_info[email] += 1
-            to_list.pop()
+            to_list.remove(current_recipient)
+
+        if stopping_exception is not None:
+            raise stopping_exception  # pylint: disable=raising-bad-type
 
         log.info(
             "BulkEmail ==> Task: %s, SubTask: %s, EmailId: %s, Total Successful Recipients: %s/%s, \
@@ -680,7 +720,22 @@ def _send_course_email(entry_id, email_id, to_list, global_email_context, subtas
         return subtask_status, None
     finally:
         # Clean up at the end.
-        connection.close()
+        for connection in connections:
+            connection.close()
+
+
+def _is_stopping_send_error(exc):
+    """
+    Returns whether the error `exc`, raised sending one email, stops sending
+    the task's other emails.
+
+    Only permanent SMTPDataErrors and SINGLE_EMAIL_FAILURE_ERRORS are
+    specific to the recipient; other errors cause the task to be retried or
+    to fail.
+    """
+    if isinstance(exc, SMTPDataError):
+        return exc.smtp_code >= 400 and exc.smtp_code < 500
+    return not isinstance(exc, SINGLE_EMAIL_FAILURE_ERRORS)
 
 
 def _get_current_task():
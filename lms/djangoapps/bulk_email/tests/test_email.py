@@ -2,9 +2,12 @@
 """
 Unit tests for sending course email
 """
+import asyncore
 import json
 from mock import patch, Mock
 import os
+import smtpd
+import threading
 from unittest import skipIf
 
 from django.conf import settings
@@ -44,6 +47,33 @@ class MockCourseEmailResult(object):
         return mock_update_subtask_status
 
 
+class SMTPSink(smtpd.SMTPServer):
+    """
+    An SMTP server on a free local port, keeping the recipients of the
+    messages it receives instead of delivering them.
+    """
+    def __init__(self):
+        smtpd.SMTPServer.__init__(self, ('127.0.0.1', 0), None)
+        self.port = self.socket.getsockname()[1]
+        self.recipients = []
+        self.num_connections = 0
+        self.thread = threading.Thread(target=asyncore.loop, kwargs={'timeout': 0.05})
+        self.thread.daemon = True
+        self.thread.start()
+
+    def handle_accept(self):
+        self.num_connections += 1
+        smtpd.SMTPServer.handle_accept(self)
+
+    def process_message(self, peer, mailfrom, rcpttos, data):
+        self.recipients.extend(rcpttos)
+
+    def shutdown(self):
+        """Stops accepting connections."""
+        self.close()
+        self.thread.join(1)
+
+
 class EmailSendFromDashboardTestCase(ModuleStoreTestCase):
     """
     Test that emails send correctly.
@@ -186,6 +216,35 @@ class TestEmailSendFromDashboardMockedHtmlToText(EmailSendFromDashboardTestCase)
             [self.instructor.email] + [s.email for s in self.staff] + [s.email for s in self.students]
         )
 
+    def test_send_to_all_over_smtp(self):
+        """
+        Make sure email send to all goes there when sent to an SMTP server
+        over several connections.
+        """
+        sink = SMTPSink()
+        self.addCleanup(sink.shutdown)
+        test_email = {
+            'action': 'Send email',
+            'send_to': 'all',
+            'subject': 'test subject for all',
+            'message': 'test message for all'
+        }
+        with override_settings(
+            EMAIL_BACKEND='django.core.mail.backends.smtp.EmailBackend',
+            EMAIL_HOST='127.0.0.1',
+            EMAIL_PORT=sink.port,
+            BULK_EMAIL_CONNECTIONS_PER_TASK=3,
+            BULK_EMAIL_MAX_SENDS_PER_SECOND=100,
+        ):
+            response = self.client.post(self.send_mail_url, test_email)
+        self.assertEquals(json.loads(response.content), self.success_content)
+
+        self.assertItemsEqual(
+            sink.recipients,
+            [self.instructor.email] + [s.email for s in self.staff] + [s.email for s in self.students]
+        )
+        self.assertEquals(sink.num_connections, 3)
+
     def test_no_duplicate_emails_staff_instructor(self):
         """
         Test that no duplicate emails are sent to a course instructor that is
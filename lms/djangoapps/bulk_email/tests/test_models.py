@@ -9,7 +9,9 @@ from student.tests.factories import UserFactory
 
 from mock import patch, Mock
 
-from bulk_email.models import CourseEmail, SEND_TO_STAFF, CourseEmailTemplate, CourseAuthorization
+from bulk_email.models import (
+    CourseEmail, SEND_TO_STAFF, CourseEmailTemplate, CourseEmailRenderer, CourseAuthorization
+)
 from opaque_keys.edx.locations import SlashSeparatedCourseKey
 
 
@@ -133,6 +135,21 @@ class CourseEmailTemplateTest(TestCase):
         context = self._get_sample_plain_context()
         template.render_plaintext("My new plain text.", context)
 
+    def test_renderer(self):
+        template = CourseEmailTemplate.get_template()
+        shared_context = self._get_sample_html_context()
+        del shared_context['email']
+        renderer = CourseEmailRenderer(template, u"My new plain text.", u"My new {html} text.", shared_context)
+        for email, name in [('first@test.com', u'First'), ('second@test.com', u'Second {name}')]:
+            context = dict(shared_context, email=email, name=name, user_id=1)
+            self.assertEqual(
+                renderer.render({'email': email, 'name': name, 'user_id': 1}),
+                (
+                    template.render_plaintext(u"My new plain text.", context),
+                    template.render_htmltext(u"My new {html} text.", context),
+                )
+            )
+
 
 class CourseAuthorizationTest(TestCase):
     """Test the CourseAuthorization model."""
@@ -175,3 +192,18 @@ class CourseAuthorizationTest(TestCase):
 
         # Now, course should STILL be authorized!
         self.assertTrue(CourseAuthorization.instructor_email_enabled(course_id))
+
+    @patch.dict(settings.FEATURES, {'REQUIRE_COURSE_EMAIL_AUTH': True})
+    def test_enabled_for_courses_auth_on(self):
+        course_ids = [SlashSeparatedCourseKey('abc', '123', 'doremi'), SlashSeparatedCourseKey('abc', '456', 'doremi')]
+        CourseAuthorization(course_id=course_ids[0], email_enabled=True).save()
+        CourseAuthorization(course_id=course_ids[1], email_enabled=False).save()
+        with self.assertNumQueries(1):
+            self.assertEqual(CourseAuthorization.instructor_email_enabled_for_courses(course_ids), set(course_ids[:1]))
+
+    @patch.dict(settings.FEATURES, {'REQUIRE_COURSE_EMAIL_AUTH': False})
+    def test_enabled_for_courses_auth_off(self):
+        course_ids = [SlashSeparatedCourseKey('abc', '123', 'doremi'), SlashSeparatedCourseKey('abc', '456', 'doremi')]
+        CourseAuthorization(course_id=course_ids[1], email_enabled=False).save()
+        with self.assertNumQueries(0):
+            self.assertEqual(CourseAuthorization.instructor_email_enabled_for_courses(course_ids), set(course_ids))
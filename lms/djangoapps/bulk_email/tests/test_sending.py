@@ -0,0 +1,79 @@
+"""
+Unit tests for sending bulk email messages over several connections.
+"""
+import threading
+import time
+from unittest import TestCase
+
+from bulk_email.sending import TokenBucket, send_concurrently
+
+
+class TokenBucketTest(TestCase):
+    """Test the TokenBucket rate limiter."""
+
+    def test_burst(self):
+        bucket = TokenBucket(1000, capacity=10)
+        start = time.time()
+        for __ in range(10):
+            bucket.acquire()
+        self.assertLess(time.time() - start, 0.05)
+
+    def test_rate(self):
+        bucket = TokenBucket(100, capacity=1)
+        start = time.time()
+        for __ in range(11):
+            bucket.acquire()
+        self.assertGreaterEqual(time.time() - start, 0.09)
+
+
+class SendConcurrentlyTest(TestCase):
+    """Test sending items with send_concurrently."""
+
+    def setUp(self):
+        super(SendConcurrentlyTest, self).setUp()
+        self.sent = []
+        self.threads = set()
+
+    def _send(self, connection, item):
+        """Records the sent item and the sending thread, failing for negative items."""
+        self.threads.add(threading.current_thread())
+        if item < 0:
+            raise ValueError(item)
+        self.sent.append((connection, item))
+
+    def test_one_connection(self):
+        results = list(send_concurrently(['connection'], self._send, range(5)))
+        self.assertEqual(results, [(item, None) for item in range(5)])
+        self.assertEqual(self.sent, [('connection', item) for item in range(5)])
+        self.assertEqual(self.threads, set([threading.current_thread()]))
+
+    def test_several_connections(self):
+        results = list(send_concurrently(['first', 'second', 'third'], self._send, range(30)))
+        self.assertItemsEqual(results, [(item, None) for item in range(30)])
+        self.assertItemsEqual([item for __, item in self.sent], range(30))
+        self.assertNotIn(threading.current_thread(), self.threads)
+
+    def test_stopping_error(self):
+        results = list(send_concurrently(['connection'], self._send, [0, -1, 2]))
+        self.assertEqual([item for item, __ in results], [0, -1])
+        self.assertIsInstance(results[1][1], ValueError)
+        self.assertEqual(self.sent, [('connection', 0)])
+
+    def test_stopping_error_several_connections(self):
+        results = list(send_concurrently(['first', 'second'], self._send, [-1] + range(1, 10)))
+        # The items already being sent when the error is yielded are still sent.
+        self.assertLess(len(results), 10)
+        self.assertIn(-1, [item for item, __ in results])
+        self.assertItemsEqual([item for item, exc in results if exc is None], [item for __, item in self.sent])
+
+    def test_other_errors(self):
+        results = list(send_concurrently(
+            ['first', 'second'], self._send, [-1, 1, -2, 3], is_stopping_error=lambda exc: False
+        ))
+        self.assertItemsEqual([item for item, __ in results], [-1, 1, -2, 3])
+        self.assertItemsEqual([item for __, item in self.sent], [1, 3])
+
+    def test_rate_limiter(self):
+        start = time.time()
+        list(send_concurrently(['first', 'second'], self._send, range(6), TokenBucket(100, capacity=1)))
+        self.assertGreaterEqual(time.time() - start, 0.04)
@@ -174,17 +174,40 @@ def certificate_status_for_student(student, course_id):
     try:
         generated_certificate = GeneratedCertificate.objects.get(
             user=student, course_id=course_id)
-        d = {'status': generated_certificate.status,
-             'mode': generated_certificate.mode}
-        if generated_certificate.grade:
-            d['grade'] = generated_certificate.grade
-        if generated_certificate.status == CertificateStatuses.downloadable:
-            d['download_url'] = generated_certificate.download_url
-
-        return d
     except GeneratedCertificate.DoesNotExist:
-        pass
-    return {'status': CertificateStatuses.unavailable, 'mode': GeneratedCertificate.MODES.honor}
+        generated_certificate = None
+    return certificate_status(generated_certificate)
+
+
+def certificates_for_student(student, course_ids):
+    '''
+    Returns a dict mapping the ids of the courses in `course_ids` for which
+    the student has a certificate to their GeneratedCertificate, loaded in
+    a single query.
+    '''
+    return {
+        generated_certificate.course_id: generated_certificate
+        for generated_certificate in GeneratedCertificate.objects.filter(user=student, course_id__in=course_ids)
+    }
+
+
+def certificate_status(generated_certificate):
+    '''
+    Returns the dictionary described by `certificate_status_for_student`
+    for `generated_certificate`, which is None if the student has no
+    certificate.
+    '''
+    if generated_certificate is None:
+        return {'status': CertificateStatuses.unavailable, 'mode': GeneratedCertificate.MODES.honor}
+
+    d = {'status': generated_certificate.status,
+         'mode': generated_certificate.mode}
+    if generated_certificate.grade:
+        d['grade'] = generated_certificate.grade
+    if generated_certificate.status == CertificateStatuses.downloadable:
+        d['download_url'] = generated_certificate.download_url
+
+    return d
 
 
 class ExampleCertificateSet(TimeStampedModel):
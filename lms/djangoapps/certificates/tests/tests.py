@@ -10,7 +10,9 @@ from xmodule.modulestore.tests.factories import CourseFactory
 from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
 
 from student.tests.factories import UserFactory
-from certificates.models import CertificateStatuses, GeneratedCertificate, certificate_status_for_student
+from certificates.models import (
+    CertificateStatuses, GeneratedCertificate, certificate_status_for_student, certificates_for_student
+)
 from certificates.tests.factories import GeneratedCertificateFactory
 
 from util.milestones_helpers import (
@@ -33,6 +35,22 @@ class CertificatesModelTest(ModuleStoreTestCase):
         self.assertEqual(certificate_status['status'], CertificateStatuses.unavailable)
         self.assertEqual(certificate_status['mode'], GeneratedCertificate.MODES.honor)
 
+    def test_certificates_for_student(self):
+        student = UserFactory()
+        course = CourseFactory.create(org='edx', number='verified', display_name='Verified Course')
+        other_course = CourseFactory.create(org='edx', number='honor', display_name='Honor Course')
+        certificate = GeneratedCertificateFactory.create(
+            user=student,
+            course_id=course.id,
+            status=CertificateStatuses.downloadable,
+            mode='verified'
+        )
+        GeneratedCertificateFactory.create(user=UserFactory(), course_id=other_course.id)
+
+        with self.assertNumQueries(1):
+            certificates = certificates_for_student(student, [course.id, other_course.id])
+        self.assertEqual(certificates, {course.id: certificate})
+
     @patch.dict(settings.FEATURES, {'ENABLE_PREREQUISITE_COURSES': True, 'MILESTONES_APP': True})
     def test_course_milestone_collected(self):
         seed_milestone_relationship_types()
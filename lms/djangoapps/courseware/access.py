@@ -5,8 +5,11 @@ import logging
 from datetime import datetime, timedelta
 import pytz
 
+from crum import get_current_request
 from django.conf import settings
 from django.contrib.auth.models import AnonymousUser
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
 
 from xmodule.course_module import (
     CourseDescriptor, CATALOG_VISIBILITY_CATALOG_AND_ABOUT,
@@ -26,8 +29,9 @@ from student.roles import (
     GlobalStaff, CourseStaffRole, CourseInstructorRole,
     OrgStaffRole, OrgInstructorRole, CourseBetaTesterRole
 )
-from student.models import CourseEnrollment, CourseEnrollmentAllowed
+from student.models import CourseAccessRole, CourseEnrollment, CourseEnrollmentAllowed
 from opaque_keys.edx.keys import CourseKey, UsageKey
+from request_cache.middleware import RequestCache
 from util.milestones_helpers import get_pre_requisite_courses_not_completed
 DEBUG_ACCESS = False
 
@@ -69,11 +73,34 @@ def has_access(user, action, obj, course_key=None):
 
     Returns a bool.  It is up to the caller to actually deny access in a way
     that makes sense in context.
+
+    During a request, decisions are cached until the end of the request, or
+    until the roles or enrollments of a user change (see `clear_access_cache`).
     """
     # Just in case user is passed in as None, make them anonymous
     if not user:
         user = AnonymousUser()
 
+    access_cache = _access_request_cache()
+    if access_cache is None:
+        return _has_access(user, action, obj, course_key)
+
+    access_cache['checks'] += 1
+    cache_key = _access_cache_key(user, action, obj, course_key)
+    if cache_key in access_cache['decisions']:
+        return access_cache['decisions'][cache_key]
+
+    access_cache['evaluated'] += 1
+    decision = _has_access(user, action, obj, course_key)
+    if cache_key is not None:
+        access_cache['decisions'][cache_key] = decision
+    return decision
+
+
+def _has_access(user, action, obj, course_key):
+    """
+    Check whether a user has the access to do action on obj, without caching. See `has_access`.
+    """
     # delegate the work to type-specific functions.
     # (start with more specific types, then get more general)
     if isinstance(obj, CourseDescriptor):
@@ -104,6 +131,83 @@ def has_access(user, action, obj, course_key=None):
                     .format(type(obj)))
 
 
+def _access_request_cache():
+    """
+    Returns the dict of the access decisions made in the current request, and
+    of the number of access checks, or None outside of a request.
+    """
+    if get_current_request() is None:
+        return None
+    return RequestCache.get_request_cache().data.setdefault(
+        'access_decisions', {'decisions': {}, 'checks': 0, 'evaluated': 0}
+    )
+
+
+def _access_cache_key(user, action, obj, course_key):
+    """
+    Returns the key of the decision of `has_access(user, action, obj, course_key)`
+    in the request cache, or None if the decision can't be cached.
+
+    Modules and descriptors are identified by their usage id, and the key
+    includes the masquerade settings of the user.
+    """
+    if isinstance(obj, CourseDescriptor):
+        obj_key = ('course', obj.id)
+    elif isinstance(obj, ErrorDescriptor):
+        obj_key = ('error', obj.scope_ids.usage_id)
+    elif isinstance(obj, XModule):
+        obj_key = ('module', obj.scope_ids.usage_id)
+    elif isinstance(obj, XBlock):
+        obj_key = ('descriptor', obj.scope_ids.usage_id)
+    elif isinstance(obj, (CourseKey, UsageKey, basestring)):
+        obj_key = obj
+    else:
+        return None
+
+    masquerade = tuple(sorted(
+        (unicode(masquerade_key), course_masquerade.role, course_masquerade.user_partition_id, course_masquerade.group_id)
+        for masquerade_key, course_masquerade in getattr(user, 'masquerade_settings', {}).iteritems()
+    ))
+    return (user.id, user.is_staff, masquerade, action, obj_key, course_key)
+
+
+def clear_access_cache():
+    """
+    Forgets the access decisions made in the current request.
+
+    Called whenever roles or enrollments are saved, as they change the
+    decisions. Call it after any other write that changes access.
+    """
+    access_cache = _access_request_cache()
+    if access_cache is not None:
+        access_cache['decisions'].clear()
+
+
+@receiver(post_save, sender=CourseAccessRole)
+@receiver(post_delete, sender=CourseAccessRole)
+@receiver(post_save, sender=CourseEnrollment)
+@receiver(post_delete, sender=CourseEnrollment)
+@receiver(post_save, sender=CourseEnrollmentAllowed)
+@receiver(post_delete, sender=CourseEnrollmentAllowed)
+def _clear_access_cache_on_write(sender, **kwargs):  # pylint: disable=unused-argument
+    """
+    Forgets the access decisions made in the current request when roles or enrollments change.
+    """
+    clear_access_cache()
+
+
+def get_access_check_counts():
+    """
+    Returns the number of access checks in the current request, and the
+    number of them that were evaluated rather than cached, or None outside
+    of a request.
+    """
+    access_cache = _access_request_cache()
+    if access_cache is None:
+        return None
+    return access_cache['checks'], access_cache['evaluated']
+
+
 # ================ Implementation helpers ================================
 def _has_access_course_desc(user, action, course):
     """
@@ -393,48 +497,14 @@ def _has_access_descriptor(user, action, descriptor, course_key=None):
     (e.g. courses).  If you call this method directly instead of going through
     has_access(), it will not do the right thing.
     """
-    def can_load():
+    def has_staff_access():
         """
-        NOTE: This does not check that the student is enrolled in the course
-        that contains this module.  We may or may not want to allow non-enrolled
-        students to see modules.  If not, views should check the course, so we
-        don't have to hit the enrollments table on every module load.
+        Returns whether `user` has staff access to `descriptor`.
         """
-        if descriptor.visible_to_staff_only and not _has_staff_access_to_descriptor(user, descriptor, course_key):
-            return False
-
-        # enforce group access
-        if not _has_group_access(descriptor, user, course_key):
-            # if group_access check failed, deny access unless the requestor is staff,
-            # in which case immediately grant access.
-            return _has_staff_access_to_descriptor(user, descriptor, course_key)
-
-        # If start dates are off, can always load
-        if settings.FEATURES['DISABLE_START_DATES'] and not is_masquerading_as_student(user, course_key):
-            debug("Allow: DISABLE_START_DATES")
-            return True
-
-        # Check start date
-        if 'detached' not in descriptor._class_tags and descriptor.start is not None:
-            now = datetime.now(UTC())
-            effective_start = _adjust_start_date_for_beta_testers(
-                user,
-                descriptor,
-                course_key=course_key
-            )
-            if now > effective_start:
-                # after start date, everyone can see it
-                debug("Allow: now > effective start date")
-                return True
-            # otherwise, need staff access
-            return _has_staff_access_to_descriptor(user, descriptor, course_key)
-
-        # No start date, so can always load.
-        debug("Allow: no start date")
-        return True
+        return _has_staff_access_to_descriptor(user, descriptor, course_key)
 
     checkers = {
-        'load': can_load,
+        'load': lambda: can_load_descriptor(user, descriptor, course_key, has_staff_access),
         'staff': lambda: _has_staff_access_to_descriptor(user, descriptor, course_key),
         'instructor': lambda: _has_instructor_access_to_descriptor(user, descriptor, course_key)
     }
@@ -442,6 +512,57 @@ def _has_access_descriptor(user, action, descriptor, course_key=None):
     return _dispatch(checkers, action, user, descriptor)
 
 
+def can_load_descriptor(user, descriptor, course_key, has_staff_access):
+    """
+    Returns whether `user` can load `descriptor`, which is what
+    `has_access(user, 'load', descriptor)` checks for descriptors without
+    custom policy.
+
+    `descriptor` doesn't need to be a full descriptor: an object with the
+    attributes the checks look at (`visible_to_staff_only`, `user_partitions`,
+    `merged_group_access`, `_get_user_partition`, `start` and
+    `days_early_for_beta`) is enough. `has_staff_access` is called without
+    arguments, only when needed, to tell whether `user` has staff access to it.
+
+    NOTE: This does not check that the student is enrolled in the course
+    that contains this module.  We may or may not want to allow non-enrolled
+    students to see modules.  If not, views should check the course, so we
+    don't have to hit the enrollments table on every module load.
+    """
+    if descriptor.visible_to_staff_only and not has_staff_access():
+        return False
+
+    # enforce group access
+    if not _has_group_access(descriptor, user, course_key):
+        # if group_access check failed, deny access unless the requestor is staff,
+        # in which case immediately grant access.
+        return has_staff_access()
+
+    # If start dates are off, can always load
+    if settings.FEATURES['DISABLE_START_DATES'] and not is_masquerading_as_student(user, course_key):
+        debug("Allow: DISABLE_START_DATES")
+        return True
+
+    # Check start date
+    if 'detached' not in getattr(descriptor, '_class_tags', ()) and descriptor.start is not None:
+        now = datetime.now(UTC())
+        effective_start = _adjust_start_date_for_beta_testers(
+            user,
+            descriptor,
+            course_key=course_key
+        )
+        if now > effective_start:
+            # after start date, everyone can see it
+            debug("Allow: now > effective start date")
+            return True
+        # otherwise, need staff access
+        return has_staff_access()
+
+    # No start date, so can always load.
+    debug("Allow: no start date")
+    return True
+
+
 def _has_access_xmodule(user, action, xmodule, course_key):
     """
     Check if user has access to this xmodule.
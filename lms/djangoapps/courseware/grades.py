@@ -6,29 +6,39 @@ import random
 import logging
 
 from contextlib import contextmanager
+from datetime import timedelta
+from itertools import islice
+import multiprocessing
 from django.conf import settings
-from django.db import transaction
+from django.db import connections, transaction
+from django.utils import timezone
 from django.test.client import RequestFactory
 
 import dogstats_wrapper as dog_stats_api
 
 from courseware import courses
 from courseware.model_data import FieldDataCache
-from student.models import anonymous_id_for_user
+from student.models import ANONYMOUS_IDS_CHUNK_SIZE, anonymous_id_for_user, anonymous_ids_for_users
 from util.module_utils import yield_dynamic_descriptor_descendents
+from util.query import iterate_in_batches
 from xmodule import graders
 from xmodule.graders import Score
 from xmodule.modulestore.django import modulestore
 from xmodule.modulestore.exceptions import ItemNotFoundError
 from xmodule.util.duedate import get_extended_due_date
-from .models import StudentModule
+from .models import AnswerDistributionCheckpoint, ProblemAnswerDistribution, StudentModule
 from .module_render import get_module_for_descriptor
 from submissions import api as sub_api  # installed from the edx-submissions repository
 from opaque_keys import InvalidKeyError
+from opaque_keys.edx.keys import CourseKey, UsageKey
 
 
 log = logging.getLogger("edx.courseware")
 
+# How far back from the last update of the answer distributions of a course
+# update_answer_distributions looks for modified StudentModules.
+ANSWER_DISTRIBUTION_UPDATE_OVERLAP = timedelta(minutes=5)
+
 
 def answer_distributions(course_key):
     """
@@ -57,6 +67,10 @@ def answer_distributions(course_key):
     not be aware of problems that are not visible to the user being used to
     generate the report.
 
+    The answers are counted per problem and stored, so that each report only
+    recounts the problems submitted since the previous one (see
+    `update_answer_distributions`).
+
     This method will try to use a read-replica database if one is available.
     """
     # dict: { module.module_state_key : (url_name, display_name) }
@@ -80,10 +94,41 @@ def answer_distributions(course_key):
 
         return state_keys_to_problem_info[usage_key]
 
-    # Iterate through all problems submitted for this course in no particular
-    # order, and build up our answer_counts dict that we will eventually return
+    # Bring the stored per-problem counts up to date, then label them with
+    # the url and display name of their problem
+    update_answer_distributions(course_key)
+
+    answer_counts = defaultdict(lambda: defaultdict(int))
+    for distribution in ProblemAnswerDistribution.objects.filter(course_id=course_key):
+        try:
+            url, display_name = url_and_display_name(distribution.module_state_key.map_into_course(course_key))
+        except (ItemNotFoundError, InvalidKeyError):
+            msg = "Answer Distribution: Item {} referenced in StudentModules " + \
+                  "in course {} not found; " + \
+                  "This can happen if a student answered a question that " + \
+                  "was later deleted from the course. These answers will be " + \
+                  "omitted from the answer distribution CSV."
+            log.warning(msg.format(distribution.module_state_key, course_key))
+            continue
+
+        for problem_part_id, part_counts in json.loads(distribution.answer_counts).items():
+            for answer, count in part_counts.items():
+                answer_counts[(url, display_name, problem_part_id)][answer] += count
+
+    return answer_counts
+
+
+def _problem_answer_counts(course_key, usage_key):
+    """
+    Return the answer counts of the problem `usage_key` in the course
+    `course_key`, as a dict of {problem part id: {answer: count}}, by parsing
+    the state of its submitted StudentModule entries.
+    """
     answer_counts = defaultdict(lambda: defaultdict(int))
-    for module in StudentModule.all_submitted_problems_read_only(course_key):
+    submitted_problems = StudentModule.all_submitted_problems_read_only(course_key).filter(
+        module_state_key=usage_key
+    ).only('id', 'state')
+    for module in iterate_in_batches(submitted_problems):
         try:
             state_dict = json.loads(module.state) if module.state else {}
             raw_answers = state_dict.get("student_answers", {})
@@ -95,30 +140,130 @@ def answer_distributions(course_key):
             )
             continue
 
+        # Each problem part has an ID that is derived from the
+        # module.module_state_key (with some suffix appended)
+        for problem_part_id, raw_answer in raw_answers.items():
+            # Convert whatever raw answers we have (numbers, unicode, None, etc.)
+            # to be unicode values. Note that if we get a string, it's always
+            # unicode and not str -- state comes from the json decoder, and that
+            # always returns unicode for strings.
+            answer = unicode(raw_answer)
+            answer_counts[problem_part_id][answer] += 1
+
+    return answer_counts
+
+
+def _problem_answer_counts_worker(args):
+    """
+    Process pool entry point for `_problem_answer_counts`. Keys are passed as
+    strings, and the counts are returned as `(usage key string, counts)`.
+    """
+    course_key_string, usage_key_string = args
+    course_key = CourseKey.from_string(course_key_string)
+    usage_key = UsageKey.from_string(usage_key_string)
+    answer_counts = _problem_answer_counts(course_key, usage_key)
+    return usage_key_string, {part_id: dict(counts) for part_id, counts in answer_counts.items()}
+
+
+def _save_problem_answer_counts(course_key, usage_key, answer_counts):
+    """
+    Store the `answer_counts` of the problem `usage_key`, removing its row if
+    there are none.
+    """
+    if not answer_counts:
+        ProblemAnswerDistribution.objects.filter(course_id=course_key, module_state_key=usage_key).delete()
+        return
+
+    distribution, _ = ProblemAnswerDistribution.objects.get_or_create(
+        course_id=course_key,
+        module_state_key=usage_key,
+        defaults={'answer_counts': '{}'},
+    )
+    distribution.answer_counts = json.dumps(answer_counts)
+    distribution.needs_update = False
+    distribution.save()
+
+
+def _distinct_problem_keys(queryset):
+    """
+    Return the set of distinct problem usage keys in `queryset`, a queryset
+    of StudentModules or ProblemAnswerDistributions.
+    """
+    return set(
+        UsageKey.from_string(usage_key_string)
+        for usage_key_string in queryset.values_list('module_state_key', flat=True).distinct()
+    )
+
+
+def update_answer_distributions(course_key):
+    """
+    Bring the stored answer counts of the problems of `course_key` up to
+    date, recounting only the problems which have StudentModule entries
+    modified since the last update (or entries deleted, see
+    `ProblemAnswerDistribution.needs_update`). The first update of a course
+    counts all of its problems.
+
+    StudentModules are read from the read replica if there is one, so entries
+    modified up to `ANSWER_DISTRIBUTION_UPDATE_OVERLAP` before the last update
+    are looked at again, to allow for replication lag.
+    """
+    checkpoint, _ = AnswerDistributionCheckpoint.objects.get_or_create(course_id=course_key)
+    started = timezone.now()
+
+    submitted_problems = StudentModule.all_submitted_problems_read_only(course_key)
+    if checkpoint.updated_through is not None:
+        submitted_problems = submitted_problems.filter(
+            modified__gte=checkpoint.updated_through - ANSWER_DISTRIBUTION_UPDATE_OVERLAP
+        )
+    usage_keys = _distinct_problem_keys(submitted_problems)
+    usage_keys.update(_distinct_problem_keys(
+        ProblemAnswerDistribution.objects.filter(course_id=course_key, needs_update=True)
+    ))
+
+    for usage_key in usage_keys:
+        _save_problem_answer_counts(course_key, usage_key, _problem_answer_counts(course_key, usage_key))
+
+    checkpoint.updated_through = started
+    checkpoint.save()
+    return len(usage_keys)
+
+
+def rebuild_answer_distributions(course_key, processes=1):
+    """
+    Recount the answers to all the problems of `course_key` from scratch.
+
+    With `processes` > 1, problems are counted in parallel by a pool of that
+    many processes; the results are stored by the calling process.
+    """
+    started = timezone.now()
+    usage_keys = _distinct_problem_keys(StudentModule.all_submitted_problems_read_only(course_key))
+    work = [(unicode(course_key), unicode(usage_key)) for usage_key in usage_keys]
+
+    if processes > 1 and len(work) > 1:
+        # Forked processes must not share the parent's database connections.
+        for conn in connections.all():
+            conn.close()
+        pool = multiprocessing.Pool(processes)
         try:
-            url, display_name = url_and_display_name(module.module_state_key.map_into_course(course_key))
-            # Each problem part has an ID that is derived from the
-            # module.module_state_key (with some suffix appended)
-            for problem_part_id, raw_answer in raw_answers.items():
-                # Convert whatever raw answers we have (numbers, unicode, None, etc.)
-                # to be unicode values. Note that if we get a string, it's always
-                # unicode and not str -- state comes from the json decoder, and that
-                # always returns unicode for strings.
-                answer = unicode(raw_answer)
-                answer_counts[(url, display_name, problem_part_id)][answer] += 1
+            results = pool.imap_unordered(_problem_answer_counts_worker, work)
+            for usage_key_string, answer_counts in results:
+                _save_problem_answer_counts(course_key, UsageKey.from_string(usage_key_string), answer_counts)
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        for usage_key in usage_keys:
+            _save_problem_answer_counts(course_key, usage_key, _problem_answer_counts(course_key, usage_key))
 
-        except (ItemNotFoundError, InvalidKeyError):
-            msg = "Answer Distribution: Item {} referenced in StudentModule {} " + \
-                  "for user {} in course {} not found; " + \
-                  "This can happen if a student answered a question that " + \
-                  "was later deleted from the course. This answer will be " + \
-                  "omitted from the answer distribution CSV."
-            log.warning(
-                msg.format(module.module_state_key, module.id, module.student_id, course_key)
-            )
-            continue
+    # Problems that no longer have any submissions
+    for distribution in ProblemAnswerDistribution.objects.filter(course_id=course_key):
+        if distribution.module_state_key not in usage_keys:
+            distribution.delete()
 
-    return answer_counts
+    checkpoint, _ = AnswerDistributionCheckpoint.objects.get_or_create(course_id=course_key)
+    checkpoint.updated_through = started
+    checkpoint.save()
+    return len(usage_keys)
 
 
 @transaction.commit_manually
@@ -505,7 +650,7 @@ def iterate_grades_for(course_id, students):
     # grading that student.
     request = RequestFactory().get('/')
 
-    for student in students:
+    for student in _students_with_anonymous_ids(course.id, students):
         with dog_stats_api.timer('lms.grades.iterate_grades_for', tags=[u'action:{}'.format(course_id)]):
             try:
                 request.user = student
@@ -527,3 +672,19 @@ def iterate_grades_for(course_id, students):
                     exc.message
                 )
                 yield student, {}, exc.message
+
+
+def _students_with_anonymous_ids(course_id, students):
+    """
+    Yields `students`, having saved the anonymous ids grading looks up for
+    the submissions API a chunk of students at a time, rather than one
+    student at a time.
+    """
+    students = iter(students)
+    while True:
+        chunk = list(islice(students, ANONYMOUS_IDS_CHUNK_SIZE))
+        if not chunk:
+            return
+        anonymous_ids_for_users(chunk, course_id)
+        for student in chunk:
+            yield student
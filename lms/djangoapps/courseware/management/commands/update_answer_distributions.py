@@ -0,0 +1,52 @@
+# pylint: disable=missing-docstring
+
+from optparse import make_option
+from textwrap import dedent
+
+from django.core.management.base import BaseCommand, CommandError
+
+from courseware.grades import rebuild_answer_distributions, update_answer_distributions
+from opaque_keys import InvalidKeyError
+from opaque_keys.edx.keys import CourseKey
+from xmodule.modulestore.django import modulestore
+
+
+class Command(BaseCommand):
+    """
+    Update the stored answer counts used for answer distribution reports.
+
+    Only the problems with submissions since the last update are recounted,
+    unless --rebuild is given. Courses are given as course ids; if none are
+    given, all courses are updated. Meant to be run periodically, so that
+    reports only have a few problems left to recount.
+
+    """
+    args = "[<course_id> ...]"
+    help = dedent(__doc__).strip()
+    option_list = BaseCommand.option_list + (
+        make_option('--rebuild',
+                    action='store_true',
+                    default=False,
+                    help='Recount the answers to all problems from scratch'),
+        make_option('--processes',
+                    action='store',
+                    type='int',
+                    default=1,
+                    help='Number of processes counting problems in parallel when rebuilding'),
+    )
+
+    def handle(self, *args, **options):
+        if args:
+            try:
+                course_keys = [CourseKey.from_string(arg) for arg in args]
+            except InvalidKeyError as error:
+                raise CommandError("Invalid course id: {}".format(error))
+        else:
+            course_keys = [course.id for course in modulestore().get_courses()]
+
+        for course_key in course_keys:
+            if options['rebuild']:
+                num_problems = rebuild_answer_distributions(course_key, processes=options['processes'])
+            else:
+                num_problems = update_answer_distributions(course_key)
+            self.stdout.write(u"{}: counted answers to {} problems\n".format(course_key, num_problems))
@@ -1,12 +1,18 @@
 """
 Middleware for the courseware app
 """
+import logging
 
+import dogstats_wrapper as dog_stats_api
+from django.conf import settings
 from django.shortcuts import redirect
 from django.core.urlresolvers import reverse
 
+from courseware.access import get_access_check_counts
 from courseware.courses import UserNotEnrolled
 
+log = logging.getLogger(__name__)
+
 
 class RedirectUnenrolledMiddleware(object):
     """
@@ -22,3 +28,24 @@ class RedirectUnenrolledMiddleware(object):
                     args=[course_key.to_deprecated_string()]
                 )
             )
+
+
+class AccessCheckCountMiddleware(object):
+    """
+    Reports the number of access checks made by each request, and how many of
+    them weren't answered by the request's cache of access decisions.
+    """
+    def process_response(self, request, response):
+        """
+        Records the access checks of the request.
+        """
+        counts = get_access_check_counts()
+        if counts and counts[0]:
+            checks, evaluated = counts
+            dog_stats_api.histogram('lms.courseware.access_checks', checks)
+            dog_stats_api.histogram('lms.courseware.access_checks.evaluated', evaluated)
+            if checks > settings.ACCESS_CHECKS_WARNING_THRESHOLD:
+                log.warning(
+                    u"Request for %s made %d access checks (%d evaluated)", request.path, checks, evaluated
+                )
+        return response
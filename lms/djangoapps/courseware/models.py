@@ -13,12 +13,12 @@ ASSUMPTIONS: modules have unique IDs, even across different module_types
 
 """
 from django.contrib.auth.models import User
-from django.conf import settings
 from django.db import models
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
-from xmodule_django.models import CourseKeyField, LocationKeyField, BlockTypeKeyField
+from util.query import use_read_replica_if_available
+from xmodule_django.models import CourseKeyField, LocationKeyField, BlockTypeKeyField, UsageKeyField
 
 
 class StudentModule(models.Model):
@@ -77,10 +77,7 @@ class StudentModule(models.Model):
             module_type='problem',
             grade__isnull=False
         )
-        if "read_replica" in settings.DATABASES:
-            return queryset.using("read_replica")
-        else:
-            return queryset
+        return use_read_replica_if_available(queryset)
 
     def __repr__(self):
         return 'StudentModule<%r>' % ({
@@ -230,3 +227,51 @@ class OfflineComputedGradeLog(models.Model):
 
     def __unicode__(self):
         return "[OCGLog] %s: %s" % (self.course_id.to_deprecated_string(), self.created)  # pylint: disable=no-member
+
+
+class ProblemAnswerDistribution(models.Model):
+    """
+    Counts of the answers submitted to the parts of a problem, from which
+    answer distribution reports are built. Kept up to date by
+    `courseware.grades.update_answer_distributions`.
+    """
+    class Meta(object):  # pylint: disable=missing-docstring
+        unique_together = (('course_id', 'module_state_key'),)
+
+    course_id = CourseKeyField(max_length=255, db_index=True)
+    module_state_key = UsageKeyField(max_length=255, db_column='module_id')
+
+    # {problem part id: {answer: count}}, stored as JSON
+    answer_counts = models.TextField()
+
+    # Set when the counts may be out of date in a way the `modified` dates of
+    # the problem's StudentModules can't show, i.e. when one is deleted.
+    needs_update = models.BooleanField(default=False)
+    updated = models.DateTimeField(auto_now=True)
+
+    @receiver(post_delete, sender=StudentModule)
+    def flag_deleted_state(sender, instance, **kwargs):  # pylint: disable=no-self-argument, unused-argument
+        """
+        Flags the answer counts of a problem for recomputation when one of its
+        StudentModule entries is deleted.
+        """
+        if instance.module_type == 'problem':
+            ProblemAnswerDistribution.objects.filter(
+                course_id=instance.course_id,
+                module_state_key=instance.module_state_key,
+            ).update(needs_update=True)
+
+    def __unicode__(self):
+        return "[ProblemAnswerDistribution] %s: %s" % (self.course_id, self.module_state_key)
+
+
+class AnswerDistributionCheckpoint(models.Model):
+    """
+    Records, for a course, up to when the changes to StudentModule entries
+    are reflected in its `ProblemAnswerDistribution` rows.
+    """
+    course_id = CourseKeyField(max_length=255, unique=True)
+    updated_through = models.DateTimeField(null=True)
+
+    def __unicode__(self):
+        return "[AnswerDistributionCheckpoint] %s: %s" % (self.course_id, self.updated_through)
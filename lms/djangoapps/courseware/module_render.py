@@ -11,10 +11,12 @@ import static_replace
 import xblock.reference.plugins
 
 from collections import OrderedDict
+from datetime import datetime, timedelta
 from functools import partial
 from requests.auth import HTTPBasicAuth
 import dogstats_wrapper as dog_stats_api
 from opaque_keys import InvalidKeyError
+from pytz import UTC
 
 from django.conf import settings
 from django.contrib.auth.models import User
@@ -27,7 +29,7 @@ from django.views.decorators.csrf import csrf_exempt
 
 from capa.xqueue_interface import XQueueInterface
 from courseware.access import has_access, get_user_role
-from courseware.masquerade import setup_masquerade
+from courseware.masquerade import is_masquerading_as_student, setup_masquerade
 from courseware.model_data import FieldDataCache, DjangoKeyValueStore
 from courseware.models import StudentModule
 from lms.djangoapps.lms_xblock.field_data import LmsFieldData
@@ -37,6 +39,7 @@ from edxmako.shortcuts import render_to_string
 from eventtracking import tracker
 from psychometrics.psychoanalyze import make_psychometrics_data_update_handler
 from student.models import anonymous_id_for_user, user_by_anonymous_id
+from student.roles import CourseBetaTesterRole
 from xblock.core import XBlock
 from xblock.fields import Scope
 from xblock.runtime import KvsFieldData, KeyValueStore
@@ -44,6 +47,7 @@ from xblock.exceptions import NoSuchHandlerError, NoSuchViewError
 from xblock.django.request import django_to_webob_request, webob_to_django_response
 from xmodule.error_module import ErrorDescriptor, NonStaffErrorDescriptor
 from xmodule.exceptions import NotFoundError, ProcessingError
+from xmodule.fields import Date
 from opaque_keys.edx.keys import UsageKey
 from opaque_keys.edx.locations import SlashSeparatedCourseKey
 from xmodule.contentstore.django import contentstore
@@ -126,6 +130,10 @@ def toc_for_course(request, course, active_chapter, active_section, field_data_c
     None if this is not the case.
 
     field_data_cache must include data from the course module and 2 levels of its descendents
+
+    The chapters and sections the user can see are cached, see
+    `_get_cached_toc`; only the active flags and the due date extensions of
+    the user are applied to them here.
     '''
 
     with modulestore().bulk_operations(course.id):
@@ -136,38 +144,182 @@ def toc_for_course(request, course, active_chapter, active_section, field_data_c
         # Check to see if the course is gated on milestone-required content (such as an Entrance Exam)
         required_content = milestones_helpers.get_required_content(course, request.user)
 
-        chapters = list()
-        for chapter in course_module.get_display_items():
-            # Only show required content, if there is required content
-            # chapter.hide_from_toc is read-only (boo)
-            local_hide_from_toc = False
-            if required_content:
-                if unicode(chapter.location) not in required_content:
-                    local_hide_from_toc = True
-
-            # Skip the current chapter if a hide flag is tripped
-            if chapter.hide_from_toc or local_hide_from_toc:
-                continue
-
-            sections = list()
-            for section in chapter.get_display_items():
-
-                active = (chapter.url_name == active_chapter and
-                          section.url_name == active_section)
-
-                if not section.hide_from_toc:
-                    sections.append({'display_name': section.display_name_with_default,
-                                     'url_name': section.url_name,
-                                     'format': section.format if section.format is not None else '',
-                                     'due': get_extended_due_date(section),
-                                     'active': active,
-                                     'graded': section.graded,
-                                     })
-            chapters.append({'display_name': chapter.display_name_with_default,
-                             'url_name': chapter.url_name,
-                             'sections': sections,
-                             'active': chapter.url_name == active_chapter})
-        return chapters
+        cached_chapters = _get_cached_toc(request.user, course, course_module, required_content)
+
+    key_value_store = DjangoKeyValueStore(field_data_cache)
+    chapters = list()
+    for chapter in cached_chapters:
+        sections = list()
+        for section in chapter['sections']:
+            due = section['due']
+            if due:
+                due = get_extended_due_date({
+                    'due': due,
+                    'extended_due': _get_extended_due(key_value_store, field_data_cache.user, course, section),
+                })
+            sections.append({'display_name': section['display_name'],
+                             'url_name': section['url_name'],
+                             'format': section['format'],
+                             'due': due,
+                             'active': (chapter['url_name'] == active_chapter and
+                                        section['url_name'] == active_section),
+                             'graded': section['graded'],
+                             })
+        chapters.append({'display_name': chapter['display_name'],
+                         'url_name': chapter['url_name'],
+                         'sections': sections,
+                         'active': chapter['url_name'] == active_chapter})
+    return chapters
+
+
+def _get_extended_due(key_value_store, user, course, section):
+    '''
+    Returns the due date extension `user` was granted for `section`, a
+    section of the cached table of contents of `course`, or None.
+    '''
+    usage_key = UsageKey.from_string(section['location']).map_into_course(course.id)
+    try:
+        extended_due = key_value_store.get(KeyValueStore.Key(
+            scope=Scope.user_state,
+            user_id=user.id,
+            block_scope_id=usage_key,
+            field_name='extended_due',
+        ))
+    except KeyError:
+        return None
+    return Date().from_json(extended_due)
+
+
+def _get_cached_toc(user, course, course_module, required_content):
+    '''
+    Returns the chapters and sections of `course` that `user` can see, as
+    built by `_build_toc`, but without the active flags and with the due dates
+    of the course.
+
+    They are cached for COURSEWARE_TOC_CACHE_TIMEOUT seconds per version of
+    the course and per combination of the inputs their visibility depends on:
+    staff access, masquerading, beta testing, the user's groups in the
+    partitions the chapters and sections are restricted to and the content
+    required by milestones. They are rebuilt once a chapter or section is
+    released to the user after they were cached. Courses without a version,
+    such as XML courses, aren't cached.
+    '''
+    timeout = settings.COURSEWARE_TOC_CACHE_TIMEOUT
+    version = _get_course_version(course) if timeout else None
+    if version is None:
+        return _build_toc(course_module, required_content)
+
+    structure = _get_toc_structure(course, version, timeout)
+    is_beta_tester = CourseBetaTesterRole(course.id).has_user(user)
+    user_groups = []
+    for user_partition in course.user_partitions:
+        if user_partition.id in structure['partition_ids']:
+            group = user_partition.scheme.get_group_for_user(course.id, user, user_partition)
+            user_groups.append((user_partition.id, group.id if group is not None else None))
+    signature = (
+        structure['version'],
+        has_access(user, 'staff', course),
+        is_masquerading_as_student(user, course.id),
+        is_beta_tester,
+        tuple(user_groups),
+        tuple(sorted(required_content)),
+    )
+    cache_key = u"courseware.toc.{course_id}.{signature}".format(
+        course_id=course.id,
+        signature=hashlib.md5(repr(signature)).hexdigest(),
+    )
+
+    now = datetime.now(UTC)
+    cached = cache.get(cache_key)
+    if cached is not None:
+        released_since = False
+        for start, days_early_for_beta in structure['releases']:
+            if is_beta_tester and days_early_for_beta is not None:
+                start -= timedelta(days_early_for_beta)
+            if cached['built'] < start <= now:
+                released_since = True
+                break
+        if not released_since:
+            return cached['chapters']
+
+    chapters = _build_toc(course_module, required_content)
+    cache.set(cache_key, {'built': now, 'chapters': chapters}, timeout)
+    return chapters
+
+
+def _get_course_version(course):
+    '''
+    Returns a string changing whenever `course` or any of its blocks is
+    edited, or None if its modulestore doesn't keep track of edits.
+    '''
+    # The LMS doesn't mix EditInfoMixin into its blocks, so ask the runtime.
+    get_subtree_edited_on = getattr(course.runtime, 'get_subtree_edited_on', None)
+    edited_on = get_subtree_edited_on(course) if get_subtree_edited_on else None
+    return unicode(edited_on) if edited_on is not None else None
+
+
+def _get_toc_structure(course, version, timeout):
+    '''
+    Returns the version of `course`, the ids of the user partitions its
+    chapters and sections are restricted to, and their start dates along
+    with how many days early beta testers see them.
+
+    They are cached until the course is next edited, i.e. until `version`
+    changes.
+    '''
+    cache_key = u"courseware.toc_structure.{course_id}".format(course_id=course.id)
+    structure = cache.get(cache_key)
+    if structure is None or structure['version'] != version:
+        partition_ids = set(course.group_access)
+        releases = []
+        for chapter in course.get_children():
+            for block in [chapter] + chapter.get_children():
+                partition_ids.update(block.group_access)
+                if block.start is not None:
+                    releases.append((block.start, block.days_early_for_beta))
+        structure = {
+            'version': version,
+            'partition_ids': partition_ids,
+            'releases': releases,
+        }
+        cache.set(cache_key, structure, timeout)
+    return structure
+
+
+def _build_toc(course_module, required_content):
+    '''
+    Returns the chapters and sections of `course_module` that its user can
+    see, in the format returned by `toc_for_course`, except that they have no
+    active flags, and that sections have the due date set in the course and
+    the string of their location.
+    '''
+    chapters = list()
+    for chapter in course_module.get_display_items():
+        # Only show required content, if there is required content
+        # chapter.hide_from_toc is read-only (boo)
+        local_hide_from_toc = False
+        if required_content:
+            if unicode(chapter.location) not in required_content:
+                local_hide_from_toc = True
+
+        # Skip the current chapter if a hide flag is tripped
+        if chapter.hide_from_toc or local_hide_from_toc:
+            continue
+
+        sections = list()
+        for section in chapter.get_display_items():
+            if not section.hide_from_toc:
+                sections.append({'display_name': section.display_name_with_default,
+                                 'url_name': section.url_name,
+                                 'location': unicode(section.location),
+                                 'format': section.format if section.format is not None else '',
+                                 'due': section.due,
+                                 'graded': section.graded,
+                                 })
+        chapters.append({'display_name': chapter.display_name_with_default,
+                         'url_name': chapter.url_name,
+                         'sections': sections})
+    return chapters
 
 
 def get_module(user, request, usage_key, field_data_cache,
@@ -10,6 +10,8 @@ import courseware.access as access
 from courseware.masquerade import CourseMasquerade
 from courseware.tests.factories import UserFactory, StaffFactory, InstructorFactory
 from courseware.tests.helpers import LoginEnrollmentTestCase
+from request_cache.middleware import RequestCache
+from student.roles import CourseStaffRole
 from student.tests.factories import AnonymousUserFactory, CourseEnrollmentAllowedFactory, CourseEnrollmentFactory
 from xmodule.course_module import (
     CATALOG_VISIBILITY_CATALOG_AND_ABOUT, CATALOG_VISIBILITY_ABOUT,
@@ -168,6 +170,28 @@ class AccessTestCase(LoginEnrollmentTestCase, ModuleStoreTestCase):
         mock_unit.visible_to_staff_only = False
         verify_access(False)
 
+    @patch.dict('django.conf.settings.FEATURES', {'DISABLE_START_DATES': False})
+    def test_can_load_descriptor(self):
+        """
+        Tests that staff access is only looked up when the checks need it.
+        """
+        block = Mock(
+            spec=['visible_to_staff_only', 'user_partitions', 'start', 'days_early_for_beta'],
+            visible_to_staff_only=False,
+            user_partitions=[],
+            start=datetime.datetime.now(pytz.utc) - datetime.timedelta(days=1),
+            days_early_for_beta=None,
+        )
+        has_staff_access = Mock(return_value=False)
+        self.assertTrue(access.can_load_descriptor(self.student, block, self.course.course_key, has_staff_access))
+        self.assertFalse(has_staff_access.called)
+
+        block.start = datetime.datetime.now(pytz.utc) + datetime.timedelta(days=1)
+        self.assertFalse(access.can_load_descriptor(self.student, block, self.course.course_key, has_staff_access))
+        has_staff_access.return_value = True
+        self.assertTrue(access.can_load_descriptor(self.student, block, self.course.course_key, has_staff_access))
+        self.assertEqual(has_staff_access.call_count, 2)
+
     def test__has_access_course_desc_can_enroll(self):
         yesterday = datetime.datetime.now(pytz.utc) - datetime.timedelta(days=1)
         tomorrow = datetime.datetime.now(pytz.utc) + datetime.timedelta(days=1)
@@ -379,3 +403,46 @@ class UserRoleTestCase(TestCase):
             'student',
             access.get_user_role(self.anonymous_user, self.course_key)
         )
+
+
+class AccessCacheTestCase(TestCase):
+    """
+    Tests of the caching of access decisions during a request.
+    """
+    def setUp(self):
+        super(AccessCacheTestCase, self).setUp()
+        self.course_key = SlashSeparatedCourseKey('edX', 'toy', '2012_Fall')
+        self.staff = StaffFactory(course_key=self.course_key)
+        self.student = UserFactory()
+        RequestCache().clear_request_cache()
+        self.addCleanup(RequestCache().clear_request_cache)
+        patcher = patch('courseware.access.get_current_request', return_value=Mock())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = patch('courseware.access._has_access', wraps=access._has_access)
+        self.mock_has_access = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_decision_cached(self):
+        self.assertTrue(access.has_access(self.staff, 'staff', self.course_key))
+        self.assertTrue(access.has_access(self.staff, 'staff', self.course_key))
+        self.assertFalse(access.has_access(self.student, 'staff', self.course_key))
+        self.assertEqual(self.mock_has_access.call_count, 2)
+        self.assertEqual(access.get_access_check_counts(), (3, 2))
+
+    def test_masquerade_not_cached(self):
+        self.assertTrue(access.has_access(self.staff, 'staff', self.course_key))
+        self.staff.masquerade_settings = {self.course_key: CourseMasquerade(self.course_key, role='student')}
+        self.assertFalse(access.has_access(self.staff, 'staff', self.course_key))
+
+    def test_write_clears_cache(self):
+        self.assertFalse(access.has_access(self.student, 'staff', self.course_key))
+        CourseStaffRole(self.course_key).add_users(self.student)
+        self.assertTrue(access.has_access(self.student, 'staff', self.course_key))
+
+    def test_not_cached_outside_request(self):
+        with patch('courseware.access.get_current_request', return_value=None):
+            access.has_access(self.staff, 'staff', self.course_key)
+            access.has_access(self.staff, 'staff', self.course_key)
+            self.assertIsNone(access.get_access_check_counts())
+        self.assertEqual(self.mock_has_access.call_count, 2)
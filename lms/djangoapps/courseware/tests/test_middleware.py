@@ -6,10 +6,10 @@ from django.core.urlresolvers import reverse
 from django.test.utils import override_settings
 from django.test.client import RequestFactory
 from django.http import Http404
-from mock import patch
+from mock import Mock, patch
 
 import courseware.courses as courses
-from courseware.middleware import RedirectUnenrolledMiddleware
+from courseware.middleware import AccessCheckCountMiddleware, RedirectUnenrolledMiddleware
 from xmodule.modulestore.tests.django_utils import TEST_DATA_MOCK_MODULESTORE
 from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
 from xmodule.modulestore.tests.factories import CourseFactory
@@ -52,3 +52,26 @@ class CoursewareMiddlewareTestCase(ModuleStoreTestCase):
             request, Http404()
         )
         self.assertIsNone(response)
+
+
+class AccessCheckCountMiddlewareTestCase(ModuleStoreTestCase):
+    """Tests of the reporting of the number of access checks per request"""
+
+    @override_settings(ACCESS_CHECKS_WARNING_THRESHOLD=100)
+    @patch('courseware.middleware.dog_stats_api')
+    @patch('courseware.middleware.log')
+    def test_access_checks_reported(self, mock_log, mock_dog_stats_api):
+        request = RequestFactory().get("dummy_url")
+        response = Mock()
+        with patch('courseware.middleware.get_access_check_counts', return_value=(150, 20)):
+            self.assertIs(AccessCheckCountMiddleware().process_response(request, response), response)
+        mock_dog_stats_api.histogram.assert_any_call('lms.courseware.access_checks', 150)
+        mock_dog_stats_api.histogram.assert_any_call('lms.courseware.access_checks.evaluated', 20)
+        self.assertTrue(mock_log.warning.called)
+
+    @patch('courseware.middleware.dog_stats_api')
+    def test_outside_request(self, mock_dog_stats_api):
+        request = RequestFactory().get("dummy_url")
+        with patch('courseware.middleware.get_access_check_counts', return_value=None):
+            AccessCheckCountMiddleware().process_response(request, Mock())
+        self.assertFalse(mock_dog_stats_api.histogram.called)
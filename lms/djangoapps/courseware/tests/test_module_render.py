@@ -2,6 +2,7 @@
 """
 Test for lms courseware app, module render unit
 """
+from datetime import datetime
 from functools import partial
 import json
 
@@ -10,12 +11,14 @@ import ddt
 from django.http import Http404, HttpResponse
 from django.core.urlresolvers import reverse
 from django.conf import settings
+from django.core.cache import cache
 from django.test.client import RequestFactory
 from django.test.utils import override_settings
 from django.contrib.auth.models import AnonymousUser
 from mock import MagicMock, patch, Mock
 from opaque_keys.edx.keys import UsageKey, CourseKey
 from opaque_keys.edx.locations import SlashSeparatedCourseKey
+from pytz import UTC
 from courseware.module_render import hash_resource
 from xblock.field_data import FieldData
 from xblock.runtime import Runtime
@@ -527,6 +530,108 @@ class TestTOC(ModuleStoreTestCase):
             for toc_section in expected:
                 self.assertIn(toc_section, actual)
 
+    @override_settings(COURSEWARE_TOC_CACHE_TIMEOUT=60)
+    def test_toc_cached(self):
+        cache.clear()
+        self.setup_modulestore(ModuleStoreEnum.Type.mongo, 3, 0)
+        with patch('courseware.module_render._build_toc', wraps=render._build_toc) as mock_build_toc:
+            first = render.toc_for_course(self.request, self.toy_course, self.chapter, None, self.field_data_cache)
+            second = render.toc_for_course(
+                self.request, self.toy_course, self.chapter, 'Welcome', self.field_data_cache
+            )
+            self.assertEqual(mock_build_toc.call_count, 1)
+
+        # Only the active flags differ.
+        self.assertFalse(any(section['active'] for section in first[0]['sections']))
+        self.assertEqual([section['active'] for section in second[0]['sections']], [False, True, False, False])
+        for section in second[0]['sections']:
+            section['active'] = False
+        self.assertEqual(first, second)
+
+        # Staff see the table of contents built for staff.
+        self.request.user = GlobalStaffFactory()
+        field_data_cache = FieldDataCache.cache_for_descriptor_descendents(
+            self.toy_loc, self.request.user, self.toy_course, depth=2
+        )
+        with patch('courseware.module_render._build_toc', wraps=render._build_toc) as mock_build_toc:
+            render.toc_for_course(self.request, self.toy_course, self.chapter, None, field_data_cache)
+            self.assertEqual(mock_build_toc.call_count, 1)
+
+    @override_settings(COURSEWARE_TOC_CACHE_TIMEOUT=60)
+    def test_toc_updated_after_edit(self):
+        cache.clear()
+        self.setup_modulestore(ModuleStoreEnum.Type.mongo, 3, 0)
+        render.toc_for_course(self.request, self.toy_course, self.chapter, None, self.field_data_cache)
+
+        section = self.store.get_item(self.toy_course.get_children()[0].get_children()[1].location)
+        section.display_name = u'Welcome Back'
+        self.store.update_item(section, ModuleStoreEnum.UserID.test)
+        course = self.store.get_course(self.toy_loc, depth=2)
+        field_data_cache = FieldDataCache.cache_for_descriptor_descendents(
+            self.toy_loc, self.request.user, course, depth=2
+        )
+        toc = render.toc_for_course(self.request, course, self.chapter, None, field_data_cache)
+        self.assertEqual(toc[0]['sections'][1]['display_name'], u'Welcome Back')
+
+    @override_settings(COURSEWARE_TOC_CACHE_TIMEOUT=60)
+    def test_toc_not_cached_without_version(self):
+        cache.clear()
+        self.setup_modulestore(ModuleStoreEnum.Type.mongo, 3, 0)
+        with patch.object(self.toy_course.runtime, 'get_subtree_edited_on', return_value=None):
+            with patch('courseware.module_render._build_toc', wraps=render._build_toc) as mock_build_toc:
+                render.toc_for_course(self.request, self.toy_course, self.chapter, None, self.field_data_cache)
+                render.toc_for_course(self.request, self.toy_course, self.chapter, None, self.field_data_cache)
+                self.assertEqual(mock_build_toc.call_count, 2)
+
+    @override_settings(COURSEWARE_TOC_CACHE_TIMEOUT=60)
+    def test_toc_rebuilt_after_release(self):
+        cache.clear()
+        self.setup_modulestore(ModuleStoreEnum.Type.mongo, 3, 0)
+        with patch('courseware.module_render.datetime') as mock_datetime:
+            # The table of contents is cached before the course's sections were released.
+            mock_datetime.now.return_value = datetime(2000, 1, 1, tzinfo=UTC)
+            render.toc_for_course(self.request, self.toy_course, self.chapter, None, self.field_data_cache)
+        with patch('courseware.module_render._build_toc', wraps=render._build_toc) as mock_build_toc:
+            render.toc_for_course(self.request, self.toy_course, self.chapter, None, self.field_data_cache)
+            render.toc_for_course(self.request, self.toy_course, self.chapter, None, self.field_data_cache)
+            self.assertEqual(mock_build_toc.call_count, 1)
+
+    @override_settings(COURSEWARE_TOC_CACHE_TIMEOUT=60)
+    def test_toc_due_date_extension(self):
+        cache.clear()
+        self.setup_modulestore(ModuleStoreEnum.Type.mongo, 3, 0)
+        due = datetime(2010, 5, 12, 2, 42, tzinfo=UTC)
+        extended_due = datetime(2010, 5, 14, 2, 42, tzinfo=UTC)
+        section = self.toy_course.get_children()[0].get_children()[1]
+        with patch('courseware.module_render._build_toc') as mock_build_toc:
+            mock_build_toc.return_value = [{
+                'display_name': u'Overview',
+                'url_name': 'Overview',
+                'sections': [{
+                    'display_name': u'Welcome',
+                    'url_name': 'Welcome',
+                    'location': unicode(section.location),
+                    'format': '',
+                    'due': due,
+                    'graded': True,
+                }],
+            }]
+            toc = render.toc_for_course(self.request, self.toy_course, self.chapter, None, self.field_data_cache)
+            self.assertEqual(toc[0]['sections'][0]['due'], due)
+
+            StudentModuleFactory.create(
+                student=self.request.user,
+                course_id=self.course_key,
+                module_state_key=section.location,
+                state=json.dumps({'extended_due': extended_due.strftime('%Y-%m-%dT%H:%M:%SZ')}),
+            )
+            field_data_cache = FieldDataCache.cache_for_descriptor_descendents(
+                self.toy_loc, self.request.user, self.toy_course, depth=2
+            )
+            toc = render.toc_for_course(self.request, self.toy_course, self.chapter, None, field_data_cache)
+            self.assertEqual(toc[0]['sections'][0]['due'], extended_due)
+            self.assertEqual(mock_build_toc.call_count, 1)
+
 
 class TestHtmlModifiers(ModuleStoreTestCase):
     """
@@ -4,6 +4,7 @@ Integration tests for submitting problem responses and getting grades.
 """
 import json
 import os
+from datetime import timedelta
 from textwrap import dedent
 
 from django.conf import settings
@@ -18,7 +19,7 @@ from capa.tests.response_xml_factory import (
     CodeResponseXMLFactory,
 )
 from courseware import grades
-from courseware.models import StudentModule
+from courseware.models import ProblemAnswerDistribution, StudentModule
 from courseware.tests.helpers import LoginEnrollmentTestCase
 from xmodule.modulestore.tests.django_utils import TEST_DATA_MOCK_MODULESTORE
 from lms.djangoapps.lms_xblock.runtime import quote_slashes
@@ -1049,6 +1050,62 @@ class TestAnswerDistributions(TestSubmittingProblems):
                 }
             )
 
+    @patch('courseware.grades.ANSWER_DISTRIBUTION_UPDATE_OVERLAP', timedelta(0))
+    def test_only_changed_problems_recounted(self):
+        self.submit_question_answer('p1', {'2_1': u'Correct'})
+        grades.answer_distributions(self.course.id)
+
+        self.submit_question_answer('p2', {'2_1': u'Incorrect'})
+        with patch('courseware.grades._problem_answer_counts', wraps=grades._problem_answer_counts) as mock_counts:
+            distributions = grades.answer_distributions(self.course.id)
+        self.assertEqual(
+            [call_args[0][1].name for call_args in mock_counts.call_args_list],
+            ['p2']
+        )
+        self.assertEqual(
+            distributions,
+            {
+                ('p1', 'p1', '{}_2_1'.format(self.p1_html_id)): {
+                    'Correct': 1
+                },
+                ('p2', 'p2', '{}_2_1'.format(self.p2_html_id)): {
+                    'Incorrect': 1
+                },
+            }
+        )
+
+    @patch('courseware.grades.ANSWER_DISTRIBUTION_UPDATE_OVERLAP', timedelta(0))
+    def test_deleted_state(self):
+        self.submit_question_answer('p1', {'2_1': u'Correct'})
+        self.submit_question_answer('p2', {'2_1': u'Incorrect'})
+        grades.answer_distributions(self.course.id)
+
+        StudentModule.objects.filter(
+            course_id=self.course.id,
+            module_state_key=self.course.id.make_usage_key('problem', 'p1'),
+        ).delete()
+        self.assertEqual(
+            grades.answer_distributions(self.course.id),
+            {
+                ('p2', 'p2', '{}_2_1'.format(self.p2_html_id)): {
+                    'Incorrect': 1
+                },
+            }
+        )
+
+    @patch('courseware.grades.ANSWER_DISTRIBUTION_UPDATE_OVERLAP', timedelta(0))
+    def test_rebuild(self):
+        self.submit_question_answer('p1', {'2_1': u'Correct'})
+        self.submit_question_answer('p2', {'2_1': u'Incorrect'})
+        distributions = grades.answer_distributions(self.course.id)
+
+        # Corrupt the stored counts; a rebuild recounts everything.
+        ProblemAnswerDistribution.objects.filter(course_id=self.course.id).update(answer_counts='{}')
+        self.assertEqual(grades.rebuild_answer_distributions(self.course.id), 2)
+        with patch('courseware.grades._problem_answer_counts') as mock_counts:
+            self.assertEqual(grades.answer_distributions(self.course.id), distributions)
+        self.assertFalse(mock_counts.called)
+
 
 class TestConditionalContent(TestSubmittingProblems):
     """
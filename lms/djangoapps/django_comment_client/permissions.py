@@ -7,6 +7,10 @@ from types import NoneType
 from django.core import cache
 from lms.lib.comment_client import Thread
 from opaque_keys.edx.keys import CourseKey
+from xmodule.modulestore.django import modulestore
+from xmodule.modulestore.exceptions import ItemNotFoundError
+
+from django_comment_common.models import FORUM_ROLE_STUDENT
 
 CACHE = cache.get_cache('default')
 CACHE_LIFESPAN = 60
@@ -35,6 +39,32 @@ def has_permission(user, permission, course_id=None):
     return False
 
 
+def get_user_permissions(user, course_id):
+    """
+    Return the set of the names of the permissions `user` has in the course,
+    as `has_permission` would find them, using a single query.
+
+    Use it to check many permissions of the same user at once, e.g. when
+    annotating all the content of a thread.
+    """
+    assert isinstance(course_id, CourseKey)
+    permissions = set()
+    roles = user.roles.filter(course_id=course_id).prefetch_related('permissions')
+    for role in roles:
+        role_permissions = set(permission.name for permission in role.permissions.all())
+        if role.name == FORUM_ROLE_STUDENT:
+            # Role.has_permission looks the course up for each check; look it up once instead.
+            course = modulestore().get_course(course_id)
+            if course is None:
+                raise ItemNotFoundError(course_id)
+            if not course.forum_posts_allowed:
+                role_permissions = set(
+                    name for name in role_permissions if not name.startswith(('edit', 'update', 'create'))
+                )
+        permissions |= role_permissions
+    return permissions
+
+
 CONDITIONS = ['is_open', 'is_author', 'is_question_author']
 
 
@@ -72,18 +102,23 @@ def _check_condition(user, condition, content):
     return handlers[condition](user, content)
 
 
-def _check_conditions_permissions(user, permissions, course_id, content):
+def _check_conditions_permissions(user, permissions, course_id, content, user_permissions=None):
     """
     Accepts a list of permissions and proceed if any of the permission is valid.
     Note that ["can_view", "can_edit"] will proceed if the user has either
     "can_view" or "can_edit" permission. To use AND operator in between, wrap them in
     a list.
+
+    If given, `user_permissions` is the result of `get_user_permissions` for
+    the user and course, and is used instead of querying each permission.
     """
 
     def test(user, per, operator="or"):
         if isinstance(per, basestring):
             if per in CONDITIONS:
                 return _check_condition(user, per, content)
+            if user_permissions is not None:
+                return per in user_permissions
             return cached_has_permission(user, per, course_id=course_id)
         elif isinstance(per, list) and operator in ["and", "or"]:
             results = [test(user, x, operator="and") for x in per]
@@ -123,10 +158,10 @@ VIEW_PERMISSIONS = {
 }
 
 
-def check_permissions_by_view(user, course_id, content, name):
+def check_permissions_by_view(user, course_id, content, name, user_permissions=None):
     assert isinstance(course_id, CourseKey)
     try:
         p = VIEW_PERMISSIONS[name]
     except KeyError:
         logging.warning("Permission for view named %s does not exist in permissions.py" % name)
-    return _check_conditions_permissions(user, p, course_id, content)
+    return _check_conditions_permissions(user, p, course_id, content, user_permissions=user_permissions)
@@ -9,6 +9,8 @@ from edxmako import add_lookup
 import mock
 
 from django_comment_client.tests.factories import RoleFactory
+from django_comment_common.models import Role, FORUM_ROLE_MODERATOR
+from django_comment_common.utils import seed_permissions_roles
 from django_comment_client.tests.unicode import UnicodeTestMixin
 from django_comment_client.tests.utils import ContentGroupTestCase
 import django_comment_client.utils as utils
@@ -646,6 +648,28 @@ class CategoryMapTestCase(CategoryMapTestMixin, ModuleStoreTestCase):
             ["Topic_A", "Topic_B", "Topic_C", "discussion1", "discussion2", "discussion3"]
         )
 
+    def test_discussion_modules_cached(self):
+        self.create_discussion("Chapter 1", "Discussion 1")
+        with mock.patch('django_comment_client.utils.modulestore', wraps=utils.modulestore) as mock_modulestore:
+            self.assertEqual(utils.get_discussion_categories_ids(self.course, self.user), ["discussion1"])
+            self.assertEqual(utils.get_discussion_categories_ids(self.course, self.user), ["discussion1"])
+            self.assertEqual(mock_modulestore.call_count, 1)
+
+            # Publishing the new discussion module invalidates the cached modules.
+            self.create_discussion("Chapter 2", "Discussion")
+            self.assertItemsEqual(
+                utils.get_discussion_categories_ids(self.course, self.user),
+                ["discussion1", "discussion2"]
+            )
+            self.assertEqual(mock_modulestore.call_count, 2)
+
+    def test_cached_discussion_modules_start_date(self):
+        self.create_discussion("Chapter 1", "Discussion 1", start=datetime(3000, 1, 1, tzinfo=UTC))
+        with mock.patch.dict('django.conf.settings.FEATURES', {'DISABLE_START_DATES': False}):
+            self.assertEqual(utils.get_discussion_categories_ids(self.course, self.user), [])
+            staff = UserFactory.create(is_staff=True)
+            self.assertEqual(utils.get_discussion_categories_ids(self.course, staff), ["discussion1"])
+
 
 class ContentGroupCategoryMapTestCase(CategoryMapTestMixin, ContentGroupTestCase):
     """
@@ -813,6 +837,63 @@ class ContentGroupCategoryMapTestCase(CategoryMapTestMixin, ContentGroupTestCase
         )
 
 
+class AnnotatedContentInfoTestCase(ModuleStoreTestCase):
+    """
+    Tests of the abilities given by `get_metadata_for_threads`.
+    """
+    def setUp(self):
+        super(AnnotatedContentInfoTestCase, self).setUp(create_user=True)
+        self.course = CourseFactory.create()
+        seed_permissions_roles(self.course.id)
+        CourseEnrollmentFactory.create(user=self.user, course_id=self.course.id)
+        self.user_info = {'upvoted_ids': [], 'downvoted_ids': [], 'subscribed_thread_ids': []}
+
+    def make_thread(self, thread_id, user_id, num_responses):
+        """Returns a thread by `user_id` with `num_responses` responses by another user."""
+        responses = [
+            {'id': '{}_{}'.format(thread_id, index), 'type': 'comment', 'user_id': '0', 'closed': False}
+            for index in range(num_responses)
+        ]
+        return {
+            'id': thread_id, 'type': 'thread', 'user_id': user_id, 'closed': False, 'children': responses,
+        }
+
+    def test_abilities(self):
+        threads = [self.make_thread('t1', str(self.user.id), 1), self.make_thread('t2', '0', 0)]
+        metadata = utils.get_metadata_for_threads(self.course.id, threads, self.user, self.user_info)
+        self.assertEqual(
+            metadata['t1']['ability'],
+            {'editable': True, 'can_reply': True, 'can_delete': True, 'can_openclose': False, 'can_vote': True}
+        )
+        self.assertEqual(
+            metadata['t2']['ability'],
+            {'editable': False, 'can_reply': True, 'can_delete': False, 'can_openclose': False, 'can_vote': True}
+        )
+        self.assertEqual(
+            metadata['t1_0']['ability'],
+            {'editable': False, 'can_reply': True, 'can_delete': False, 'can_openclose': False, 'can_vote': True}
+        )
+
+    def test_moderator_abilities(self):
+        moderator = UserFactory.create()
+        CourseEnrollmentFactory.create(user=moderator, course_id=self.course.id)
+        moderator.roles.add(Role.objects.get(name=FORUM_ROLE_MODERATOR, course_id=self.course.id))
+        metadata = utils.get_metadata_for_threads(
+            self.course.id, [self.make_thread('t1', '0', 1)], moderator, self.user_info
+        )
+        self.assertEqual(
+            metadata['t1']['ability'],
+            {'editable': True, 'can_reply': True, 'can_delete': True, 'can_openclose': True, 'can_vote': True}
+        )
+        self.assertTrue(metadata['t1_0']['ability']['can_delete'])
+
+    def test_permissions_loaded_once(self):
+        threads = [self.make_thread('t{}'.format(index), '0', 20) for index in range(5)]
+        with self.assertNumQueries(2):
+            metadata = utils.get_metadata_for_threads(self.course.id, threads, self.user, self.user_info)
+        self.assertEqual(len(metadata), 105)
+
+
 class JsonResponseTestCase(TestCase, UnicodeTestMixin):
     def _test_unicode_data(self, text):
         response = utils.JsonResponse(text)
@@ -5,20 +5,22 @@ import logging
 
 import pytz
 from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.core.urlresolvers import reverse
 from django.db import connection
 from django.http import HttpResponse
 from django.utils.timezone import UTC
 import pystache_custom as pystache
 from opaque_keys.edx.locations import i4xEncoder
-from opaque_keys.edx.keys import CourseKey
+from opaque_keys.edx.keys import CourseKey, UsageKey
 from xmodule.modulestore.django import modulestore
+from xmodule.partitions.partitions import NoSuchUserPartitionError
 
-from django_comment_common.models import Role, FORUM_ROLE_STUDENT
-from django_comment_client.permissions import check_permissions_by_view, cached_has_permission
+from django_comment_common.models import Role, FORUM_ROLE_STUDENT, DISCUSSION_MODULES_CACHE_KEY
+from django_comment_client.permissions import check_permissions_by_view, cached_has_permission, get_user_permissions
 from edxmako import lookup_template
 
-from courseware.access import has_access
+from courseware.access import can_load_descriptor, has_access
 from openedx.core.djangoapps.course_groups.cohorts import get_cohort_by_id, get_cohort_id, is_commentable_cohorted, \
     is_course_cohorted
 from openedx.core.djangoapps.course_groups.models import CourseUserGroup
@@ -26,6 +28,9 @@ from openedx.core.djangoapps.course_groups.models import CourseUserGroup
 
 log = logging.getLogger(__name__)
 
+# Longest time, in seconds, a course's discussion modules are cached for.
+DISCUSSION_MODULES_CACHE_TIMEOUT = 60 * 60
+
 
 def extract(dic, keys):
     return {k: dic.get(k) for k in keys}
@@ -60,24 +65,107 @@ def has_forum_access(uname, course_id, rolename):
     return role.users.filter(username=uname).exists()
 
 
+class CachedDiscussionModule(object):
+    """
+    The fields of a discussion module needed by the forum, as kept in the
+    cache of the course's discussion modules.
+
+    It also has the attributes `courseware.access.can_load_descriptor` looks
+    at, so the checks made by `has_access` can be repeated without loading
+    the module.
+    """
+    FIELDS = (
+        'discussion_id', 'discussion_category', 'discussion_target', 'sort_key', 'start',
+        'days_early_for_beta', 'visible_to_staff_only', 'merged_group_access',
+    )
+
+    def __init__(self, course, location, **fields):
+        self.location = location
+        self.user_partitions = course.user_partitions
+        for name in self.FIELDS:
+            setattr(self, name, fields[name])
+
+    @classmethod
+    def to_dict(cls, module):
+        """
+        Returns the cached fields of the discussion module `module`.
+        """
+        fields = {name: getattr(module, name) for name in cls.FIELDS}
+        fields['location'] = unicode(module.location)
+        return fields
+
+    @classmethod
+    def from_dict(cls, course, fields):
+        """
+        Returns a `CachedDiscussionModule` of `course` made from `fields`.
+        """
+        fields = dict(fields)
+        location = UsageKey.from_string(fields.pop('location')).map_into_course(course.id)
+        return cls(course, location, **fields)
+
+    def _get_user_partition(self, user_partition_id):
+        """
+        Returns the course's user partition with id `user_partition_id`.
+        """
+        for user_partition in self.user_partitions:
+            if user_partition.id == user_partition_id:
+                return user_partition
+        raise NoSuchUserPartitionError("could not find a UserPartition with ID [{}]".format(user_partition_id))
+
+
+def _get_discussion_modules(course):
+    """
+    Return the valid discussion modules in this course, as a list of
+    `CachedDiscussionModule`.
+
+    The modules are read from the cache, which holds them until the course is
+    next published or edited, or for at most DISCUSSION_MODULES_CACHE_TIMEOUT
+    seconds.
+    """
+    cache_key = DISCUSSION_MODULES_CACHE_KEY.format(course_id=course.id)
+    # The LMS doesn't mix EditInfoMixin into its blocks, so ask the runtime.
+    get_subtree_edited_on = getattr(course.runtime, 'get_subtree_edited_on', None)
+    version = unicode(get_subtree_edited_on(course)) if get_subtree_edited_on else None
+    cached = cache.get(cache_key)
+    if cached is None or cached['version'] != version:
+        all_modules = modulestore().get_items(course.id, qualifiers={'category': 'discussion'})
+
+        def has_required_keys(module):
+            for key in ('discussion_id', 'discussion_category', 'discussion_target'):
+                if getattr(module, key) is None:
+                    log.warning("Required key '%s' not in discussion %s, leaving out of category map" % (key, module.location))
+                    return False
+            return True
+
+        cached = {
+            'version': version,
+            'modules': [CachedDiscussionModule.to_dict(module) for module in all_modules if has_required_keys(module)],
+        }
+        cache.set(cache_key, cached, DISCUSSION_MODULES_CACHE_TIMEOUT)
+
+    return [CachedDiscussionModule.from_dict(course, fields) for fields in cached['modules']]
+
+
 # pylint: disable=invalid-name
 def get_accessible_discussion_modules(course, user):
     """
     Return a list of all valid discussion modules in this course that
     are accessible to the given user.
+
+    The modules are `CachedDiscussionModule`s rather than the modules
+    themselves. The checks `has_access(user, 'load', module)` would make are
+    repeated on them, with staff access looked up at most once.
     """
-    all_modules = modulestore().get_items(course.id, qualifiers={'category': 'discussion'})
+    is_staff = []
 
-    def has_required_keys(module):
-        for key in ('discussion_id', 'discussion_category', 'discussion_target'):
-            if getattr(module, key) is None:
-                log.warning("Required key '%s' not in discussion %s, leaving out of category map" % (key, module.location))
-                return False
-        return True
+    def has_staff_access():  # pylint: disable=missing-docstring
+        if not is_staff:
+            is_staff.append(has_access(user, 'staff', course))
+        return is_staff[0]
 
     return [
-        module for module in all_modules
-        if has_required_keys(module) and has_access(user, 'load', module, course.id)
+        module for module in _get_discussion_modules(course)
+        if can_load_descriptor(user, module, course.id, has_staff_access)
     ]
 
 
@@ -288,19 +376,28 @@ class QueryCountDebugMiddleware(object):
         return response
 
 
-def get_ability(course_id, content, user):
+def get_ability(course_id, content, user, user_permissions=None):
+    """
+    Return what `user` can do with `content`, a thread or comment.
+
+    `user_permissions`, as returned by `get_user_permissions`, saves querying
+    the user's permissions when annotating many contents.
+    """
+    def check(view_name):  # pylint: disable=missing-docstring
+        return check_permissions_by_view(user, course_id, content, view_name, user_permissions=user_permissions)
+
     return {
-        'editable': check_permissions_by_view(user, course_id, content, "update_thread" if content['type'] == 'thread' else "update_comment"),
-        'can_reply': check_permissions_by_view(user, course_id, content, "create_comment" if content['type'] == 'thread' else "create_sub_comment"),
-        'can_delete': check_permissions_by_view(user, course_id, content, "delete_thread" if content['type'] == 'thread' else "delete_comment"),
-        'can_openclose': check_permissions_by_view(user, course_id, content, "openclose_thread") if content['type'] == 'thread' else False,
-        'can_vote': check_permissions_by_view(user, course_id, content, "vote_for_thread" if content['type'] == 'thread' else "vote_for_comment"),
+        'editable': check("update_thread" if content['type'] == 'thread' else "update_comment"),
+        'can_reply': check("create_comment" if content['type'] == 'thread' else "create_sub_comment"),
+        'can_delete': check("delete_thread" if content['type'] == 'thread' else "delete_comment"),
+        'can_openclose': check("openclose_thread") if content['type'] == 'thread' else False,
+        'can_vote': check("vote_for_thread" if content['type'] == 'thread' else "vote_for_comment"),
     }
 
 # TODO: RENAME
 
 
-def get_annotated_content_info(course_id, content, user, user_info):
+def get_annotated_content_info(course_id, content, user, user_info, user_permissions=None):
     """
     Get metadata for an individual content (thread or comment)
     """
@@ -312,20 +409,27 @@ def get_annotated_content_info(course_id, content, user, user_info):
     return {
         'voted': voted,
         'subscribed': content['id'] in user_info['subscribed_thread_ids'],
-        'ability': get_ability(course_id, content, user),
+        'ability': get_ability(course_id, content, user, user_permissions=user_permissions),
     }
 
 # TODO: RENAME
 
 
-def get_annotated_content_infos(course_id, thread, user, user_info):
+def get_annotated_content_infos(course_id, thread, user, user_info, user_permissions=None):
     """
     Get metadata for a thread and its children
+
+    The user's permissions are loaded once for the whole thread, unless
+    given as `user_permissions`.
     """
+    if user_permissions is None:
+        user_permissions = get_user_permissions(user, course_id)
     infos = {}
 
     def annotate(content):
-        infos[str(content['id'])] = get_annotated_content_info(course_id, content, user, user_info)
+        infos[str(content['id'])] = get_annotated_content_info(
+            course_id, content, user, user_info, user_permissions=user_permissions
+        )
         for child in (
                 content.get('children', []) +
                 content.get('endorsed_responses', []) +
@@ -337,10 +441,14 @@ def get_annotated_content_infos(course_id, thread, user, user_info):
 
 
 def get_metadata_for_threads(course_id, threads, user, user_info):
-    def infogetter(thread):
-        return get_annotated_content_infos(course_id, thread, user, user_info)
-
-    metadata = reduce(merge_dict, map(infogetter, threads), {})
+    """
+    Get metadata for the threads and their children, loading the user's
+    permissions once for all of them.
+    """
+    user_permissions = get_user_permissions(user, course_id)
+    metadata = {}
+    for thread in threads:
+        metadata.update(get_annotated_content_infos(course_id, thread, user, user_info, user_permissions))
     return metadata
 
 # put this method in utils.py to avoid circular import dependency between helpers and mustache_helpers
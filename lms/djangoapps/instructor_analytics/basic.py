@@ -15,6 +15,7 @@ from django.core.urlresolvers import reverse
 import xmodule.graders as xmgraders
 from django.core.exceptions import ObjectDoesNotExist
 from microsite_configuration import microsite
+from util.query import iterate_in_batches, use_read_replica_if_available
 
 
 STUDENT_FEATURES = ('id', 'username', 'first_name', 'last_name', 'is_staff', 'email')
@@ -159,12 +160,22 @@ def enrolled_students_features(course_key, features):
         {'username': 'username3', 'first_name': 'firstname3'}
     ]
     """
+    return list(iter_enrolled_students_features(course_key, features))
+
+
+def iter_enrolled_students_features(course_key, features):
+    """
+    Yield the same student features dictionaries as
+    `enrolled_students_features`, reading the students from the read replica
+    (if there is one) in batches, so that reports for large courses don't
+    hold every student in memory.
+    """
     include_cohort_column = 'cohort' in features
 
-    students = User.objects.filter(
+    students = use_read_replica_if_available(User.objects.filter(
         courseenrollment__course_id=course_key,
         courseenrollment__is_active=1,
-    ).order_by('username').select_related('profile')
+    )).select_related('profile')
 
     if include_cohort_column:
         students = students.prefetch_related('course_groups')
@@ -206,7 +217,8 @@ def enrolled_students_features(course_key, features):
             )
         return student_dict
 
-    return [extract_student(student, features) for student in students]
+    for student in iterate_in_batches(students, key='username'):
+        yield extract_student(student, features)
 
 
 def coupon_codes_features(features, coupons_list):
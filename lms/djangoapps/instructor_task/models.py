@@ -13,13 +13,15 @@ ASSUMPTIONS: modules have unique IDs, even across different module_types
 
 """
 from cStringIO import StringIO
-from gzip import GzipFile
 from uuid import uuid4
 import csv
+import itertools
 import json
 import hashlib
 import os.path
+import tempfile
 import urllib
+import zlib
 
 from boto.s3.connection import S3Connection
 from boto.s3.key import Key
@@ -193,21 +195,40 @@ class InstructorTask(models.Model):
 class ReportStore(object):
     """
     Simple abstraction layer that can fetch and store CSV files for reports
-    download. Should probably refactor later to create a ReportFile object that
-    can simply be appended to for the sake of memory efficiency, rather than
-    passing in the whole dataset. Doing that for now just because it's simpler.
+    download. `store_rows` accepts any iterable of rows, including generators,
+    and writes them out as they are produced, so a report never has to be held
+    in memory as a whole.
     """
+    # Path, relative to the configured root, under which partial reports are kept.
+    PARTIAL_PATH = "partial"
+
+    # Size of the chunks in which `store_rows` writes out a file.
+    CHUNK_SIZE = 64 * 1024
+
     @classmethod
-    def from_config(cls):
+    def from_config(cls, partial=False):
         """
         Return one of the ReportStore subclasses depending on django
         configuration. Look at subclasses for expected configuration.
+
+        If `partial` is True, the store keeps its files apart from the
+        finished reports, so that `links_for` on a regular store never lists
+        them. It is used for the parts of a report generated by several tasks.
         """
         storage_type = settings.GRADES_DOWNLOAD.get("STORAGE_TYPE")
         if storage_type.lower() == "s3":
-            return S3ReportStore.from_config()
+            return S3ReportStore.from_config(partial)
         elif storage_type.lower() == "localfs":
-            return LocalFSReportStore.from_config()
+            return LocalFSReportStore.from_config(partial)
+
+    @classmethod
+    def _root_path_from_config(cls, partial):
+        """
+        Return the configured ROOT_PATH, or the path for partial reports under
+        it if `partial` is True.
+        """
+        root_path = settings.GRADES_DOWNLOAD['ROOT_PATH']
+        return "{}/{}".format(root_path, cls.PARTIAL_PATH) if partial else root_path
 
     def _get_utf8_encoded_rows(self, rows):
         """
@@ -218,6 +239,48 @@ class ReportStore(object):
         for row in rows:
             yield [unicode(item).encode('utf-8') for item in row]
 
+    def _get_encoded_chunks(self, rows, compress=False):
+        """
+        Given an iterable of `rows` containing unicode strings, yield the utf-8
+        encoded CSV file for them in chunks of at least `CHUNK_SIZE` bytes
+        (except for the last one, which may be smaller or empty). If
+        `compress` is True, the file is gzip-compressed.
+        """
+        compressor = zlib.compressobj(9, zlib.DEFLATED, 16 + zlib.MAX_WBITS) if compress else None
+        row_buffer = StringIO()
+        csvwriter = csv.writer(row_buffer)
+        chunk = []
+        chunk_size = 0
+        for row in self._get_utf8_encoded_rows(rows):
+            csvwriter.writerow(row)
+            if row_buffer.tell() < self.CHUNK_SIZE:
+                continue
+            data = row_buffer.getvalue()
+            row_buffer.seek(0)
+            row_buffer.truncate()
+            if compressor:
+                data = compressor.compress(data)
+            chunk.append(data)
+            chunk_size += len(data)
+            if chunk_size >= self.CHUNK_SIZE:
+                yield ''.join(chunk)
+                chunk = []
+                chunk_size = 0
+
+        data = row_buffer.getvalue()
+        if compressor:
+            data = compressor.compress(data) + compressor.flush()
+        chunk.append(data)
+        yield ''.join(chunk)
+
+    def _get_unicode_decoded_rows(self, csv_lines):
+        """
+        Read CSV rows from an iterable of utf-8 encoded `csv_lines`, returning
+        each row as a list of unicode strings.
+        """
+        for row in csv.reader(csv_lines):
+            yield [item.decode('utf-8') for item in row]
+
 
 class S3ReportStore(ReportStore):
     """
@@ -230,7 +293,12 @@ class S3ReportStore(ReportStore):
     grouping and querying, but right now it simply depends on its own
     conventions on where files are stored to know what to display. Clients using
     this class can name the final file whatever they want.
+
+    Files larger than `CHUNK_SIZE` are sent with a multipart upload, so every
+    part but the last one must be at least the 5MB S3 requires.
     """
+    CHUNK_SIZE = 8 * 1024 * 1024
+
     def __init__(self, bucket_name, root_path):
         self.root_path = root_path
 
@@ -242,7 +310,7 @@ class S3ReportStore(ReportStore):
         self.bucket = conn.get_bucket(bucket_name)
 
     @classmethod
-    def from_config(cls):
+    def from_config(cls, partial=False):
         """
         The expected configuration for an `S3ReportStore` is to have a
         `GRADES_DOWNLOAD` dict in settings with the following fields::
@@ -258,7 +326,7 @@ class S3ReportStore(ReportStore):
         """
         return cls(
             settings.GRADES_DOWNLOAD['BUCKET'],
-            settings.GRADES_DOWNLOAD['ROOT_PATH']
+            cls._root_path_from_config(partial)
         )
 
     def key_for(self, course_id, filename):
@@ -308,19 +376,68 @@ class S3ReportStore(ReportStore):
     def store_rows(self, course_id, filename, rows):
         """
         Given a `course_id`, `filename`, and `rows` (each row is an iterable of
-        strings), create a buffer that is a gzip'd csv file, and then `store()`
-        that buffer.
+        strings), store them as a gzip'd csv file. A file that fits in a single
+        chunk is sent with `store()`; larger ones are sent chunk by chunk with a
+        multipart upload, which only becomes visible once it is complete.
 
         Even though we store it in gzip format, browsers will transparently
         download and decompress it. Filenames should end in `.csv`, not `.gz`.
         """
-        output_buffer = StringIO()
-        gzip_file = GzipFile(fileobj=output_buffer, mode="wb")
-        csvwriter = csv.writer(gzip_file)
-        csvwriter.writerows(self._get_utf8_encoded_rows(rows))
-        gzip_file.close()
-
-        self.store(course_id, filename, output_buffer)
+        chunks = self._get_encoded_chunks(rows, compress=True)
+        first_chunk = next(chunks)
+        second_chunk = next(chunks, None)
+        if second_chunk is None:
+            self.store(course_id, filename, StringIO(first_chunk))
+            return
+
+        upload = self.bucket.initiate_multipart_upload(
+            self.key_for(course_id, filename).key,
+            headers={
+                "Content-Encoding": "gzip",
+                "Content-Type": "text/csv",
+            }
+        )
+        try:
+            all_chunks = itertools.chain([first_chunk, second_chunk], chunks)
+            for part_number, chunk in enumerate(all_chunks, start=1):
+                upload.upload_part_from_file(StringIO(chunk), part_number)
+        except Exception:
+            upload.cancel_upload()
+            raise
+        upload.complete_upload()
+
+    def read_rows(self, course_id, filename):
+        """
+        Yield the rows, as lists of unicode strings, of a CSV file stored by
+        `store_rows`. Yields nothing if there is no such file.
+        """
+        key = self.bucket.get_key(self.key_for(course_id, filename).key)
+        if key is None:
+            return
+
+        def _lines():
+            """
+            Decompress the file as it is downloaded, yielding one line at a time.
+            """
+            decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+            pending = ''
+            for chunk in key:
+                lines = (pending + decompressor.decompress(chunk)).split('\n')
+                pending = lines.pop()
+                for line in lines:
+                    yield line + '\n'
+            pending += decompressor.flush()
+            if pending:
+                yield pending
+
+        for row in self._get_unicode_decoded_rows(_lines()):
+            yield row
+
+    def delete(self, course_id, filename):
+        """
+        Delete the file stored for `course_id` as `filename`, if it exists.
+        """
+        self.bucket.delete_key(self.key_for(course_id, filename).key)
 
     def links_for(self, course_id):
         """
@@ -354,7 +471,7 @@ class LocalFSReportStore(ReportStore):
             os.makedirs(root_path)
 
     @classmethod
-    def from_config(cls):
+    def from_config(cls, partial=False):
         """
         Generate an instance of this object from Django settings. It assumes
         that there is a dict in settings named GRADES_DOWNLOAD and that it has
@@ -365,7 +482,7 @@ class LocalFSReportStore(ReportStore):
             STORAGE_TYPE : "localfs"
             ROOT_PATH : /tmp/edx/report-downloads/
         """
-        return cls(settings.GRADES_DOWNLOAD['ROOT_PATH'])
+        return cls(cls._root_path_from_config(partial))
 
     def path_to(self, course_id, filename):
         """Return the full path to a given file for a given course."""
@@ -378,24 +495,57 @@ class LocalFSReportStore(ReportStore):
         assumed to be a StringIO objecd (or anything that can flush its contents
         to string using `.getvalue()`).
         """
-        full_path = self.path_to(course_id, filename)
-        directory = os.path.dirname(full_path)
-        if not os.path.exists(directory):
-            os.mkdir(directory)
-
+        full_path = self._prepare_path(course_id, filename)
         with open(full_path, "wb") as f:
             f.write(buff.getvalue())
 
     def store_rows(self, course_id, filename, rows):
         """
         Given a course_id, filename, and rows (each row is an iterable of strings),
-        write this data out.
+        write this data out. The rows are written to a temporary file as they
+        come, which is moved into place once complete.
+        """
+        full_path = self._prepare_path(course_id, filename)
+        temp_file = tempfile.NamedTemporaryFile(dir=os.path.dirname(full_path), prefix=".", delete=False)
+        try:
+            with temp_file:
+                for chunk in self._get_encoded_chunks(rows):
+                    temp_file.write(chunk)
+            os.rename(temp_file.name, full_path)
+        except Exception:
+            os.remove(temp_file.name)
+            raise
+
+    def _prepare_path(self, course_id, filename):
+        """
+        Return the full path to a given file for a given course, creating its
+        directory if needed.
         """
-        output_buffer = StringIO()
-        csvwriter = csv.writer(output_buffer)
-        csvwriter.writerows(self._get_utf8_encoded_rows(rows))
+        full_path = self.path_to(course_id, filename)
+        directory = os.path.dirname(full_path)
+        if not os.path.exists(directory):
+            os.mkdir(directory)
+        return full_path
+
+    def read_rows(self, course_id, filename):
+        """
+        Yield the rows, as lists of unicode strings, of a CSV file stored by
+        `store_rows`. Yields nothing if there is no such file.
+        """
+        full_path = self.path_to(course_id, filename)
+        if not os.path.exists(full_path):
+            return
+        with open(full_path, "rb") as f:
+            for row in self._get_unicode_decoded_rows(f):
+                yield row
 
-        self.store(course_id, filename, output_buffer)
+    def delete(self, course_id, filename):
+        """
+        Delete the file stored for `course_id` as `filename`, if it exists.
+        """
+        full_path = self.path_to(course_id, filename)
+        if os.path.exists(full_path):
+            os.remove(full_path)
 
     def links_for(self, course_id):
         """
@@ -408,7 +558,12 @@ class LocalFSReportStore(ReportStore):
         course_dir = self.path_to(course_id, '')
         if not os.path.exists(course_dir):
             return []
-        files = [(filename, os.path.join(course_dir, filename)) for filename in os.listdir(course_dir)]
+        # Files still being written by `store_rows` are hidden.
+        files = [
+            (filename, os.path.join(course_dir, filename))
+            for filename in os.listdir(course_dir)
+            if not filename.startswith(".")
+        ]
         files.sort(key=lambda (filename, full_path): os.path.getmtime(full_path), reverse=True)
 
         return [
@@ -27,10 +27,13 @@ from instructor_task.tasks_helper import (
     run_main_task,
     BaseInstructorTask,
     perform_module_state_update,
-    rescore_problem_module_state,
+    rescore_problem_for_students,
+    rescore_problem_modules_chunk,
     reset_attempts_module_state,
     delete_problem_module_state,
     upload_grades_csv,
+    upload_grades_csv_chunk,
+    merge_grades_csv_parts,
     upload_students_csv,
     cohort_students_and_upload
 )
@@ -58,16 +61,23 @@ def rescore_problem(entry_id, xmodule_instance_args):
     """
     # Translators: This is a past-tense verb that is inserted into task progress messages as {action}.
     action_name = ugettext_noop('rescored')
-    update_fcn = partial(rescore_problem_module_state, xmodule_instance_args)
 
     def filter_fcn(modules_to_update):
         """Filter that matches problems which are marked as being done"""
         return modules_to_update.filter(state__contains='"done": true')
 
-    visit_fcn = partial(perform_module_state_update, update_fcn, filter_fcn)
+    visit_fcn = partial(rescore_problem_for_students, xmodule_instance_args, filter_fcn, rescore_problem_chunk)
     return run_main_task(entry_id, visit_fcn, action_name)
 
 
+@task  # pylint: disable=not-callable
+def rescore_problem_chunk(entry_id, module_ids, subtask_status_dict, xmodule_instance_args):
+    """
+    Rescore a chunk of the submissions to a problem, as a subtask of `rescore_problem`.
+    """
+    return rescore_problem_modules_chunk(entry_id, module_ids, subtask_status_dict, xmodule_instance_args)
+
+
 @task(base=BaseInstructorTask)  # pylint: disable=not-callable
 def reset_problem_attempts(entry_id, xmodule_instance_args):
     """Resets problem attempts to zero for a particular problem for all students in a course.
@@ -137,13 +147,36 @@ def send_bulk_course_email(entry_id, _xmodule_instance_args):
 def calculate_grades_csv(entry_id, xmodule_instance_args):
     """
     Grade a course and push the results to an S3 bucket for download.
+
+    Large courses are graded by `calculate_grades_csv_chunk` subtasks.
     """
     # Translators: This is a past-tense verb that is inserted into task progress messages as {action}.
     action_name = ugettext_noop('graded')
-    task_fn = partial(upload_grades_csv, xmodule_instance_args)
+    task_fn = partial(upload_grades_csv, xmodule_instance_args, chunk_task=calculate_grades_csv_chunk)
     return run_main_task(entry_id, task_fn, action_name)
 
 
+@task(routing_key=settings.GRADES_DOWNLOAD_ROUTING_KEY)  # pylint: disable=not-callable
+def calculate_grades_csv_chunk(entry_id, student_ids, part_number, report_time, subtask_status_dict):
+    """
+    Grade a chunk of the students of a course as part of a grade report.
+
+    The last chunk to finish queues `merge_grades_csv` to build the report.
+    """
+    return upload_grades_csv_chunk(
+        entry_id, student_ids, part_number, report_time, subtask_status_dict, merge_task=merge_grades_csv
+    )
+
+
+@task(routing_key=settings.GRADES_DOWNLOAD_ROUTING_KEY)  # pylint: disable=not-callable
+def merge_grades_csv(entry_id, report_time):
+    """
+    Merge the parts of a grade report computed by `calculate_grades_csv_chunk`,
+    and mark the grade report task as done.
+    """
+    merge_grades_csv_parts(entry_id, report_time)
+
+
 @task(base=BaseInstructorTask, routing_key=settings.GRADES_DOWNLOAD_ROUTING_KEY)  # pylint: disable=not-callable
 def calculate_students_features_csv(entry_id, xmodule_instance_args):
     """
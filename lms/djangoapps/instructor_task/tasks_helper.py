@@ -3,33 +3,48 @@ This file contains tasks that are designed to perform background operations on t
 running state of a course.
 
 """
+import calendar
+import itertools
 import json
 from datetime import datetime
+from functools import partial
 from time import time
+import traceback
 import unicodecsv
 import logging
+from collections import OrderedDict
 
 from celery import Task, current_task
 from celery.states import SUCCESS, FAILURE
+from django.conf import settings
 from django.contrib.auth.models import User
 from django.core.files.storage import DefaultStorage
-from django.db import transaction, reset_queries
+from django.db import connection, transaction, reset_queries
 import dogstats_wrapper as dog_stats_api
 from pytz import UTC
 
+from capa.correctmap import CorrectMap
+from capa.responsetypes import LoncapaProblemError, ResponseError, StudentInputError
 from track.views import task_track
 from util.file import course_filename_prefix_generator, UniversalNewlineIterator
+from util.query import iterate_in_batches, use_read_replica_if_available
+from xmodule.capa_module import CapaDescriptor
 from xmodule.modulestore.django import modulestore
 from xmodule.split_test_module import get_split_user_partitions
 
 from courseware.courses import get_course_by_id, get_problems_in_section
 from courseware.grades import iterate_grades_for
-from courseware.models import StudentModule
+from courseware.models import StudentModule, StudentModuleHistory
 from courseware.model_data import FieldDataCache
 from courseware.module_render import get_module_for_descriptor_internal
-from instructor_analytics.basic import enrolled_students_features
-from instructor_analytics.csvs import format_dictlist
+from instructor_analytics.basic import iter_enrolled_students_features
 from instructor_task.models import ReportStore, InstructorTask, PROGRESS
+from instructor_task.subtasks import (
+    SubtaskStatus,
+    check_subtask_is_valid,
+    queue_subtasks_for_query,
+    update_subtask_status,
+)
 from lms.djangoapps.lms_xblock.runtime import LmsPartitionService
 from openedx.core.djangoapps.course_groups.cohorts import get_cohort
 from openedx.core.djangoapps.course_groups.models import CourseUserGroup
@@ -480,6 +495,321 @@ def rescore_problem_module_state(xmodule_instance_args, module_descriptor, stude
         return UPDATE_STATUS_SUCCEEDED
 
 
+class BulkProblemRescorer(object):
+    """
+    Rescores the submissions of many students to a capa problem without
+    instantiating the problem's module for each of them.
+
+    A module is instantiated once, and its `LoncapaProblem` is reused for all
+    the students whose state has the same random seed: each student's saved
+    answers are loaded into it and graded again. New states and grades are
+    written back in batches of `batch_size`, with `flush()` writing out the
+    last one.
+    """
+    # Number of LoncapaProblem instances (one per seed) kept around.
+    MAX_PROBLEMS = 64
+
+    def __init__(self, course_id, module_descriptor, xmodule_instance_args=None, batch_size=100):
+        self.course_id = course_id
+        self.module_descriptor = module_descriptor
+        self.xmodule_instance_args = xmodule_instance_args
+        self.batch_size = batch_size
+        self._instance = None
+        self._problems = OrderedDict()
+        self._pending = []
+
+    @classmethod
+    def can_rescore(cls, module_descriptor):
+        """
+        Return whether submissions to `module_descriptor` can be rescored in bulk.
+
+        That requires a capa problem whose definition doesn't depend on which
+        student is answering. Grading a module also fulfills content
+        milestones, which is left to the per-student rescoring.
+        """
+        return (
+            isinstance(module_descriptor, CapaDescriptor) and
+            'anonymous_student_id' not in module_descriptor.data and
+            not settings.FEATURES.get('MILESTONES_APP', False)
+        )
+
+    def _get_problem(self, student_module, seed):
+        """
+        Return the LoncapaProblem for `seed`, creating it if needed.
+
+        The module the problems are created from is instantiated for the
+        first student who can access it. Returns None if that's still to be
+        done and the student of `student_module` can't access the module.
+        """
+        problem = self._problems.pop(seed, None)
+        if problem is None:
+            if self._instance is None:
+                self._instance = _get_module_instance_for_task(
+                    self.course_id,
+                    student_module.student,
+                    self.module_descriptor,
+                    self.xmodule_instance_args,
+                    grade_bucket_type='rescore',
+                )
+                if self._instance is None:
+                    return None
+            problem = self._instance.new_lcp({'seed': seed})
+            if len(self._problems) >= self.MAX_PROBLEMS:
+                self._problems.popitem(last=False)
+        self._problems[seed] = problem
+        return problem
+
+    def rescore(self, student_module):
+        """
+        Rescore the submission in `student_module`, returning one of the
+        UPDATE_STATUS values like `rescore_problem_module_state`.
+        """
+        state = json.loads(student_module.state) if student_module.state else {}
+        if not state.get('done') or state.get('seed') is None:
+            # Nothing that can be graded again in bulk; let the module decide.
+            return rescore_problem_module_state(self.xmodule_instance_args, self.module_descriptor, student_module)
+
+        usage_key = student_module.module_state_key
+        student = student_module.student
+        problem = self._get_problem(student_module, state['seed'])
+        if problem is None or not problem.supports_rescoring():
+            # Let the module report the failure the way it usually does.
+            return rescore_problem_module_state(self.xmodule_instance_args, self.module_descriptor, student_module)
+
+        problem.student_answers = state.get('student_answers', {})
+        problem.correct_map = CorrectMap()
+        problem.correct_map.set_dict(state.get('correct_map', {}))
+        problem.input_state = state.get('input_state', {})
+        problem.done = True
+        orig_score = problem.get_score()
+
+        event_info = {'state': dict(state), 'problem_id': usage_key.to_deprecated_string()}
+        track_function = _get_track_function_for_task(student, self.xmodule_instance_args)
+        try:
+            correct_map = problem.rescore_existing_answers()
+        except (StudentInputError, ResponseError, LoncapaProblemError) as err:
+            TASK_LOG.warning(u"error processing rescore call for course {course}, problem {loc} and student {student}: "
+                             u"{msg}".format(msg=err.message, course=self.course_id, loc=usage_key, student=student))
+            event_info['failure'] = 'input_error'
+            track_function('problem_rescore_fail', event_info)
+            return UPDATE_STATUS_FAILED
+
+        new_score = problem.get_score()
+        state['correct_map'] = correct_map.get_dict()
+        self._pending.append((student_module, json.dumps(state), new_score['score'], new_score['total']))
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+        success = 'correct' if all(correct_map.is_correct(answer_id) for answer_id in correct_map) else 'incorrect'
+        event_info.update({
+            'orig_score': orig_score['score'],
+            'orig_total': orig_score['total'],
+            'new_score': new_score['score'],
+            'new_total': new_score['total'],
+            'correct_map': state['correct_map'],
+            'success': success,
+            'attempts': state.get('attempts', 0),
+        })
+        track_function('problem_rescore', event_info)
+        TASK_LOG.debug(u"successfully processed rescore call for course {course}, problem {loc} and student {student}: "
+                       u"{msg}".format(msg=success, course=self.course_id, loc=usage_key, student=student))
+        return UPDATE_STATUS_SUCCEEDED
+
+    def flush(self):
+        """
+        Write out the rescored states and grades in a single transaction,
+        with one UPDATE and one INSERT statement.
+        """
+        if not self._pending:
+            return
+        modified = datetime.now(UTC)
+        history_entries = [
+            StudentModuleHistory(
+                student_module=student_module,
+                version=None,
+                created=modified,
+                state=state,
+                grade=grade,
+                max_grade=max_grade,
+            )
+            for student_module, state, grade, max_grade in self._pending
+            if student_module.module_type in StudentModuleHistory.HISTORY_SAVING_TYPES
+        ]
+        with transaction.commit_on_success():
+            _update_student_modules(
+                [(student_module.pk, state, grade, max_grade)
+                 for student_module, state, grade, max_grade in self._pending],
+                modified
+            )
+            StudentModuleHistory.objects.bulk_create(history_entries)
+        self._pending = []
+
+
+def _update_student_modules(rows, modified):
+    """
+    Set the state, grade and max_grade of StudentModules from the
+    `(pk, state, grade, max_grade)` tuples in `rows`, and their modified
+    time to `modified`, with a single UPDATE statement.
+
+    Django has no bulk update of different values, so each column is set
+    with a CASE on the primary key.
+    """
+    quote_name = connection.ops.quote_name
+    meta = StudentModule._meta  # pylint: disable=protected-access
+    pk_column = quote_name(meta.pk.column)
+    assignments = []
+    params = []
+    for index, field_name in enumerate(('state', 'grade', 'max_grade'), 1):
+        assignments.append(u"{column} = CASE {pk} {cases} END".format(
+            column=quote_name(meta.get_field(field_name).column),
+            pk=pk_column,
+            cases=u" ".join([u"WHEN %s THEN %s"] * len(rows)),
+        ))
+        for row in rows:
+            params.extend((row[0], row[index]))
+    modified_field = meta.get_field('modified')
+    assignments.append(u"{column} = %s".format(column=quote_name(modified_field.column)))
+    params.append(modified_field.get_db_prep_value(modified, connection))
+    params.extend(row[0] for row in rows)
+
+    sql = u"UPDATE {table} SET {assignments} WHERE {pk} IN ({pks})".format(
+        table=quote_name(meta.db_table),
+        assignments=u", ".join(assignments),
+        pk=pk_column,
+        pks=u", ".join([u"%s"] * len(rows)),
+    )
+    connection.cursor().execute(sql, params)
+    # Writing through the cursor doesn't tell the transaction management it has something to commit.
+    transaction.set_dirty()
+
+
+def _rescore_modules_in_bulk(course_id, module_descriptor, modules_to_update, task_progress, xmodule_instance_args):
+    """
+    Rescore the StudentModules in `modules_to_update` with a
+    `BulkProblemRescorer`, counting the results in `task_progress`.
+    """
+    rescorer = BulkProblemRescorer(course_id, module_descriptor, xmodule_instance_args)
+    for module_to_update in iterate_in_batches(modules_to_update.select_related('student')):
+        task_progress.attempted += 1
+        update_status = rescorer.rescore(module_to_update)
+        if update_status == UPDATE_STATUS_SUCCEEDED:
+            task_progress.succeeded += 1
+        elif update_status == UPDATE_STATUS_FAILED:
+            task_progress.failed += 1
+        else:
+            task_progress.skipped += 1
+    rescorer.flush()
+
+
+def rescore_problem_for_students(xmodule_instance_args, filter_fcn, chunk_task, entry_id, course_id, task_input,
+                                 action_name):
+    """
+    Rescore the problem given in `task_input`, like `perform_module_state_update`
+    with `rescore_problem_module_state` would.
+
+    When all students' submissions to a problem that supports it are
+    rescored, this is done by a `BulkProblemRescorer`. If there are more than
+    `settings.RESCORE_STUDENT_MODULES_PER_TASK` of them, they are split into
+    chunks rescored by `chunk_task` subtasks (see `rescore_problem_modules_chunk`).
+    """
+    problem_url = task_input.get('problem_url')
+    if problem_url and task_input.get('student') is None and not task_input.get('entrance_exam_url'):
+        usage_key = course_id.make_usage_key_from_deprecated_string(problem_url)
+        module_descriptor = modulestore().get_item(usage_key)
+        if BulkProblemRescorer.can_rescore(module_descriptor):
+            modules_to_update = StudentModule.objects.filter(course_id=course_id, module_state_key=usage_key)
+            if filter_fcn is not None:
+                modules_to_update = filter_fcn(modules_to_update)
+            num_modules = modules_to_update.count()
+
+            modules_per_task = settings.RESCORE_STUDENT_MODULES_PER_TASK
+            if chunk_task is not None and num_modules > modules_per_task:
+                return _queue_rescore_chunks(
+                    entry_id, modules_to_update, action_name, chunk_task, modules_per_task, xmodule_instance_args
+                )
+
+            task_progress = TaskProgress(action_name, num_modules, time())
+            task_progress.update_task_state()
+            _rescore_modules_in_bulk(
+                course_id, module_descriptor, modules_to_update, task_progress, xmodule_instance_args
+            )
+            return task_progress.update_task_state()
+
+    update_fcn = partial(rescore_problem_module_state, xmodule_instance_args)
+    return perform_module_state_update(update_fcn, filter_fcn, entry_id, course_id, task_input, action_name)
+
+
+def _queue_rescore_chunks(entry_id, modules_to_update, action_name, chunk_task, modules_per_task,
+                          xmodule_instance_args):
+    """
+    Queue a `chunk_task` subtask for each chunk of at most `modules_per_task`
+    of `modules_to_update`, and return the progress of the InstructorTask
+    `entry_id`.
+    """
+    entry = InstructorTask.objects.get(pk=entry_id)
+
+    # Don't queue another set of subtasks if this task is run again.
+    if len(entry.subtasks) > 0 and len(entry.task_output) > 0:
+        TASK_LOG.warning(u"Task %s has already queued its rescoring subtasks", entry.task_id)
+        return json.loads(entry.task_output)
+
+    def _create_chunk_subtask(module_list, subtask_status):
+        """Creates a subtask to rescore the StudentModules in `module_list`."""
+        module_ids = [module['pk'] for module in module_list]
+        return chunk_task.subtask(
+            (entry_id, module_ids, subtask_status.to_dict(), xmodule_instance_args),
+            task_id=subtask_status.task_id,
+        )
+
+    return queue_subtasks_for_query(
+        entry, action_name, _create_chunk_subtask, [modules_to_update], [], modules_per_task
+    )
+
+
+def rescore_problem_modules_chunk(entry_id, module_ids, subtask_status_dict, xmodule_instance_args):
+    """
+    Rescore the StudentModules with ids `module_ids` for the problem of the
+    InstructorTask `entry_id`, as one of its subtasks.
+    """
+    subtask_status = SubtaskStatus.from_dict(subtask_status_dict)
+    current_task_id = subtask_status.task_id
+    TASK_LOG.info(u"Preparing to rescore %d student modules as subtask %s for instructor task %d",
+                  len(module_ids), current_task_id, entry_id)
+    check_subtask_is_valid(entry_id, current_task_id, subtask_status)
+
+    try:
+        entry = InstructorTask.objects.get(pk=entry_id)
+        task_input = json.loads(entry.task_input)
+        usage_key = entry.course_id.make_usage_key_from_deprecated_string(task_input['problem_url'])
+        module_descriptor = modulestore().get_item(usage_key)
+        action_name = json.loads(entry.task_output)['action_name']
+        task_progress = TaskProgress(action_name, len(module_ids), time())
+        _rescore_modules_in_bulk(
+            entry.course_id,
+            module_descriptor,
+            StudentModule.objects.filter(id__in=module_ids),
+            task_progress,
+            xmodule_instance_args,
+        )
+    except Exception:
+        TASK_LOG.exception(u"Rescoring subtask %s for instructor task %d: failed unexpectedly!",
+                           current_task_id, entry_id)
+        # Rescored states are written in batches, so some may have been
+        # saved; count them all as failed to keep the totals consistent.
+        subtask_status.increment(failed=len(module_ids), state=FAILURE)
+        update_subtask_status(entry_id, current_task_id, subtask_status)
+        raise
+
+    subtask_status.increment(
+        succeeded=task_progress.succeeded,
+        failed=task_progress.failed,
+        skipped=task_progress.skipped,
+        state=SUCCESS,
+    )
+    update_subtask_status(entry_id, current_task_id, subtask_status)
+    return subtask_status.to_dict()
+
+
 @transaction.autocommit
 def reset_attempts_module_state(xmodule_instance_args, _module_descriptor, student_module):
     """
@@ -533,6 +863,8 @@ def upload_csv_to_report_store(rows, csv_name, course_id, timestamp):
                 [row1_colum1, row1_colum2, ...],
                 ...
             ]
+            Any iterable of rows will do; a generator is written out as it
+            produces rows.
         csv_name: Name of the resulting CSV
         course_id: ID of the course
     """
@@ -548,14 +880,21 @@ def upload_csv_to_report_store(rows, csv_name, course_id, timestamp):
     )
 
 
-def upload_grades_csv(_xmodule_instance_args, _entry_id, course_id, _task_input, action_name):
+def upload_grades_csv(_xmodule_instance_args, entry_id, course_id, _task_input, action_name, chunk_task=None):
     """
     For a given `course_id`, generate a grades CSV file for all students that
     are enrolled, and store using a `ReportStore`. Once created, the files can
     be accessed by instantiating another `ReportStore` (via
-    `ReportStore.from_config()`) and calling `link_for()` on it. Writes are
-    buffered, so we'll never write part of a CSV file to S3 -- i.e. any files
-    that are visible in ReportStore will be complete ones.
+    `ReportStore.from_config()`) and calling `link_for()` on it. Rows are
+    written out as students are graded, but we'll never make part of a CSV
+    file visible -- i.e. any files that are visible in ReportStore will be
+    complete ones.
+
+    If `chunk_task` is given and more than
+    `settings.GRADES_DOWNLOAD_STUDENTS_PER_TASK` students are enrolled, the
+    students are instead split into chunks which are graded by `chunk_task`
+    subtasks (see `upload_grades_csv_chunk`), and the report is uploaded once
+    the last of them has finished.
 
     As we start to add more CSV downloads, it will probably be worthwhile to
     make a more general CSVDoc class instead of building out the rows like we
@@ -563,24 +902,58 @@ def upload_grades_csv(_xmodule_instance_args, _entry_id, course_id, _task_input,
     """
     start_time = time()
     start_date = datetime.now(UTC)
-    status_interval = 100
-    enrolled_students = CourseEnrollment.users_enrolled_in(course_id)
-    task_progress = TaskProgress(action_name, enrolled_students.count(), start_time)
+    enrolled_students = use_read_replica_if_available(CourseEnrollment.users_enrolled_in(course_id))
+    num_enrolled = enrolled_students.count()
+
+    students_per_task = settings.GRADES_DOWNLOAD_STUDENTS_PER_TASK
+    if chunk_task is not None and num_enrolled > students_per_task:
+        return _queue_grades_csv_chunks(
+            entry_id, enrolled_students, action_name, chunk_task, students_per_task, start_date
+        )
 
+    task_progress = TaskProgress(action_name, num_enrolled, start_time)
     course = get_course_by_id(course_id)
+
+    # Students are graded as the report is uploaded.
+    err_rows = [["id", "username", "error_msg"]]
+    rows = _grade_report_rows(
+        course, iterate_in_batches(enrolled_students), task_progress, err_rows, status_interval=100
+    )
+    upload_csv_to_report_store(rows, 'grade_report', course_id, start_date)
+
+    current_step = {'step': 'Uploading CSVs'}
+    task_progress.update_task_state(extra_meta=current_step)
+
+    # If there are any error rows (don't count the header), write them out as well
+    if len(err_rows) > 1:
+        upload_csv_to_report_store(err_rows, 'grade_report_err', course_id, start_date)
+
+    # One last update before we close out...
+    return task_progress.update_task_state(extra_meta=current_step)
+
+
+def _grade_report_rows(course, students, task_progress, err_rows, status_interval=None):
+    """
+    Grade `students` in `course`, yielding the rows of the grade report,
+    starting with a header. Nothing is yielded if no student could be graded.
+    The rows of the error report for students who could not be graded are
+    appended to `err_rows`.
+
+    The counts of `task_progress` are updated as students are graded. If
+    `status_interval` is given, the task state is also updated every
+    `status_interval` students.
+    """
+    course_id = course.id
     cohorts_header = ['Cohort Name'] if course.is_cohorted else []
 
     experiment_partitions = get_split_user_partitions(course.user_partitions)
     group_configs_header = [u'Experiment Group ({})'.format(partition.name) for partition in experiment_partitions]
 
-    # Loop over all our students and build our CSV lists in memory
     header = None
-    rows = []
-    err_rows = [["id", "username", "error_msg"]]
     current_step = {'step': 'Calculating Grades'}
-    for student, gradeset, err_msg in iterate_grades_for(course_id, enrolled_students):
+    for student, gradeset, err_msg in iterate_grades_for(course_id, students):
         # Periodically update task status (this is a cache write)
-        if task_progress.attempted % status_interval == 0:
+        if status_interval and task_progress.attempted % status_interval == 0:
             task_progress.update_task_state(extra_meta=current_step)
         task_progress.attempted += 1
 
@@ -589,9 +962,7 @@ def upload_grades_csv(_xmodule_instance_args, _entry_id, course_id, _task_input,
             task_progress.succeeded += 1
             if not header:
                 header = [section['label'] for section in gradeset[u'section_breakdown']]
-                rows.append(
-                    ["id", "email", "username", "grade"] + header + cohorts_header + group_configs_header
-                )
+                yield ["id", "email", "username", "grade"] + header + cohorts_header + group_configs_header
 
             percents = {
                 section['label']: section.get('percent', 0.0)
@@ -616,7 +987,7 @@ def upload_grades_csv(_xmodule_instance_args, _entry_id, course_id, _task_input,
             # possible for a student to have a 0.0 show up in their row but
             # still have 100% for the course.
             row_percents = [percents.get(label, 0.0) for label in header]
-            rows.append(
+            yield (
                 [student.id, student.email, student.username, gradeset['percent']] +
                 row_percents + cohorts_group_name + group_configs_group_names
             )
@@ -625,19 +996,184 @@ def upload_grades_csv(_xmodule_instance_args, _entry_id, course_id, _task_input,
             task_progress.failed += 1
             err_rows.append([student.id, student.username, err_msg])
 
-    # By this point, we've got the rows we're going to stuff into our CSV files.
-    current_step = {'step': 'Uploading CSVs'}
-    task_progress.update_task_state(extra_meta=current_step)
 
-    # Perform the actual upload
-    upload_csv_to_report_store(rows, 'grade_report', course_id, start_date)
+def _grade_report_part_filename(csv_name, entry_id, part_number):
+    """
+    Return the name under which part `part_number` of the `csv_name` report
+    generated by the InstructorTask `entry_id` is stored.
+    """
+    return u"{csv_name}_part_{entry_id}_{part_number:05d}.csv".format(
+        csv_name=csv_name,
+        entry_id=entry_id,
+        part_number=part_number,
+    )
 
-    # If there are any error rows (don't count the header), write them out as well
-    if len(err_rows) > 1:
-        upload_csv_to_report_store(err_rows, 'grade_report_err', course_id, start_date)
 
-    # One last update before we close out...
-    return task_progress.update_task_state(extra_meta=current_step)
+def _queue_grades_csv_chunks(entry_id, enrolled_students, action_name, chunk_task, students_per_task, start_date):
+    """
+    Queue a `chunk_task` subtask for each chunk of at most `students_per_task`
+    of `enrolled_students`, and return the progress of the InstructorTask
+    `entry_id`.
+
+    Each subtask is called with the InstructorTask id, the ids of the students
+    to grade, the number of its part of the report, the time of the report
+    (in seconds since the epoch) and its initial subtask status.
+    """
+    entry = InstructorTask.objects.get(pk=entry_id)
+
+    # As with bulk email, this task may be run again when Celery loses its
+    # connection to the broker. If subtasks have already been queued, don't
+    # queue another set of them.
+    if len(entry.subtasks) > 0 and len(entry.task_output) > 0:
+        TASK_LOG.warning(u"Task %s has already queued its grade report subtasks", entry.task_id)
+        return json.loads(entry.task_output)
+
+    report_time = calendar.timegm(start_date.utctimetuple())
+    part_numbers = itertools.count()
+
+    def _create_chunk_subtask(student_list, subtask_status):
+        """Creates a subtask to grade the students in `student_list`."""
+        student_ids = [student['pk'] for student in student_list]
+        return chunk_task.subtask(
+            (entry_id, student_ids, next(part_numbers), report_time, subtask_status.to_dict()),
+            task_id=subtask_status.task_id,
+            routing_key=settings.GRADES_DOWNLOAD_ROUTING_KEY,
+        )
+
+    return queue_subtasks_for_query(
+        entry, action_name, _create_chunk_subtask, [enrolled_students], [], students_per_task
+    )
+
+
+def upload_grades_csv_chunk(entry_id, student_ids, part_number, report_time, subtask_status_dict, merge_task):
+    """
+    Grade the students with ids `student_ids` for the course of the
+    InstructorTask `entry_id`, and store the rows as part `part_number` of its
+    grade report in the partial `ReportStore`.
+
+    When this is the last of the subtasks to finish, `merge_task` is queued to
+    merge the parts into the final report, with arguments `entry_id` and
+    `report_time`. The InstructorTask stays in PROGRESS until it is merged.
+    """
+    subtask_status = SubtaskStatus.from_dict(subtask_status_dict)
+    current_task_id = subtask_status.task_id
+    TASK_LOG.info(
+        u"Preparing to grade %d students as part %d of the grade report for instructor task %d",
+        len(student_ids), part_number, entry_id,
+    )
+    check_subtask_is_valid(entry_id, current_task_id, subtask_status)
+
+    try:
+        entry = InstructorTask.objects.get(pk=entry_id)
+        course = get_course_by_id(entry.course_id)
+        students = use_read_replica_if_available(User.objects.filter(id__in=student_ids))
+        action_name = json.loads(entry.task_output)['action_name']
+        task_progress = TaskProgress(action_name, len(student_ids), time())
+        err_rows = [["id", "username", "error_msg"]]
+        rows = _grade_report_rows(course, iterate_in_batches(students), task_progress, err_rows)
+
+        report_store = ReportStore.from_config(partial=True)
+        report_store.store_rows(
+            entry.course_id, _grade_report_part_filename('grade_report', entry_id, part_number), rows
+        )
+        report_store.store_rows(
+            entry.course_id, _grade_report_part_filename('grade_report_err', entry_id, part_number), err_rows
+        )
+    except Exception:
+        TASK_LOG.exception(u"Grade report subtask %s for instructor task %d: failed unexpectedly!",
+                           current_task_id, entry_id)
+        # Nothing of this part will make it into the report.
+        subtask_status.increment(failed=len(student_ids), state=FAILURE)
+        if update_subtask_status(entry_id, current_task_id, subtask_status, complete_entry=False):
+            merge_task.delay(entry_id, report_time)
+        raise
+
+    subtask_status.increment(
+        succeeded=task_progress.succeeded,
+        failed=task_progress.failed,
+        state=SUCCESS,
+    )
+    if update_subtask_status(entry_id, current_task_id, subtask_status, complete_entry=False):
+        merge_task.delay(entry_id, report_time)
+    return subtask_status.to_dict()
+
+
+def _merge_report_parts(report_store, course_id, filenames, default_value):
+    """
+    Yield the rows of the parts of a report stored as `filenames`, under a
+    single header taken from the first part which has one.
+
+    Parts are generated independently, so their columns may differ; rows are
+    rearranged to match the first header, and a column missing from a part is
+    filled with `default_value`.
+    """
+    header = None
+    for filename in filenames:
+        rows = report_store.read_rows(course_id, filename)
+        part_header = next(rows, None)
+        if part_header is None:
+            continue
+        if header is None:
+            header = part_header
+            yield header
+        if part_header == header:
+            for row in rows:
+                yield row
+        else:
+            for row in rows:
+                values = dict(zip(part_header, row))
+                yield [values.get(column, default_value) for column in header]
+
+
+def merge_grades_csv_parts(entry_id, report_time):
+    """
+    Merge the parts of the grade report of the InstructorTask `entry_id` into
+    the grade report (and error report, if any student could not be graded)
+    for the time `report_time`, and delete the parts.
+
+    The InstructorTask is marked SUCCESS once the report is uploaded, or
+    FAILURE with the exception if it could not be.
+    """
+    entry = InstructorTask.objects.get(pk=entry_id)
+    course_id = entry.course_id
+    num_parts = json.loads(entry.subtasks)['total']
+    timestamp = datetime.fromtimestamp(report_time, UTC)
+    report_store = ReportStore.from_config(partial=True)
+    csv_names = (('grade_report', u'0.0'), ('grade_report_err', u''))
+
+    try:
+        for csv_name, default_value in csv_names:
+            filenames = [
+                _grade_report_part_filename(csv_name, entry_id, part_number)
+                for part_number in range(num_parts)
+            ]
+            rows = _merge_report_parts(report_store, course_id, filenames, default_value)
+            if csv_name == 'grade_report_err':
+                # Like the single-task report, only upload an error report if
+                # there are errors, i.e. rows besides the header.
+                first_rows = list(itertools.islice(rows, 2))
+                rows = itertools.chain(first_rows, rows) if len(first_rows) > 1 else None
+            if rows is not None:
+                upload_csv_to_report_store(rows, csv_name, course_id, timestamp)
+    except Exception as exc:
+        TASK_LOG.exception(u"Merging the grade report for instructor task %d failed unexpectedly!", entry_id)
+        entry.task_output = InstructorTask.create_output_for_failure(exc, traceback.format_exc())
+        entry.task_state = FAILURE
+        entry.save_now()
+        raise
+    finally:
+        # The parts are of no use once merging has succeeded or failed.
+        for csv_name, __ in csv_names:
+            for part_number in range(num_parts):
+                filename = _grade_report_part_filename(csv_name, entry_id, part_number)
+                try:
+                    report_store.delete(course_id, filename)
+                except Exception:  # pylint: disable=broad-except
+                    TASK_LOG.exception(u"Failed to delete grade report part %s", filename)
+
+    entry.task_state = SUCCESS
+    entry.save_now()
+    TASK_LOG.info(u"Merged %d parts of the grade report for instructor task %d", num_parts, entry_id)
 
 
 def upload_students_csv(_xmodule_instance_args, _entry_id, course_id, task_input, action_name):
@@ -652,22 +1188,23 @@ def upload_students_csv(_xmodule_instance_args, _entry_id, course_id, task_input
     current_step = {'step': 'Calculating Profile Info'}
     task_progress.update_task_state(extra_meta=current_step)
 
-    # compute the student features table and format it
+    # compute the student features table and format it as it is uploaded
     query_features = task_input.get('features')
-    student_data = enrolled_students_features(course_id, query_features)
-    header, rows = format_dictlist(student_data, query_features)
+    student_data = iter_enrolled_students_features(course_id, query_features)
 
-    task_progress.attempted = task_progress.succeeded = len(rows)
-    task_progress.skipped = task_progress.total - task_progress.attempted
-
-    rows.insert(0, header)
-
-    current_step = {'step': 'Uploading CSV'}
-    task_progress.update_task_state(extra_meta=current_step)
+    def _rows():
+        """Yields the header, then a row for each student, like `format_dictlist`."""
+        yield query_features
+        for student_dict in student_data:
+            task_progress.attempted += 1
+            task_progress.succeeded += 1
+            yield [student_dict[feature] for feature in query_features if feature in student_dict]
 
     # Perform the upload
-    upload_csv_to_report_store(rows, 'student_profile_info', course_id, start_date)
+    upload_csv_to_report_store(_rows(), 'student_profile_info', course_id, start_date)
 
+    task_progress.skipped = task_progress.total - task_progress.attempted
+    current_step = {'step': 'Uploading CSV'}
     return task_progress.update_task_state(extra_meta=current_step)
 
 
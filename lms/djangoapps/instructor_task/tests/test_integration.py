@@ -13,6 +13,7 @@ import textwrap
 from celery.states import SUCCESS, FAILURE
 from django.contrib.auth.models import User
 from django.core.urlresolvers import reverse
+from django.test.utils import override_settings
 
 from capa.tests.response_xml_factory import (CodeResponseXMLFactory,
                                              CustomResponseXMLFactory)
@@ -22,12 +23,14 @@ from xmodule.modulestore import ModuleStoreEnum
 from xmodule.partitions.partitions import Group, UserPartition
 
 from courseware.model_data import StudentModule
+from courseware.models import StudentModuleHistory
 
 from instructor_task.api import (submit_rescore_problem_for_all_students,
                                  submit_rescore_problem_for_student,
                                  submit_reset_problem_attempts_for_all_students,
                                  submit_delete_problem_state_for_all_students)
 from instructor_task.models import InstructorTask
+from instructor_task import tasks_helper
 from instructor_task.tasks_helper import upload_grades_csv
 from instructor_task.tests.test_base import (InstructorTaskModuleTestCase, TestReportMixin, TEST_COURSE_ORG,
                                              TEST_COURSE_NUMBER, OPTION_1, OPTION_2)
@@ -202,6 +205,74 @@ class TestRescoringTask(TestIntegrationTask):
         self.check_state('u3', descriptor, 1, 2, 1)
         self.check_state('u4', descriptor, 2, 2, 1)
 
+    @override_settings(RESCORE_STUDENT_MODULES_PER_TASK=3)
+    def test_rescoring_in_subtasks(self):
+        """Rescore more submissions than are rescored per task"""
+        problem_url_name = 'H1P1'
+        self.define_option_problem(problem_url_name)
+        location = InstructorTaskModuleTestCase.problem_location(problem_url_name)
+        descriptor = self.module_store.get_item(location)
+
+        self.submit_student_answer('u1', problem_url_name, [OPTION_1, OPTION_1])
+        self.submit_student_answer('u2', problem_url_name, [OPTION_1, OPTION_2])
+        self.submit_student_answer('u3', problem_url_name, [OPTION_2, OPTION_1])
+        self.submit_student_answer('u4', problem_url_name, [OPTION_2, OPTION_2])
+        self.redefine_option_problem(problem_url_name)
+        num_history_entries = StudentModuleHistory.objects.count()
+
+        instructor_task = self.submit_rescore_all_student_answers('instructor', problem_url_name)
+
+        instructor_task = InstructorTask.objects.get(id=instructor_task.id)
+        self.assertEqual(instructor_task.task_state, SUCCESS)
+        self.assertEqual(json.loads(instructor_task.subtasks)['total'], 2)
+        status = json.loads(instructor_task.task_output)
+        self.assertEqual(status['attempted'], 4)
+        self.assertEqual(status['succeeded'], 4)
+        self.check_state('u1', descriptor, 0, 2, 1)
+        self.check_state('u2', descriptor, 1, 2, 1)
+        self.check_state('u3', descriptor, 1, 2, 1)
+        self.check_state('u4', descriptor, 2, 2, 1)
+        # the rescored states are added to the history, as when a module is saved:
+        self.assertEqual(StudentModuleHistory.objects.count(), num_history_entries + 4)
+
+    def test_rescoring_in_bulk_first_student_denied(self):
+        """Rescore all submissions when the module can't be instantiated for the first student once"""
+        problem_url_name = 'H1P1'
+        self.define_option_problem(problem_url_name)
+        location = InstructorTaskModuleTestCase.problem_location(problem_url_name)
+        descriptor = self.module_store.get_item(location)
+
+        self.submit_student_answer('u1', problem_url_name, [OPTION_1, OPTION_1])
+        self.submit_student_answer('u2', problem_url_name, [OPTION_1, OPTION_2])
+        self.submit_student_answer('u3', problem_url_name, [OPTION_2, OPTION_2])
+        self.redefine_option_problem(problem_url_name)
+
+        get_module_instance = tasks_helper._get_module_instance_for_task  # pylint: disable=protected-access
+        denied = []
+
+        def _get_module_instance_once_denied(course_id, student, *args, **kwargs):
+            """Denies access to the first module instantiated"""
+            if not denied:
+                denied.append(student.username)
+                return None
+            return get_module_instance(course_id, student, *args, **kwargs)
+
+        with patch('instructor_task.tasks_helper._get_module_instance_for_task') as mock_get_module_instance:
+            mock_get_module_instance.side_effect = _get_module_instance_once_denied
+            instructor_task = self.submit_rescore_all_student_answers('instructor', problem_url_name)
+
+        instructor_task = InstructorTask.objects.get(id=instructor_task.id)
+        self.assertEqual(instructor_task.task_state, SUCCESS)
+        status = json.loads(instructor_task.task_output)
+        self.assertEqual(status['attempted'], 3)
+        self.assertEqual(status['succeeded'], 3)
+        self.assertEqual(denied, ['u1'])
+        # the denied student's submission was rescored on its own, and the
+        # others with a module instantiated for one of them.
+        self.check_state('u1', descriptor, 0, 2, 1)
+        self.check_state('u2', descriptor, 1, 2, 1)
+        self.check_state('u3', descriptor, 2, 2, 1)
+
     def test_rescoring_failure(self):
         """Simulate a failure in rescoring a problem"""
         problem_url_name = 'H1P1'
@@ -4,7 +4,9 @@ Tests for instructor_task/models.py.
 
 from cStringIO import StringIO
 import mock
+import os
 import time
+import zlib
 from datetime import datetime
 from unittest import TestCase
 
@@ -23,6 +25,7 @@ class MockKey(object):
 
     def set_contents_from_string(self, contents, headers):  # pylint: disable=unused-argument
         """ Expected method on a Key object. """
+        self.contents = contents
         self.bucket.store_key(self)
 
     def generate_url(self, expires_in):  # pylint: disable=unused-argument
@@ -30,6 +33,32 @@ class MockKey(object):
         return "http://fake-edx-s3.edx.org/"
 
 
+class MockMultiPartUpload(object):
+    """
+    Mocking a boto S3 MultiPartUpload object.
+    """
+    def __init__(self, bucket, key_name):
+        self.bucket = bucket
+        self.key_name = key_name
+        self.parts = {}
+
+    def upload_part_from_file(self, fp, part_num):
+        """ Expected method on a MultiPartUpload object. """
+        self.parts[part_num] = fp.read()
+
+    def complete_upload(self):
+        """ Expected method on a MultiPartUpload object. """
+        key = MockKey(self.bucket)
+        key.key = self.key_name
+        key.parts = [self.parts[part_num] for part_num in sorted(self.parts)]
+        key.contents = ''.join(key.parts)
+        self.bucket.store_key(key)
+
+    def cancel_upload(self):
+        """ Expected method on a MultiPartUpload object. """
+        self.parts = {}
+
+
 class MockBucket(object):
     """ Mocking a boto S3 Bucket object. """
     def __init__(self, _name):
@@ -39,6 +68,10 @@ class MockBucket(object):
         """ Not a Bucket method, created just to store the keys in the Bucket for testing purposes. """
         self.keys.append(key)
 
+    def initiate_multipart_upload(self, key_name, headers):  # pylint: disable=unused-argument
+        """ Expected method on a Bucket object. """
+        return MockMultiPartUpload(self, key_name)
+
     def list(self, prefix):  # pylint: disable=unused-argument
         """ Expected method on a Bucket object. """
         return self.keys
@@ -93,6 +126,27 @@ class LocalFSReportStoreTestCase(ReportStoreTestMixin, TestReportMixin, TestCase
         """ Create and return a LocalFSReportStore. """
         return LocalFSReportStore.from_config()
 
+    def test_store_rows_hides_incomplete_file(self):
+        """
+        Test that a file isn't listed until all of its rows are written, and
+        that nothing is left behind if producing the rows fails.
+        """
+        report_store = self.create_report_store()
+
+        def rows():
+            """ Yields a row, then fails. """
+            yield [u'id']
+            self.assertEqual(report_store.links_for(self.course_id), [])
+            raise ValueError
+
+        with self.assertRaises(ValueError):
+            report_store.store_rows(self.course_id, 'report.csv', rows())
+        self.assertEqual(os.listdir(report_store.path_to(self.course_id, '')), [])
+
+        report_store.store_rows(self.course_id, 'report.csv', iter([[u'id'], [u'1']]))
+        self.assertEqual([link[0] for link in report_store.links_for(self.course_id)], ['report.csv'])
+        self.assertEqual(list(report_store.read_rows(self.course_id, 'report.csv')), [[u'id'], [u'1']])
+
 
 @mock.patch('instructor_task.models.S3Connection', new=MockS3Connection)
 @mock.patch('instructor_task.models.Key', new=MockKey)
@@ -105,3 +159,17 @@ class S3ReportStoreTestCase(ReportStoreTestMixin, TestReportMixin, TestCase):
     def create_report_store(self):
         """ Create and return a S3ReportStore. """
         return S3ReportStore.from_config()
+
+    def test_store_rows_multipart(self):
+        """
+        Test that rows which don't fit in a single chunk are sent in parts.
+        """
+        report_store = self.create_report_store()
+        rows = [[u'row', unicode(i), u'\u8282' * 20] for i in range(500)]
+        with mock.patch.object(S3ReportStore, 'CHUNK_SIZE', 1000):
+            report_store.store_rows(self.course_id, 'report.csv', (row for row in rows))
+
+        key = report_store.bucket.keys[-1]
+        self.assertGreater(len(key.parts), 1)
+        contents = zlib.decompress(key.contents, 16 + zlib.MAX_WBITS)
+        self.assertEqual(contents.decode('utf-8').splitlines()[-1], u','.join(rows[-1]))
@@ -258,6 +258,26 @@ class TestRescoreInstructorTask(TestInstructorTasks):
         self.assertEquals(output.get('action_name'), 'rescored')
         self.assertGreater(output.get('duration_ms'), 0)
 
+    def test_rescoring_one_student(self):
+        # Confirm that rescoring a single student goes through the student's module.
+        input_state = json.dumps({'done': True})
+        self._create_students_with_state(3, input_state)
+        task_entry = self._create_input_entry(student_ident='robot1')
+        mock_instance = Mock()
+        mock_instance.rescore_problem = Mock(return_value={'success': 'correct'})
+        with patch('instructor_task.tasks_helper.get_module_for_descriptor_internal') as mock_get_module:
+            mock_get_module.return_value = mock_instance
+            self._run_task_with_mock_celery(rescore_problem, task_entry.id, task_entry.task_id)
+        self.assertEquals(mock_get_module.call_count, 1)
+        self.assertEquals(mock_get_module.call_args[1]['user'].username, 'robot1')
+        # check return value
+        entry = InstructorTask.objects.get(id=task_entry.id)
+        output = json.loads(entry.task_output)
+        self.assertEquals(output.get('attempted'), 1)
+        self.assertEquals(output.get('succeeded'), 1)
+        self.assertEquals(output.get('total'), 1)
+        self.assertEquals(output.get('action_name'), 'rescored')
+
     def test_rescoring_bad_result(self):
         # Confirm that rescoring does not succeed if "success" key is not an expected value.
         input_state = json.dumps({'done': True})
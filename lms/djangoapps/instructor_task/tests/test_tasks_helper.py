@@ -7,9 +7,13 @@ Tests that CSV grade report generation works with unicode emails.
 
 """
 import ddt
-from mock import Mock, patch
+import json
+from celery.states import FAILURE, SUCCESS
+from django.test.utils import override_settings
+from mock import ANY, Mock, patch
 import tempfile
 import unicodecsv
+from uuid import uuid4
 
 from xmodule.modulestore.tests.factories import CourseFactory
 from student.tests.factories import UserFactory
@@ -20,8 +24,10 @@ from openedx.core.djangoapps.course_groups.models import CourseUserGroupPartitio
 from openedx.core.djangoapps.course_groups.tests.helpers import CohortFactory
 import openedx.core.djangoapps.user_api.api.course_tag as course_tag_api
 from openedx.core.djangoapps.user_api.partition_schemes import RandomUserPartitionScheme
-from instructor_task.models import ReportStore
+from instructor_task.models import InstructorTask, PROGRESS, ReportStore
+from instructor_task.tasks import calculate_grades_csv_chunk
 from instructor_task.tasks_helper import cohort_students_and_upload, upload_grades_csv, upload_students_csv
+from instructor_task.tests.factories import InstructorTaskFactory
 from instructor_task.tests.test_base import InstructorTaskCourseTestCase, TestReportMixin
 
 
@@ -257,6 +263,80 @@ class TestInstructorGradeReport(TestReportMixin, InstructorTaskCourseTestCase):
         result = upload_grades_csv(None, None, self.course.id, None, 'graded')
         self.assertDictContainsSubset({'attempted': 1, 'succeeded': 1, 'failed': 0}, result)
 
+    @override_settings(GRADES_DOWNLOAD_STUDENTS_PER_TASK=2)
+    @patch('instructor_task.tasks_helper._get_current_task')
+    def test_grading_in_subtasks(self, _mock_current_task):
+        """
+        Test that a report for more students than are graded per task is
+        built from the parts computed by subtasks.
+        """
+        students = [self.create_student(u'student{}'.format(i)) for i in range(5)]
+        entry = InstructorTaskFactory.create(
+            course_id=self.course.id,
+            task_type='grade_course',
+            task_id=str(uuid4()),
+        )
+        upload_grades_csv(None, entry.id, self.course.id, None, 'graded', chunk_task=calculate_grades_csv_chunk)
+
+        entry = InstructorTask.objects.get(pk=entry.id)
+        self.assertEqual(entry.task_state, SUCCESS)
+        self.assertDictContainsSubset(
+            {'attempted': 5, 'succeeded': 5, 'failed': 0},
+            json.loads(entry.task_output)
+        )
+        self.assertEqual(json.loads(entry.subtasks)['total'], 3)
+
+        report_store = ReportStore.from_config()
+        links = report_store.links_for(self.course.id)
+        self.assertEqual(len(links), 1)
+        self.assertIn('grade_report', links[0][0])
+        rows = list(report_store.read_rows(self.course.id, links[0][0]))
+        self.assertEqual(rows[0][:4], [u'id', u'email', u'username', u'grade'])
+        self.assertItemsEqual([row[2] for row in rows[1:]], [student.username for student in students])
+
+        # The parts are removed once they have been merged.
+        self.assertEqual(ReportStore.from_config(partial=True).links_for(self.course.id), [])
+
+    def _grade_in_subtasks(self):
+        """
+        Grades a few students in subtasks of a new grade report task, and returns the task.
+        """
+        for i in range(3):
+            self.create_student(u'student{}'.format(i))
+        entry = InstructorTaskFactory.create(
+            course_id=self.course.id,
+            task_type='grade_course',
+            task_id=str(uuid4()),
+        )
+        with override_settings(GRADES_DOWNLOAD_STUDENTS_PER_TASK=2):
+            with patch('instructor_task.tasks_helper._get_current_task'):
+                upload_grades_csv(
+                    None, entry.id, self.course.id, None, 'graded', chunk_task=calculate_grades_csv_chunk
+                )
+        return InstructorTask.objects.get(pk=entry.id)
+
+    @patch('instructor_task.tasks.merge_grades_csv')
+    def test_in_progress_until_merged(self, mock_merge_task):
+        """
+        Test that the report isn't done when its subtasks are, but once it is merged.
+        """
+        entry = self._grade_in_subtasks()
+        self.assertEqual(entry.task_state, PROGRESS)
+        self.assertEqual(ReportStore.from_config().links_for(self.course.id), [])
+        mock_merge_task.delay.assert_called_once_with(entry.id, ANY)
+
+    @patch('instructor_task.tasks_helper.upload_csv_to_report_store', Mock(side_effect=IOError('S3 is down')))
+    def test_merging_failure(self):
+        """
+        Test that a failure to merge the report is recorded, and that the parts are removed.
+        """
+        entry = self._grade_in_subtasks()
+        self.assertEqual(entry.task_state, FAILURE)
+        self.assertDictContainsSubset(
+            {'exception': 'IOError', 'message': 'S3 is down'}, json.loads(entry.task_output)
+        )
+        self.assertEqual(ReportStore.from_config(partial=True).links_for(self.course.id), [])
+
 
 @ddt.ddt
 class TestStudentReport(TestReportMixin, InstructorTaskCourseTestCase):
@@ -17,6 +17,8 @@ class XBlockAsidesConfig(ConfigurationModel):
     """
     Configuration for XBlockAsides.
     """
+    process_cache_timeout = 10
+
 
     disabled_blocks = TextField(
         default="about course_info static_tab",
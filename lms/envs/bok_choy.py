@@ -74,6 +74,9 @@ OPEN_ENDED_GRADING_INTERFACE['url'] = 'http://localhost:8041/'
 # Configure the LMS to use our stub EdxNotes implementation
 EDXNOTES_INTERFACE['url'] = 'http://localhost:8042/api/v1'
 
+# Tests change the data of the stub comments service directly, so don't cache it.
+COMMENTS_SERVICE_CACHE_TIMEOUTS = {}
+
 # Enable django-pipeline and staticfiles
 STATIC_ROOT = (TEST_ROOT / "staticfiles").abspath()
 
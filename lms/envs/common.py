@@ -64,6 +64,19 @@ DISCUSSION_SETTINGS = {
     'MAX_COMMENT_DEPTH': 2,
 }
 
+# Connections to the comments service kept open by each process, and the
+# number of times a request is retried when it fails to connect to the service.
+COMMENTS_SERVICE_POOL_SIZE = 10
+COMMENTS_SERVICE_MAX_RETRIES = 0
+
+# Number of seconds for which responses of the comments service are cached,
+# by kind of response. Writes made through the LMS invalidate them earlier.
+COMMENTS_SERVICE_CACHE_TIMEOUTS = {
+    'thread_list': 60,
+    'thread': 60,
+    'user': 60,
+}
+
 
 # Features
 FEATURES = {
@@ -410,6 +423,31 @@ NODE_PATH = ':'.join(node_paths)
 # For geolocation ip database
 GEOIP_PATH = REPO_ROOT / "common/static/data/geoip/GeoIP.dat"
 GEOIPV6_PATH = REPO_ROOT / "common/static/data/geoip/GeoIPv6.dat"
+# Number of recently looked up IP addresses whose country is cached in each process
+GEOIP_COUNTRY_CACHE_SIZE = 10000
+
+# Whether the configuration models that set a `process_cache_timeout` are also
+# cached in each process
+CONFIG_MODELS_PROCESS_CACHE_ENABLED = True
+
+# Number of seconds that the enrollment of a user in a course is cached
+COURSE_ENROLLMENT_CACHE_TIMEOUT = 60 * 60
+
+# Number of seconds that the course and org roles of a user are cached
+ACCESS_ROLE_CACHE_TIMEOUT = 60 * 60
+
+# Number of seconds that a user, their profile, standing and language preference are cached
+USER_IDENTITY_CACHE_TIMEOUT = 60 * 60
+
+# Number of (user, course) pairs whose anonymous id is remembered as saved in each process
+SAVED_ANONYMOUS_IDS_CACHE_SIZE = 100000
+
+# Number of seconds that the table of contents of a course is cached for each
+# combination of the inputs its visibility to a user depends on
+COURSEWARE_TOC_CACHE_TIMEOUT = 60 * 60
+
+# Requests making more access checks than this are logged
+ACCESS_CHECKS_WARNING_THRESHOLD = 5000
 
 # Where to look for a status message
 STATUS_MESSAGE_PATH = ENV_ROOT / "status_message.json"
@@ -928,9 +966,10 @@ MIDDLEWARE_CLASSES = (
     'django.middleware.common.CommonMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
 
-    # Instead of AuthenticationMiddleware, we use a cached backed version
+    # Instead of AuthenticationMiddleware, we use a version loading the user,
+    # their profile, standing and language preference from the cache
     #'django.contrib.auth.middleware.AuthenticationMiddleware',
-    'cache_toolbox.middleware.CacheBackedAuthenticationMiddleware',
+    'student.middleware.CachedIdentityAuthenticationMiddleware',
     'student.middleware.UserStandingMiddleware',
     'contentserver.middleware.StaticContentServer',
     'crum.CurrentRequestUserMiddleware',
@@ -982,6 +1021,9 @@ MIDDLEWARE_CLASSES = (
     # to redirected unenrolled students to the course info page
     'courseware.middleware.RedirectUnenrolledMiddleware',
 
+    # reports the number of access checks made by each request
+    'courseware.middleware.AccessCheckCountMiddleware',
+
     'course_wiki.middleware.WikiAccessMiddleware',
 
     # This must be last
@@ -1419,6 +1461,15 @@ BULK_EMAIL_LOG_SENT_EMAILS = False
 # parallel, and what the SES rate is.
 BULK_EMAIL_RETRY_DELAY_BETWEEN_SENDS = 0.02
 
+# Number of mail connections a bulk email task sends its messages over at
+# once.  Each connection is kept open for all the messages of the task.
+BULK_EMAIL_CONNECTIONS_PER_TASK = 4
+
+# Maximum number of messages sent per second by a bulk email task, or None
+# for no limit.  Choose this value depending on the number of workers that
+# might be sending email in parallel, and what the SES rate is.
+BULK_EMAIL_MAX_SENDS_PER_SECOND = None
+
 ############################# Email Opt In ####################################
 
 # Minimum age for organization-wide email opt in
@@ -1682,12 +1733,21 @@ CERT_NAME_LONG = "Certificate of Achievement"
 ###################### Grade Downloads ######################
 GRADES_DOWNLOAD_ROUTING_KEY = HIGH_MEM_QUEUE
 
+# Grade reports for courses with more enrolled students than this are
+# split into subtasks which each grade at most this many students.
+GRADES_DOWNLOAD_STUDENTS_PER_TASK = 1000
+
 GRADES_DOWNLOAD = {
     'STORAGE_TYPE': 'localfs',
     'BUCKET': 'edx-grades',
     'ROOT_PATH': '/tmp/edx-s3/grades',
 }
 
+###################### Problem Rescoring ######################
+# Rescoring a problem for all students is split into subtasks which each
+# rescore at most this many student submissions.
+RESCORE_STUDENT_MODULES_PER_TASK = 1000
+
 
 #### PASSWORD POLICY SETTINGS #####
 PASSWORD_MIN_LENGTH = 8
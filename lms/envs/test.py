@@ -52,6 +52,31 @@ FEATURES['DISABLE_START_DATES'] = True
 # the one in cms/envs/test.py
 FEATURES['ENABLE_DISCUSSION_SERVICE'] = False
 
+# Tests mock the responses of the comments service, so don't cache them.
+COMMENTS_SERVICE_CACHE_TIMEOUTS = {}
+
+# Tests give mocked mail connections a sequence of outcomes, so send bulk
+# email messages one at a time, in order.
+BULK_EMAIL_CONNECTIONS_PER_TASK = 1
+
+# Tests mock the countries of IP addresses, so don't cache them.
+GEOIP_COUNTRY_CACHE_SIZE = 0
+
+# Tests clear the shared cache and roll back configuration entries, which the
+# process cache of configuration models would not notice.
+CONFIG_MODELS_PROCESS_CACHE_ENABLED = False
+
+# Each test's enrollments are rolled back and their ids reused, so don't cache them across requests.
+COURSE_ENROLLMENT_CACHE_TIMEOUT = 0
+ACCESS_ROLE_CACHE_TIMEOUT = 0
+USER_IDENTITY_CACHE_TIMEOUT = 0
+
+# Tests roll back the saved anonymous ids and may reuse user ids.
+SAVED_ANONYMOUS_IDS_CACHE_SIZE = 0
+
+# Tests reuse course ids across modulestores whose courses have no version.
+COURSEWARE_TOC_CACHE_TIMEOUT = 0
+
 FEATURES['ENABLE_SERVICE_STATUS'] = True
 
 FEATURES['ENABLE_HINTER_INSTRUCTOR_VIEW'] = True
@@ -1,4 +1,4 @@
-from .utils import CommentClientRequestError, perform_request
+from .utils import CommentClientRequestError, invalidate_cached_responses, perform_request
 
 from .thread import Thread, _url_for_flag_abuse_thread, _url_for_unflag_abuse_thread
 from lms.lib.comment_client import models
@@ -30,6 +30,15 @@ class Comment(models.Model):
     def thread(self):
         return Thread(id=self.thread_id, type='thread')
 
+    @property
+    def _cache_scopes(self):
+        return [
+            ('thread', self.attributes.get('thread_id')),
+            ('commentable', self.attributes.get('commentable_id')),
+            ('course', self.attributes.get('course_id')),
+            ('user', self.attributes.get('user_id')),
+        ]
+
     @classmethod
     def url_for_comments(cls, params={}):
         if params.get('thread_id'):
@@ -60,6 +69,7 @@ class Comment(models.Model):
             metric_action='comment.abuse.flagged'
         )
         voteable._update_from_response(response)
+        invalidate_cached_responses(voteable._cache_scopes)
 
     def unFlagAbuse(self, user, voteable, removeAll):
         if voteable.type == 'thread':
@@ -81,6 +91,7 @@ class Comment(models.Model):
             metric_action='comment.abuse.unflagged'
         )
         voteable._update_from_response(response)
+        invalidate_cached_responses(voteable._cache_scopes)
 
 
 def _url_for_thread_comments(thread_id):
@@ -1,6 +1,6 @@
 import logging
 
-from .utils import extract, perform_request, CommentClientRequestError
+from .utils import extract, invalidate_cached_responses, perform_request, CommentClientRequestError
 
 
 log = logging.getLogger(__name__)
@@ -94,6 +94,14 @@ class Model(object):
         tags.append(u'model_class:{}'.format(self.__class__.__name__))
         return tags
 
+    @property
+    def _cache_scopes(self):
+        """
+        Returns the scopes of the cached responses of the comments service
+        that writes to this model make stale (see `invalidate_cached_responses`).
+        """
+        return []
+
     @classmethod
     def find(cls, id):
         return cls(id=id)
@@ -146,6 +154,7 @@ class Model(object):
             )
         self.retrieved = True
         self._update_from_response(response)
+        invalidate_cached_responses(self._cache_scopes)
         self.after_save(self)
 
     def delete(self):
@@ -153,6 +162,7 @@ class Model(object):
         response = perform_request('delete', url, metric_tags=self._metric_tags, metric_action='model.delete')
         self.retrieved = True
         self._update_from_response(response)
+        invalidate_cached_responses(self._cache_scopes)
 
     @classmethod
     def url_with_id(cls, params={}):
@@ -0,0 +1,101 @@
+"""
+Tests of the comments service client's requests, against a stub of the service.
+"""
+from django.core.cache import cache
+from django.test import TestCase
+from django.test.utils import override_settings
+from django.utils.translation import get_language, override as override_language
+from mock import patch
+
+from lms.lib.comment_client.thread import Thread
+from lms.lib.comment_client.utils import (
+    _get_cache_versions,
+    get_session,
+    invalidate_cached_responses,
+    perform_concurrently,
+    perform_request,
+)
+from terrain.stubs.comments import StubCommentsService
+
+
+class PerformRequestTestCase(TestCase):
+    """
+    Tests of `perform_request`, its cache and `perform_concurrently`.
+    """
+    def setUp(self):
+        super(PerformRequestTestCase, self).setUp()
+        self.server = StubCommentsService()
+        self.addCleanup(self.server.shutdown)
+        self.url = "http://127.0.0.1:{port}/api/v1".format(port=self.server.port)
+        cache.clear()
+
+    def _get_user(self, user_id):
+        """Returns the stub service's data for the user with id `user_id`."""
+        return perform_request(
+            'get',
+            "{url}/users/{user_id}".format(url=self.url, user_id=user_id),
+            cache_name='user',
+            cache_scopes=[('user', user_id)],
+        )
+
+    def test_session_is_shared(self):
+        self.assertIs(get_session(), get_session())
+        self.assertEqual(self._get_user(1)['id'], '1')
+        self.assertEqual(self._get_user(2)['id'], '2')
+
+    def test_session_per_process(self):
+        session = get_session()
+        with patch('lms.lib.comment_client.utils.os.getpid', return_value=-1):
+            forked_session = get_session()
+            self.assertIsNot(forked_session, session)
+            self.assertIs(get_session(), forked_session)
+
+    def test_perform_concurrently(self):
+        users = perform_concurrently(*[
+            lambda user_id=user_id: self._get_user(user_id) for user_id in range(5)
+        ])
+        self.assertEqual([user['id'] for user in users], ['0', '1', '2', '3', '4'])
+
+    def test_perform_concurrently_language(self):
+        with override_language('eo'):
+            self.assertEqual(perform_concurrently(get_language, get_language), ['eo', 'eo'])
+
+    def test_perform_concurrently_error(self):
+        def _fail():
+            """Raises a ValueError."""
+            raise ValueError("failed")
+
+        with self.assertRaisesRegexp(ValueError, "failed"):
+            perform_concurrently(lambda: self._get_user(1), _fail)
+
+    @override_settings(COMMENTS_SERVICE_CACHE_TIMEOUTS={'user': 60})
+    def test_cached_response(self):
+        with patch('lms.lib.comment_client.utils.get_session', wraps=get_session) as mock_get_session:
+            self.assertEqual(self._get_user(1)['default_sort_key'], 'date')
+            self.server.config['default_sort_key'] = 'votes'
+            self.assertEqual(self._get_user(1)['default_sort_key'], 'date')
+            self.assertEqual(mock_get_session.call_count, 1)
+
+            invalidate_cached_responses([('user', 1)])
+            self.assertEqual(self._get_user(1)['default_sort_key'], 'votes')
+            self.assertEqual(mock_get_session.call_count, 2)
+
+    @override_settings(COMMENTS_SERVICE_CACHE_TIMEOUTS={})
+    def test_uncached_response(self):
+        with patch('lms.lib.comment_client.utils.get_session', wraps=get_session) as mock_get_session:
+            self._get_user(1)
+            self._get_user(1)
+            self.assertEqual(mock_get_session.call_count, 2)
+
+    @override_settings(COMMENTS_SERVICE_CACHE_TIMEOUTS={'thread': 60})
+    def test_write_invalidates_cached_responses(self):
+        thread = Thread(id='dummy_thread_id', commentable_id='dummy_commentable_id', course_id='dummy/course/id')
+        scopes = [('thread', 'dummy_thread_id'), ('commentable', 'dummy_commentable_id'), ('user', '1')]
+        versions = _get_cache_versions(scopes)
+        with patch('lms.lib.comment_client.models.perform_request', return_value={}):
+            thread.delete()
+        new_versions = _get_cache_versions(scopes)
+        self.assertNotEqual(new_versions[0], versions[0])
+        self.assertNotEqual(new_versions[1], versions[1])
+        # The thread's author wasn't known, so the versions for users are unchanged.
+        self.assertEqual(new_versions[2], versions[2])
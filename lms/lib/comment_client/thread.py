@@ -1,7 +1,7 @@
 import logging
 
 from eventtracking import tracker
-from .utils import merge_dict, strip_blank, strip_none, extract, perform_request
+from .utils import merge_dict, strip_blank, strip_none, extract, invalidate_cached_responses, perform_request
 from .utils import CommentClientRequestError
 import models
 import settings
@@ -46,19 +46,29 @@ class Thread(models.Model):
                           'recursive': False}
         params = merge_dict(default_params, strip_blank(strip_none(query_params)))
 
+        # Searches aren't cached; lists of threads are, until a thread of
+        # the commentable (or course) changes or the user reads a thread.
+        cache_name = None
+        cache_scopes = [('user', params.get('user_id'))]
         if query_params.get('text'):
             url = cls.url(action='search')
         else:
             url = cls.url(action='get_all', params=extract(params, 'commentable_id'))
+            cache_name = 'thread_list'
             if params.get('commentable_id'):
+                cache_scopes.append(('commentable', params['commentable_id']))
                 del params['commentable_id']
+            else:
+                cache_scopes.append(('course', params['course_id']))
         response = perform_request(
             'get',
             url,
             params,
             metric_tags=[u'course_id:{}'.format(query_params['course_id'])],
             metric_action='thread.search',
-            paged_results=True
+            paged_results=True,
+            cache_name=cache_name,
+            cache_scopes=cache_scopes,
         )
         if query_params.get('text'):
             search_query = query_params['text']
@@ -131,10 +141,24 @@ class Thread(models.Model):
             url,
             request_params,
             metric_action='model.retrieve',
-            metric_tags=self._metric_tags
+            metric_tags=self._metric_tags,
+            cache_name='thread',
+            cache_scopes=[('thread', self.id)],
         )
+        if request_params['mark_as_read']:
+            # The thread is now read in the user's lists of threads.
+            invalidate_cached_responses([('user', request_params.get('user_id'))])
         self._update_from_response(response)
 
+    @property
+    def _cache_scopes(self):
+        return [
+            ('thread', self.id),
+            ('commentable', self.attributes.get('commentable_id')),
+            ('course', self.attributes.get('course_id')),
+            ('user', self.attributes.get('user_id')),
+        ]
+
     def flagAbuse(self, user, voteable):
         if voteable.type == 'thread':
             url = _url_for_flag_abuse_thread(voteable.id)
@@ -151,6 +175,7 @@ class Thread(models.Model):
             metric_tags=self._metric_tags
         )
         voteable._update_from_response(response)
+        invalidate_cached_responses(voteable._cache_scopes)
 
     def unFlagAbuse(self, user, voteable, removeAll):
         if voteable.type == 'thread':
@@ -172,6 +197,7 @@ class Thread(models.Model):
             metric_action='thread.abuse.unflagged'
         )
         voteable._update_from_response(response)
+        invalidate_cached_responses(voteable._cache_scopes)
 
     def pin(self, user, thread_id):
         url = _url_for_pin_thread(thread_id)
@@ -184,6 +210,7 @@ class Thread(models.Model):
             metric_action='thread.pin'
         )
         self._update_from_response(response)
+        invalidate_cached_responses(self._cache_scopes)
 
     def un_pin(self, user, thread_id):
         url = _url_for_un_pin_thread(thread_id)
@@ -196,6 +223,7 @@ class Thread(models.Model):
             metric_action='thread.unpin'
         )
         self._update_from_response(response)
+        invalidate_cached_responses(self._cache_scopes)
 
 
 def _url_for_flag_abuse_thread(thread_id):
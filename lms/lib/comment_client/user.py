@@ -1,4 +1,4 @@
-from .utils import merge_dict, perform_request, CommentClientRequestError
+from .utils import merge_dict, invalidate_cached_responses, perform_request, CommentClientRequestError
 
 import models
 import settings
@@ -29,6 +29,10 @@ class User(models.Model):
                    external_id=str(user.id),
                    username=user.username)
 
+    @property
+    def _cache_scopes(self):
+        return [('user', self.id)]
+
     def follow(self, source):
         params = {'source_type': source.type, 'source_id': source.id}
         response = perform_request(
@@ -38,6 +42,7 @@ class User(models.Model):
             metric_action='user.follow',
             metric_tags=self._metric_tags + ['target.type:{}'.format(source.type)],
         )
+        invalidate_cached_responses(self._cache_scopes + source._cache_scopes)
 
     def unfollow(self, source):
         params = {'source_type': source.type, 'source_id': source.id}
@@ -48,6 +53,7 @@ class User(models.Model):
             metric_action='user.unfollow',
             metric_tags=self._metric_tags + ['target.type:{}'.format(source.type)],
         )
+        invalidate_cached_responses(self._cache_scopes + source._cache_scopes)
 
     def vote(self, voteable, value):
         if voteable.type == 'thread':
@@ -65,6 +71,7 @@ class User(models.Model):
             metric_tags=self._metric_tags + ['target.type:{}'.format(voteable.type)],
         )
         voteable._update_from_response(response)
+        invalidate_cached_responses(self._cache_scopes + voteable._cache_scopes)
 
     def unvote(self, voteable):
         if voteable.type == 'thread':
@@ -82,6 +89,7 @@ class User(models.Model):
             metric_tags=self._metric_tags + ['target.type:{}'.format(voteable.type)],
         )
         voteable._update_from_response(response)
+        invalidate_cached_responses(self._cache_scopes + voteable._cache_scopes)
 
     def active_threads(self, query_params={}):
         if not self.course_id:
@@ -130,6 +138,8 @@ class User(models.Model):
                 retrieve_params,
                 metric_action='model.retrieve',
                 metric_tags=self._metric_tags,
+                cache_name='user',
+                cache_scopes=self._cache_scopes,
             )
         except CommentClientRequestError as e:
             if e.status_code == 404:
@@ -142,6 +152,8 @@ class User(models.Model):
                     retrieve_params,
                     metric_action='model.retrieve',
                     metric_tags=self._metric_tags,
+                    cache_name='user',
+                    cache_scopes=self._cache_scopes,
                 )
             else:
                 raise
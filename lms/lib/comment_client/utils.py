@@ -1,11 +1,18 @@
 from contextlib import contextmanager
 import dogstats_wrapper as dog_stats_api
+import hashlib
+import json
 import logging
+import os
+import sys
+import threading
 import requests
+from requests.adapters import HTTPAdapter
 from django.conf import settings
+from django.core.cache import cache
 from time import time
 from uuid import uuid4
-from django.utils.translation import get_language
+from django.utils.translation import get_language, override as override_language
 
 log = logging.getLogger(__name__)
 
@@ -50,9 +57,145 @@ def request_timer(request_id, method, url, tags=None):
     )
 
 
+_session = None
+_session_pid = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """
+    Return the `requests.Session` used for requests to the comments service.
+
+    The session keeps up to `settings.COMMENTS_SERVICE_POOL_SIZE` connections
+    to the service open, and retries requests whose connection fails
+    `settings.COMMENTS_SERVICE_MAX_RETRIES` times. It is shared by the threads
+    of a process; a forked process creates its own, rather than use the
+    sockets of its parent.
+    """
+    global _session, _session_pid  # pylint: disable=global-statement
+    with _session_lock:
+        if _session is None or _session_pid != os.getpid():
+            adapter = HTTPAdapter(
+                pool_connections=1,
+                pool_maxsize=getattr(settings, "COMMENTS_SERVICE_POOL_SIZE", 10),
+                max_retries=getattr(settings, "COMMENTS_SERVICE_MAX_RETRIES", 0),
+            )
+            session = requests.Session()
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            _session, _session_pid = session, os.getpid()
+        return _session
+
+
+def perform_concurrently(*calls):
+    """
+    Call each of `calls` (functions taking no arguments, which usually make
+    requests to the comments service) in its own thread, and return the list
+    of their results.
+
+    The calls are made in the language of the calling thread. If some of them
+    raise an exception, the exception of the earliest of them in `calls` is
+    raised again once all of them are done.
+
+    The first call is made by the calling thread. The others shouldn't use
+    the database, as each thread would open its own connection to it.
+    """
+    language = get_language()
+    results = [None] * len(calls)
+    errors = [None] * len(calls)
+
+    def _call(index):
+        """Make call `index`, recording its result or exception."""
+        try:
+            with override_language(language):
+                results[index] = calls[index]()
+        except Exception:  # pylint: disable=broad-except
+            errors[index] = sys.exc_info()
+
+    threads = [threading.Thread(target=_call, args=(index,)) for index in range(1, len(calls))]
+    for thread in threads:
+        thread.start()
+    # The calling thread makes the first call itself.
+    if calls:
+        _call(0)
+    for thread in threads:
+        thread.join()
+
+    for error in errors:
+        if error is not None:
+            raise error[0], error[1], error[2]
+    return results
+
+
+# Cached responses are stored under a hash of the request and of the current
+# versions of the scopes they depend on, which are stored under these keys.
+CACHE_VERSION_KEY = u"comment_client.version.{kind}.{value}"
+CACHE_VERSION_TIMEOUT = 24 * 60 * 60
+RESPONSE_CACHE_KEY = u"comment_client.response.{digest}"
+
+
+def _cache_version_keys(scopes):
+    """
+    Returns the keys of the versions of `scopes`, a list of (kind, value)
+    tuples such as ('thread', thread_id). Scopes with no value are ignored.
+    """
+    return [
+        CACHE_VERSION_KEY.format(kind=kind, value=value)
+        for kind, value in scopes
+        if value is not None
+    ]
+
+
+def _get_cache_versions(scopes):
+    """
+    Returns the current versions of `scopes`, in order.
+    """
+    keys = _cache_version_keys(scopes)
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            # Another process may be setting the version at the same time, so
+            # use whichever is stored first.
+            version = uuid4().hex
+            cache.add(key, version, CACHE_VERSION_TIMEOUT)
+            versions[key] = cache.get(key, version)
+    return [versions[key] for key in keys]
+
+
+def invalidate_cached_responses(scopes):
+    """
+    Make the cached responses that depend on any of `scopes` stale, by
+    changing their versions.
+    """
+    if getattr(settings, "COMMENTS_SERVICE_CACHE_TIMEOUTS", None):
+        cache.set_many(
+            {key: uuid4().hex for key in _cache_version_keys(scopes)},
+            CACHE_VERSION_TIMEOUT
+        )
+
+
+def _response_cache_key(url, params, scopes):
+    """
+    Returns the key of the cached response to a GET request to `url` with
+    `params`, depending on `scopes`.
+    """
+    request = [url, params, get_language(), _get_cache_versions(scopes)]
+    digest = hashlib.md5(json.dumps(request, sort_keys=True, default=unicode)).hexdigest()
+    return RESPONSE_CACHE_KEY.format(digest=digest)
+
+
 def perform_request(method, url, data_or_params=None, raw=False,
-                    metric_action=None, metric_tags=None, paged_results=False):
+                    metric_action=None, metric_tags=None, paged_results=False,
+                    cache_name=None, cache_scopes=()):
+    """
+    Make a request to the comments service and return its response, decoded
+    from JSON unless `raw` is set.
 
+    The decoded responses to GET requests with a `cache_name` are cached for
+    `settings.COMMENTS_SERVICE_CACHE_TIMEOUTS[cache_name]` seconds, or until
+    the version of one of `cache_scopes` changes (see
+    `invalidate_cached_responses`).
+    """
     if metric_tags is None:
         metric_tags = []
 
@@ -62,6 +205,19 @@ def perform_request(method, url, data_or_params=None, raw=False,
 
     if data_or_params is None:
         data_or_params = {}
+
+    cache_timeout = None
+    if method == 'get' and cache_name is not None and not raw:
+        cache_timeout = getattr(settings, "COMMENTS_SERVICE_CACHE_TIMEOUTS", {}).get(cache_name)
+    if cache_timeout:
+        cache_key = _response_cache_key(url, data_or_params, cache_scopes)
+        cached_data = cache.get(cache_key)
+        cache_tags = metric_tags + [u'cache:{}'.format(cache_name)]
+        if cached_data is not None:
+            dog_stats_api.increment('comment_client.cache.hit', tags=cache_tags)
+            return cached_data
+        dog_stats_api.increment('comment_client.cache.miss', tags=cache_tags)
+
     headers = {
         'X-Edx-Api-Key': getattr(settings, "COMMENTS_SERVICE_KEY", None),
         'Accept-Language': get_language(),
@@ -76,7 +232,7 @@ def perform_request(method, url, data_or_params=None, raw=False,
         data = None
         params = merge_dict(data_or_params, request_id_dict)
     with request_timer(request_id, method, url, metric_tags):
-        response = requests.request(
+        response = get_session().request(
             method,
             url,
             data=data,
@@ -129,6 +285,8 @@ def perform_request(method, url, data_or_params=None, raw=False,
                     value=data.get('num_pages', 1),
                     tags=metric_tags
                 )
+            if cache_timeout:
+                cache.set(cache_key, data, cache_timeout)
             return data
 
 
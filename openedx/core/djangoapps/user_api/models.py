@@ -1,6 +1,8 @@
 from django.contrib.auth.models import User
 from django.core.validators import RegexValidator
 from django.db import models
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 from model_utils.models import TimeStampedModel
 
 from xmodule_django.models import CourseKeyField
@@ -12,6 +14,8 @@ from xmodule_django.models import CourseKeyField
 # certain models.  For now we will leave the models in "student" and
 # create an alias in "user_api".
 from student.models import UserProfile, Registration, PendingEmailChange  # pylint: disable=unused-import
+from student.models import clear_user_identity
+from lang_pref import LANGUAGE_KEY
 
 
 class UserPreference(models.Model):
@@ -48,6 +52,18 @@ class UserPreference(models.Model):
             return default
 
 
+@receiver(post_save, sender=UserPreference)
+@receiver(post_delete, sender=UserPreference)
+def invalidate_user_identity(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """
+    Invalidates the cached identity of a user, see
+    `student.models.get_user_identity`, when their language preference is
+    saved or deleted.
+    """
+    if instance.key == LANGUAGE_KEY:
+        clear_user_identity(instance.user_id)
+
+
 class UserCourseTag(models.Model):
     """
     Per-course user tags, to be used by various things that want to store tags about